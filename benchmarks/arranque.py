@@ -0,0 +1,89 @@
+# Benchmark del arranque: tiempo de importación de `src.clases` y latencia de la primera predicción.
+# Cada medida se hace en un proceso nuevo de Python para que no influyan los módulos ya cargados.
+# Termina con código 1 si alguna medida supera su presupuesto.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.arranque [--modelo modelos/modelo_TF_SDG_SW_L.pkl] [--vectorizador modelos/vectorizador_TF_SDG_SW_L.pkl]
+
+# Se importan las librerías pertinentes:
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Presupuestos por defecto, en segundos:
+PRESUPUESTO_IMPORTACION = 0.25
+PRESUPUESTO_PRIMERA_PREDICCION = 5.0
+
+# Código que se ejecuta en cada proceso nuevo:
+CODIGO_IMPORTACION = """
+import json, time
+inicio = time.perf_counter()
+import src.clases
+print(json.dumps({'importacion': time.perf_counter() - inicio}))
+"""
+
+CODIGO_PREDICCION = """
+import json, sys, time
+inicio = time.perf_counter()
+from src.clases import CLasificadorTexto
+clasificador = CLasificadorTexto(sys.argv[1], sys.argv[2])
+clasificador.clasificar_texto("i feel happy today")
+primera = time.perf_counter() - inicio
+inicio = time.perf_counter()
+segundo = CLasificadorTexto(sys.argv[1], sys.argv[2])
+segundo.clasificar_texto("i feel happy today")
+print(json.dumps({'primera_prediccion': primera, 'segunda_instancia': time.perf_counter() - inicio}))
+"""
+
+def ejecutar(codigo, *argumentos):
+    """
+    Ejecuta código en un proceso nuevo de Python y devuelve el JSON que imprime.
+
+    Parámetros:
+    -----------
+    codigo : str
+        El código a ejecutar.
+    *argumentos : str
+        Los argumentos que recibe el código en `sys.argv`.
+
+    Devoluciones:
+    ------------
+    dict:
+        Las medidas que imprime el proceso.
+    """
+    salida = subprocess.run([sys.executable, '-c', codigo, *argumentos], capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark del tiempo de importación y de la primera predicción.")
+    parser.add_argument('--modelo', default='modelos/modelo_TF_SDG_SW_L.pkl', help="Ruta al modelo .pkl.")
+    parser.add_argument('--vectorizador', default='modelos/vectorizador_TF_SDG_SW_L.pkl', help="Ruta al vectorizador .pkl.")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Número de procesos con los que se mide cada tiempo.")
+    parser.add_argument('--presupuesto-importacion', type=float, default=PRESUPUESTO_IMPORTACION)
+    parser.add_argument('--presupuesto-primera-prediccion', type=float, default=PRESUPUESTO_PRIMERA_PREDICCION)
+    args = parser.parse_args(argumentos)
+
+    importacion = statistics.median(ejecutar(CODIGO_IMPORTACION)['importacion'] for _ in range(args.repeticiones))
+    predicciones = [ejecutar(CODIGO_PREDICCION, args.modelo, args.vectorizador) for _ in range(args.repeticiones)]
+    primera = statistics.median(prediccion['primera_prediccion'] for prediccion in predicciones)
+    segunda = statistics.median(prediccion['segunda_instancia'] for prediccion in predicciones)
+
+    resultados = [
+        ('importación de src.clases', importacion, args.presupuesto_importacion),
+        ('primera predicción', primera, args.presupuesto_primera_prediccion),
+        ('segunda instancia', segunda, None),
+    ]
+    dentro = True
+    for nombre, tiempo, presupuesto in resultados:
+        if presupuesto is None:
+            print(f"{nombre:<28}{tiempo:>10.4f} s")
+            continue
+        estado = 'OK' if tiempo <= presupuesto else 'EXCEDIDO'
+        dentro = dentro and tiempo <= presupuesto
+        print(f"{nombre:<28}{tiempo:>10.4f} s   presupuesto {presupuesto:.2f} s   {estado}")
+    return 0 if dentro else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
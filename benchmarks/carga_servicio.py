@@ -0,0 +1,90 @@
+# Prueba de carga del servicio de clasificación en línea (`src.servicio`) contra localhost.
+# Abre varias conexiones keep-alive concurrentes, envía textos a /clasificar y mide en el cliente
+# las latencias p50/p99 y el rendimiento. Al terminar muestra también las métricas del servidor.
+#
+# Uso (desde la raíz del repositorio, con el servicio arrancado):
+#     python -m benchmarks.carga_servicio [--puerto 8000] [--conexiones 64] [--peticiones 5000]
+
+# Se importan las librerías pertinentes:
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+# Textos de ejemplo con la forma de los del conjunto de emociones:
+TEXTOS = [
+    "i feel so happy and loved today",
+    "i am feeling really sad and alone",
+    "im so angry at everyone right now",
+    "i feel scared about tomorrow",
+    "i was surprised by the amazing news",
+    "i love love love this song so much",
+    "i feel like nobody cares about me",
+    "i feel so grateful for my friends",
+]
+
+async def peticion(lector, escritor, metodo, ruta, cuerpo=b""):
+    """
+    Envía una petición HTTP/1.1 por una conexión abierta y devuelve el código de estado y el JSON de la respuesta.
+    """
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    longitud = 0
+    while True:
+        cabecera = await lector.readline()
+        if cabecera in (b'\r\n', b''):
+            break
+        nombre, _, valor = cabecera.decode('latin-1').partition(':')
+        if nombre.strip().lower() == 'content-length':
+            longitud = int(valor)
+    return estado, json.loads(await lector.readexactly(longitud))
+
+async def conexion(args, pendientes, latencias, errores):
+    """
+    Envía peticiones por una conexión hasta que no quedan pendientes.
+    """
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    try:
+        while pendientes[0] > 0:
+            pendientes[0] -= 1
+            cuerpo = json.dumps({'texto': random.choice(TEXTOS)}).encode('utf-8')
+            inicio = time.perf_counter()
+            estado, _ = await peticion(lector, escritor, 'POST', '/clasificar', cuerpo)
+            latencias.append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores.append(estado)
+    finally:
+        escritor.close()
+
+async def prueba(args):
+    pendientes = [args.peticiones]
+    latencias = []
+    errores = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexion(args, pendientes, latencias, errores) for _ in range(args.conexiones)))
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+    print(f"Peticiones: {len(latencias)}   errores: {len(errores)}   conexiones: {args.conexiones}")
+    print(f"Rendimiento: {len(latencias) / duracion:.1f} peticiones/s")
+    print(f"Latencia p50: {latencias[len(latencias) // 2] * 1000:.2f} ms   p99: {latencias[int(0.99 * (len(latencias) - 1))] * 1000:.2f} ms")
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    _, metricas = await peticion(lector, escritor, 'GET', '/metricas')
+    escritor.close()
+    print("Métricas del servidor:", json.dumps(metricas, indent=2))
+    return 0 if not errores else 1
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de clasificación en localhost.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--conexiones', type=int, default=64, help="Número de conexiones concurrentes.")
+    parser.add_argument('--peticiones', type=int, default=5000, help="Número total de peticiones.")
+    args = parser.parse_args(argumentos)
+    return asyncio.run(prueba(args))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# Benchmark de la cascada de modelos sobre un corpus sintético (ver `benchmarks.corpus_sintetico`).
+# Entrena un modelo barato (CountVectorizer de palabras y SGD) y uno más caro (CountVectorizer 'char_wb' de
+# 2 a 5 caracteres y regresión logística) con los textos lematizados del corpus, y compara sobre un holdout
+# generado con otra semilla cada modelo por separado con la cascada para varios umbrales (ver `src.cascada`).
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.cascada [--filas 20000] [--filas-holdout 5000] [--umbrales 0.5 0.6 0.7 0.8 0.9]
+
+# Se importan las librerías pertinentes:
+import argparse
+import os
+import tempfile
+import warnings
+from benchmarks.corpus_sintetico import generar_corpus
+
+def preprocesar(df):
+    """
+    Limpia y lematiza el corpus como `main.py`.
+
+    Parámetros:
+    -----------
+    df : pandas.DataFrame
+        El corpus sintético.
+
+    Devoluciones:
+    ------------
+    tuple:
+        Los tokens lematizados de cada fila válida y sus categorías.
+    """
+    from src.clases import Preprocesado
+    df = df.rename(columns={"text": "TEXTO", "label": "CATEGORIA"})
+    with Preprocesado(df, 'TEXTO') as preprocesamiento:
+        df = preprocesamiento.limpieza()
+    return preprocesamiento.tokens_lematizados, df['CATEGORIA'].to_numpy()
+
+def entrenar_modelos(tokens, etiquetas, directorio):
+    """
+    Entrena el modelo barato y el caro con los textos lematizados y los guarda en un directorio.
+
+    Parámetros:
+    -----------
+    tokens : list of list of str
+        Los tokens lematizados de cada texto.
+    etiquetas : numpy.ndarray
+        Las categorías.
+    directorio : str
+        El directorio donde se guardan los archivos .pkl.
+
+    Devoluciones:
+    ------------
+    list of tuple:
+        Las rutas del modelo y del vectorizador de cada nivel, del más barato al más caro.
+    """
+    import joblib
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    textos = [" ".join(tokens_texto) for tokens_texto in tokens]
+    niveles = [
+        ('palabras', CountVectorizer(), SGDClassifier(loss='modified_huber', random_state=0)),
+        ('caracteres', CountVectorizer(analyzer='char_wb', ngram_range=(2, 5)), LogisticRegression(max_iter=1000)),
+    ]
+    rutas = []
+    for nombre, vectorizador, modelo in niveles:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            modelo.fit(vectorizador.fit_transform(textos), etiquetas)
+        modelo_path = os.path.join(directorio, f'modelo_{nombre}.pkl')
+        vectorizador_path = os.path.join(directorio, f'vectorizador_{nombre}.pkl')
+        joblib.dump(modelo, modelo_path)
+        joblib.dump(vectorizador, vectorizador_path)
+        rutas.append((modelo_path, vectorizador_path))
+    return rutas
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la cascada de modelos sobre un corpus sintético.")
+    parser.add_argument('--filas', type=int, default=20000, help="Filas del corpus de entrenamiento.")
+    parser.add_argument('--filas-holdout', type=int, default=5000, help="Filas del holdout.")
+    parser.add_argument('--umbrales', nargs='+', type=float, default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args(argumentos)
+
+    from src.clases import CLasificadorTexto
+    from src.cascada import evaluar_cascada
+    tokens, etiquetas = preprocesar(generar_corpus(args.filas, semilla=42))
+    tokens_holdout, etiquetas_holdout = preprocesar(generar_corpus(args.filas_holdout, semilla=7))
+    with tempfile.TemporaryDirectory() as directorio:
+        (modelo_barato, vectorizador_barato), (modelo_caro, vectorizador_caro) = entrenar_modelos(tokens, etiquetas, directorio)
+        clasificador = CLasificadorTexto(modelo_barato, vectorizador_barato, escalado=CLasificadorTexto(modelo_caro, vectorizador_caro))
+        resultados = evaluar_cascada(clasificador, tokens_holdout, etiquetas_holdout, args.umbrales, repeticiones=args.repeticiones)
+    print(resultados.to_string(index=False, float_format=lambda valor: f"{valor:.4f}"))
+
+if __name__ == '__main__':
+    main()
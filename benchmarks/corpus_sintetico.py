@@ -0,0 +1,107 @@
+# Generador de un corpus sintético con la forma del conjunto de emociones de Kaggle
+# (columnas 'Unnamed: 0', 'text' y 'label'), para medir el rendimiento sin descargar los datos.
+# Los textos incluyen el ruido que trata la limpieza: letras de relleno, palabras y frases repetidas,
+# secuencias largas de consonantes, signos de puntuación, menciones, hashtags y enlaces.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.corpus_sintetico --filas 100000 --salida /tmp/emociones_sinteticas.csv
+
+# Se importan las librerías pertinentes:
+import argparse
+import random
+import sys
+
+# Palabras características de cada categoría (0 tristeza, 1 alegría, 2 amor, 3 ira, 4 miedo, 5 sorpresa):
+PALABRAS_CATEGORIA = {
+    0: ["sad", "lonely", "miserable", "hopeless", "crying", "depressed", "empty", "hurt", "lost", "gloomy"],
+    1: ["happy", "joyful", "great", "excited", "cheerful", "glad", "awesome", "wonderful", "fun", "blessed"],
+    2: ["love", "loving", "caring", "sweet", "tender", "adore", "romantic", "passionate", "fond", "beloved"],
+    3: ["angry", "furious", "mad", "annoyed", "irritated", "hate", "rage", "outraged", "bitter", "resentful"],
+    4: ["scared", "afraid", "terrified", "nervous", "anxious", "worried", "fearful", "panicked", "shaky", "frightened"],
+    5: ["surprised", "shocked", "amazed", "astonished", "stunned", "unexpected", "speechless", "curious", "wow", "startled"],
+}
+# Palabras comunes a todas las categorías:
+PALABRAS_COMUNES = ["i", "feel", "am", "so", "really", "very", "the", "a", "and", "to", "of", "my", "when", "this",
+                    "today", "about", "with", "like", "just", "that", "im", "was", "it", "me", "have", "be", "not", "at"]
+# Distribución aproximada de las categorías en el conjunto original:
+PESOS_CATEGORIAS = [0.29, 0.34, 0.08, 0.14, 0.11, 0.04]
+
+def _ruido(palabra, aleatorio):
+    """
+    Aplica a una palabra uno de los tipos de ruido de los tweets.
+    """
+    tipo = aleatorio.random()
+    if tipo < 0.04 and palabra:
+        # Letras de relleno: 'soooooo', 'happyyyyy'
+        return palabra + palabra[-1] * aleatorio.randint(3, 8)
+    if tipo < 0.06:
+        # Secuencia larga de consonantes
+        return "".join(aleatorio.choice("bcdfghjklmnpqrstvwxz") for _ in range(aleatorio.randint(6, 10)))
+    if tipo < 0.09:
+        return aleatorio.choice(["@user", "#mood", "http://t.co/abc123", "!!!", "...", "?!", ":)", "&amp;"]) + " " + palabra
+    return palabra
+
+def generar_texto(categoria, aleatorio):
+    """
+    Genera un tweet ruidoso de una categoría.
+
+    Parámetros:
+    -----------
+    categoria : int
+        La categoría del texto.
+    aleatorio : random.Random
+        El generador de números aleatorios.
+
+    Devoluciones:
+    ------------
+    str:
+        El texto generado.
+    """
+    palabras = []
+    for _ in range(aleatorio.randint(3, 40)):
+        lista = PALABRAS_CATEGORIA[categoria] if aleatorio.random() < 0.25 else PALABRAS_COMUNES
+        palabras.append(_ruido(aleatorio.choice(lista), aleatorio))
+    if aleatorio.random() < 0.15:
+        # Palabras o frases repetidas de forma consecutiva
+        inicio = aleatorio.randrange(len(palabras))
+        frase = palabras[inicio:inicio + aleatorio.randint(1, 3)]
+        palabras[inicio:inicio] = frase * aleatorio.randint(1, 4)
+    return " ".join(palabras)
+
+def generar_corpus(filas, semilla=42):
+    """
+    Genera un DataFrame con la forma del conjunto de emociones.
+
+    Parámetros:
+    -----------
+    filas : int
+        El número de filas.
+    semilla : int, opcional
+        La semilla del generador, para que el corpus sea reproducible.
+
+    Devoluciones:
+    ------------
+    pandas.DataFrame:
+        Las columnas 'Unnamed: 0', 'text' y 'label'.
+    """
+    import pandas as pd
+    aleatorio = random.Random(semilla)
+    categorias = aleatorio.choices(range(len(PESOS_CATEGORIAS)), weights=PESOS_CATEGORIAS, k=filas)
+    return pd.DataFrame({
+        'Unnamed: 0': range(filas),
+        'text': [generar_texto(categoria, aleatorio) for categoria in categorias],
+        'label': categorias,
+    })
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Genera un CSV sintético con la forma del conjunto de emociones.")
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', required=True, help="Ruta del CSV de salida.")
+    args = parser.parse_args(argumentos)
+    generar_corpus(args.filas, args.semilla).to_csv(args.salida, index=False)
+    print("El corpus sintético fue guardado correctamente en", args.salida)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# Benchmark por etapas del flujo de `main.py` sobre un corpus sintético (ver `benchmarks.corpus_sintetico`).
+# Mide por separado la lectura con LectorCSV, cada paso de Preprocesado.limpieza, la inferencia de
+# CLasificadorTexto (desde la columna de texto y desde los tokens lematizados) y el guardado con GuardarCSV,
+# e informa de las filas por segundo y de la memoria máxima de cada etapa. El modelo y el vectorizador se entrenan sobre el propio corpus en un directorio temporal.
+#
+# Con --guardar-linea-base se guardan las medidas como línea base. En las ejecuciones siguientes se comparan
+# con ella y el script termina con código 1 si alguna etapa procesa menos filas por segundo o usa más memoria
+# de la que permite la tolerancia, o si no encuentra la línea base. La línea base de `linea_base_etapas.json`
+# se midió con los valores por defecto y se vuelve a guardar cuando un cambio mejora el rendimiento a propósito.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.etapas [--filas 20000] [--repeticiones 3] [--guardar-linea-base] [--tolerancia 0.3]
+
+# Se importan las librerías pertinentes:
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from benchmarks.corpus_sintetico import generar_corpus
+
+# Ruta por defecto de la línea base:
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_etapas.json')
+# Tolerancia por defecto, como fracción de la línea base:
+TOLERANCIA = 0.30
+
+def medir(funcion, memoria=True, repeticiones=3):
+    """
+    Ejecuta una función y mide su tiempo y, opcionalmente, su memoria máxima.
+
+    El tiempo es el mínimo de varias ejecuciones, de modo que no incluye el calentamiento de la primera.
+    La memoria se mide con tracemalloc en una ejecución aparte, para que su sobrecoste no afecte al tiempo.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        Función sin argumentos que ejecuta la etapa.
+    memoria : bool, opcional
+        Si se mide la memoria máxima.
+    repeticiones : int, opcional
+        El número de ejecuciones con las que se mide el tiempo.
+
+    Devoluciones:
+    ------------
+    tuple:
+        El resultado de la función, el tiempo en segundos y la memoria máxima en MiB (None si no se mide).
+    """
+    tiempo = float('inf')
+    for _ in range(max(1, repeticiones)):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempo = min(tiempo, time.perf_counter() - inicio)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return resultado, tiempo, pico
+
+def entrenar_modelo(df, directorio):
+    """
+    Entrena un vectorizador y un modelo pequeños sobre el corpus y los guarda en un directorio.
+
+    Parámetros:
+    -----------
+    df : pandas.DataFrame
+        El corpus sintético.
+    directorio : str
+        El directorio donde se guardan los archivos .pkl.
+
+    Devoluciones:
+    ------------
+    tuple of str:
+        Las rutas del modelo y del vectorizador.
+    """
+    import joblib
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.linear_model import SGDClassifier
+    vectorizador = CountVectorizer()
+    modelo = SGDClassifier(loss='modified_huber', random_state=0).fit(vectorizador.fit_transform(df['text']), df['label'])
+    modelo_path = os.path.join(directorio, 'modelo.pkl')
+    vectorizador_path = os.path.join(directorio, 'vectorizador.pkl')
+    joblib.dump(modelo, modelo_path)
+    joblib.dump(vectorizador, vectorizador_path)
+    return modelo_path, vectorizador_path
+
+def ejecutar_etapas(filas, semilla=42, memoria=True, repeticiones=3):
+    """
+    Genera el corpus y mide cada etapa del flujo.
+
+    Parámetros:
+    -----------
+    filas : int
+        El número de filas del corpus sintético.
+    semilla : int, opcional
+        La semilla del corpus.
+    memoria : bool, opcional
+        Si se mide la memoria máxima de cada etapa.
+    repeticiones : int, opcional
+        El número de ejecuciones con las que se mide el tiempo de cada etapa.
+
+    Devoluciones:
+    ------------
+    dict:
+        Para cada etapa, las filas de entrada, el tiempo, las filas por segundo y la memoria máxima en MiB.
+    """
+    from src.constantes import patron_mantener, regex_consonantes_repetidas, patron_vocales_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA, columnas_deseadas
+    from src.funciones import limpieza_texto, preprocesamiento_lotes
+    from src.clases import LectorCSV, Preprocesado, CLasificadorTexto, GuardarCSV
+    from src.resultados import mapear_emociones
+
+    etapas = {}
+    def registrar(nombre, n_filas, funcion):
+        resultado, tiempo, pico = medir(funcion, memoria, repeticiones)
+        etapas[nombre] = {'filas': n_filas, 'segundos': tiempo, 'filas_por_segundo': n_filas / tiempo if tiempo else 0.0, 'memoria_mib': pico}
+        return resultado
+
+    with tempfile.TemporaryDirectory() as directorio:
+        corpus = generar_corpus(filas, semilla)
+        path_csv = os.path.join(directorio, 'corpus.csv')
+        corpus.to_csv(path_csv, index=False)
+        modelo_path, vectorizador_path = entrenar_modelo(corpus, directorio)
+        del corpus
+
+        # 1) Lectura
+        df = registrar('lectura', filas, lambda: LectorCSV(path_csv).crear_dataframe())
+        df = df.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+        df['TEXTO'] = df['TEXTO'].astype(str)
+        textos = df['TEXTO'].tolist()
+
+        # 2) Pasos de la limpieza, con los mismos recursos que usa Preprocesado pero sin caches,
+        # para que cada ejecución de la medida haga el mismo trabajo
+        preprocesado = Preprocesado(df, 'TEXTO', tamano_cache_palabras=0, tamano_cache_lemas=0)
+        limpios = registrar('limpieza_texto', len(textos), lambda: [
+            limpieza_texto(texto, patron_mantener, regex_consonantes_repetidas, patron_vocales_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA)
+            for texto in textos])
+        validos = [limpio for limpio in limpios if limpio is not None]
+        registrar('lematizacion', len(validos), lambda: preprocesamiento_lotes(
+            validos, rm_stopwords=True, stemming=False, lematizar=True, STEMMER_EN=preprocesado.STEMMER_EN,
+            SPACY_NLP_EN=preprocesado.SPACY_NLP_EN, STOPWORDS=preprocesado.STOPWORDS, tamano_lote=preprocesado.tamano_lote_spacy))
+        def limpieza_completa():
+            preprocesado.df = df
+            return preprocesado.limpieza()
+        df = registrar('limpieza_completa', len(textos), limpieza_completa)
+
+        # 3) Inferencia
+        clasificador = CLasificadorTexto(modelo_path, vectorizador_path, columna_texto='TEXTO_STOPWORDS_LEMATIZACION')
+        def inferencia():
+            clasificador.asignar_dataframe(df)
+            return clasificador.inferir_columna_texto()
+        registrar('inferencia', len(df), inferencia)
+        tokens = preprocesado.tokens_lematizados
+        registrar('inferencia_tokens', len(df), lambda: clasificador.inferir_tokens(tokens))
+
+        # 4) Guardado, con las columnas que añade `main.py` antes de guardar
+        df = clasificador.anadir_lista_probabilidades()
+        df['CATEGORIA_MODELO'] = clasificador.inferir_columna_texto().emociones()
+        df['CATEGORIA'] = mapear_emociones(df['CATEGORIA'])
+        path_guardado = os.path.join(directorio, 'clasificacion.csv')
+        registrar('guardado', len(df), lambda: GuardarCSV(df).guardar_dataframe(path_guardado, columnas=columnas_deseadas))
+    return etapas
+
+def comparar(etapas, linea_base, tolerancia):
+    """
+    Compara las medidas con la línea base.
+
+    Parámetros:
+    -----------
+    etapas : dict
+        Las medidas de `ejecutar_etapas`.
+    linea_base : dict
+        Las medidas guardadas como línea base.
+    tolerancia : float
+        La pérdida de filas por segundo y el aumento de memoria permitidos, como fracción de la línea base.
+
+    Devoluciones:
+    ------------
+    list of str:
+        Una descripción de cada regresión encontrada.
+    """
+    regresiones = []
+    for nombre, medida in etapas.items():
+        base = linea_base.get(nombre)
+        if base is None:
+            continue
+        if medida['filas_por_segundo'] < base['filas_por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: {medida['filas_por_segundo']:.0f} filas/s frente a {base['filas_por_segundo']:.0f} en la línea base")
+        if medida['memoria_mib'] is not None and base.get('memoria_mib') is not None \
+                and medida['memoria_mib'] > base['memoria_mib'] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: {medida['memoria_mib']:.1f} MiB frente a {base['memoria_mib']:.1f} en la línea base")
+    return regresiones
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del flujo de clasificación sobre un corpus sintético.")
+    parser.add_argument('--filas', type=int, default=20000, help="Número de filas del corpus sintético.")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--repeticiones', type=int, default=3, help="Ejecuciones de cada etapa; se toma el tiempo mínimo.")
+    parser.add_argument('--sin-memoria', action='store_true', help="No mide la memoria máxima (evita la segunda ejecución de cada etapa).")
+    parser.add_argument('--linea-base', default=LINEA_BASE, help="Ruta del JSON con la línea base.")
+    parser.add_argument('--guardar-linea-base', action='store_true', help="Guarda las medidas como nueva línea base.")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    etapas = ejecutar_etapas(args.filas, args.semilla, memoria=not args.sin_memoria, repeticiones=args.repeticiones)
+    print(f"\n{'etapa':<20}{'filas':>10}{'segundos':>12}{'filas/s':>14}{'memoria MiB':>14}")
+    for nombre, medida in etapas.items():
+        memoria = '-' if medida['memoria_mib'] is None else f"{medida['memoria_mib']:.1f}"
+        print(f"{nombre:<20}{medida['filas']:>10}{medida['segundos']:>12.3f}{medida['filas_por_segundo']:>14.0f}{memoria:>14}")
+
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w', encoding='utf-8') as archivo:
+            json.dump({'filas': args.filas, 'etapas': etapas}, archivo, indent=2)
+        print("\nLínea base guardada en", args.linea_base)
+        return 0
+    if not os.path.exists(args.linea_base):
+        print(f"\nERROR: no existe la línea base {args.linea_base}; use --guardar-linea-base para crearla.")
+        return 1
+    with open(args.linea_base, encoding='utf-8') as archivo:
+        linea_base = json.load(archivo)
+    if linea_base.get('filas') != args.filas:
+        print(f"\nAviso: la línea base se midió con {linea_base.get('filas')} filas y esta ejecución con {args.filas}.")
+    regresiones = comparar(etapas, linea_base['etapas'], args.tolerancia)
+    for regresion in regresiones:
+        print("REGRESIÓN", regresion)
+    if not regresiones:
+        print(f"\nSin regresiones respecto a la línea base (tolerancia {args.tolerancia:.0%}).")
+    return 1 if regresiones else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# Benchmark adversarial de la eliminación de palabras repetidas.
+# Compara el bucle con expresión regular de `palabras_repetidas` con `colapsar_palabras_repetidas`
+# en textos diseñados para el peor caso y comprueba que el coste por palabra del nuevo algoritmo
+# no crece con la longitud del texto.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.frases_repetidas [--tamanos 250 500 1000 2000 4000] [--maximo-legado 2000]
+
+# Se importan las librerías pertinentes:
+import argparse
+import sys
+import time
+from src.constantes import *
+from src.funciones import palabras_repetidas, colapsar_palabras_repetidas
+
+# Generadores de textos adversariales de n palabras:
+CASOS = {
+    # Sin ninguna repetición: el patrón prueba todas las longitudes de grupo desde cada palabra
+    'palabras_distintas': lambda n: [f"w{i}" for i in range(n)],
+    # Una misma palabra repetida n veces
+    'misma_palabra': lambda n: ["love"] * n,
+    # Un trigrama repetido hasta llegar a n palabras
+    'ngrama_repetido': lambda n: (["i", "feel", "happy"] * n)[:n],
+    # Grupos casi repetidos que solo se diferencian en la última palabra
+    'casi_repetidos': lambda n: [f"w{i % 7}" if i % 8 else f"x{i}" for i in range(n)],
+    # Repeticiones anidadas, que el bucle de `palabras_repetidas` necesita varias pasadas para eliminar
+    'anidados': lambda n: ((["a", "a", "b"] * 2 + ["c"]) * n)[:n],
+}
+
+def medir(funcion, repeticiones=3):
+    """
+    Mide el menor tiempo de varias ejecuciones de una función.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        La función sin argumentos a medir.
+    repeticiones : int, opcional
+        El número de ejecuciones.
+
+    Devoluciones:
+    ------------
+    float:
+        El menor tiempo en segundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark adversarial de la eliminación de palabras repetidas.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[250, 500, 1000, 2000, 4000],
+                        help="Número de palabras de los textos generados.")
+    parser.add_argument('--maximo-legado', type=int, default=2000,
+                        help="Número máximo de palabras con el que se ejecuta `palabras_repetidas`.")
+    parser.add_argument('--factor-maximo', type=float, default=3.0,
+                        help="Crecimiento máximo permitido del tiempo por palabra entre el tamaño menor y el mayor.")
+    args = parser.parse_args(argumentos)
+
+    print(f"{'caso':<20}{'palabras':>10}{'regex (s)':>14}{'lineal (s)':>14}{'us/palabra':>12}")
+    acotado = True
+    for caso, generar in CASOS.items():
+        por_palabra = []
+        for n in sorted(args.tamanos):
+            palabras = generar(n)
+            frase = " ".join(palabras)
+            tiempo_lineal = medir(lambda: colapsar_palabras_repetidas(palabras, LONGITUD_MAXIMA_FRASE_REPETIDA))
+            if n <= args.maximo_legado:
+                tiempo_legado = f"{medir(lambda: palabras_repetidas(frase, patron_palabras_repetidas), 1):>14.5f}"
+            else:
+                tiempo_legado = f"{'-':>14}"
+            por_palabra.append(tiempo_lineal / n)
+            print(f"{caso:<20}{n:>10}{tiempo_legado}{tiempo_lineal:>14.5f}{tiempo_lineal / n * 1e6:>12.3f}")
+        crecimiento = por_palabra[-1] / por_palabra[0]
+        if crecimiento > args.factor_maximo:
+            print(f"  El tiempo por palabra de '{caso}' crece x{crecimiento:.2f}, por encima de x{args.factor_maximo}")
+            acotado = False
+    return 0 if acotado else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Benchmark de la memoria máxima del flujo completo de `main.py` (lectura, limpieza, inferencia y guardado)
+# sobre un corpus sintético (ver `benchmarks.corpus_sintetico`), expresada por millón de tweets.
+#
+# A diferencia de `benchmarks.etapas`, que usa tracemalloc y por tanto solo ve la memoria que reserva Python, aquí
+# se mide la memoria residente máxima del proceso, que incluye también los búferes de Arrow y de numpy. Antes
+# de ejecutar el flujo se cargan los recursos de lenguaje y se reinicia la marca de memoria máxima, y el corpus y el
+# modelo se preparan en un proceso aparte, de modo que el incremento sobre la memoria de partida corresponde solo a
+# los datos.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.memoria [--filas 200000] [--formato csv]
+
+# Se importan las librerías pertinentes:
+import argparse
+import gc
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from benchmarks.corpus_sintetico import generar_corpus
+from benchmarks.etapas import entrenar_modelo
+
+def _estado_memoria(campo):
+    """
+    Devuelve un campo de memoria de /proc/self/status en MiB, o None si no está disponible.
+    """
+    try:
+        with open('/proc/self/status') as archivo:
+            for linea in archivo:
+                if linea.startswith(campo + ':'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def memoria_actual():
+    """
+    Devuelve la memoria residente del proceso en MiB.
+    """
+    return _estado_memoria('VmRSS')
+
+def memoria_maxima():
+    """
+    Devuelve la memoria residente máxima del proceso en MiB.
+    """
+    pico = _estado_memoria('VmHWM')
+    if pico is None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return pico
+
+def reiniciar_memoria_maxima():
+    """
+    Reinicia la marca de memoria residente máxima del proceso (solo en Linux).
+
+    Devoluciones:
+    ------------
+    bool:
+        Si se ha podido reiniciar.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as archivo:
+            archivo.write('5')
+        return True
+    except OSError:
+        return False
+
+def preparar(filas, semilla, directorio):
+    """
+    Genera el corpus sintético en un CSV y entrena sobre él el modelo y el vectorizador.
+    """
+    corpus = generar_corpus(filas, semilla)
+    corpus.to_csv(os.path.join(directorio, 'corpus.csv'), index=False)
+    entrenar_modelo(corpus, directorio)
+
+def ejecutar_flujo(path_csv, modelo_path, vectorizador_path, path_guardado):
+    """
+    Ejecuta los pasos 2 a 5 de `main.py` en el modo sin bloques.
+
+    Devoluciones:
+    ------------
+    int:
+        El número de filas clasificadas.
+    """
+    from src.constantes import columnas_deseadas, EXTENSION_PARQUET, TIPO_TEXTO
+    from src.clases import LectorCSV, Preprocesado, CLasificadorTexto, GuardarCSV, GuardarParquet, eliminar_columnas
+    from src.resultados import mapear_emociones
+    df = LectorCSV(path_csv).crear_dataframe()
+    df = df.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+    df['ID'] = df['ID'].astype(int)
+    df['TEXTO'] = df['TEXTO'].astype(TIPO_TEXTO)
+    df['CATEGORIA'] = df['CATEGORIA'].astype(int)
+    with Preprocesado(df, 'TEXTO') as preprocesamiento:
+        df = preprocesamiento.limpieza()
+    clasificador = CLasificadorTexto(modelo_path=modelo_path, vectorizador_path=vectorizador_path, df=df, columna_texto='TEXTO_STOPWORDS_LEMATIZACION')
+    resultado = clasificador.inferir_columna_texto(tokens=preprocesamiento.tokens_lematizados)
+    preprocesamiento.tokens_lematizados = None
+    df = eliminar_columnas(df, columnas_deseadas)
+    if not path_guardado.endswith(EXTENSION_PARQUET):
+        df = clasificador.anadir_lista_probabilidades()
+    df['CATEGORIA_MODELO'] = resultado.emociones()
+    df['CATEGORIA'] = mapear_emociones(df['CATEGORIA'])
+    if path_guardado.endswith(EXTENSION_PARQUET):
+        with GuardarParquet(path_guardado, clases=clasificador.modelo.classes_) as guardar:
+            guardar.guardar_dataframe(df, probabilidades=resultado.probabilidades)
+    else:
+        GuardarCSV(df).guardar_dataframe(path_guardado, columnas=columnas_deseadas)
+    return len(df)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Memoria máxima del flujo de main.py por millón de tweets.")
+    parser.add_argument('--filas', type=int, default=200000, help="Filas del corpus sintético.")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv', help="Formato de la tabla clasificada.")
+    args = parser.parse_args(argumentos)
+
+    from src.clases import _cargar_recursos
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso = multiprocessing.Process(target=preparar, args=(args.filas, args.semilla, directorio))
+        proceso.start()
+        proceso.join()
+        path_csv = os.path.join(directorio, 'corpus.csv')
+        modelo_path, vectorizador_path = os.path.join(directorio, 'modelo.pkl'), os.path.join(directorio, 'vectorizador.pkl')
+        # Los recursos de lenguaje se cargan antes de medir, porque su memoria no depende del número de filas
+        _cargar_recursos()
+        gc.collect()
+        reiniciada = reiniciar_memoria_maxima()
+        inicial = memoria_actual() if reiniciada else memoria_maxima()
+        inicio = time.perf_counter()
+        filas = ejecutar_flujo(path_csv, modelo_path, vectorizador_path, os.path.join(directorio, f'clasificacion.{args.formato}'))
+        segundos = time.perf_counter() - inicio
+        pico = memoria_maxima()
+    incremento = pico - inicial
+    print(f"Filas de entrada:                  {args.filas}")
+    print(f"Filas clasificadas:                {filas}")
+    print(f"Tiempo (s):                        {segundos:.1f}")
+    print(f"Memoria de partida (MiB):          {inicial:.1f}")
+    print(f"Memoria máxima (MiB):              {pico:.1f}")
+    print(f"Incremento por millón de tweets:   {incremento / args.filas * 1e6:.0f} MiB")
+    if not reiniciada:
+        print("No se ha podido reiniciar la marca de memoria máxima: el incremento puede estar subestimado.")
+
+if __name__ == '__main__':
+    main()
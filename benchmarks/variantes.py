@@ -0,0 +1,75 @@
+# Benchmark de la generación de las variantes del texto de la limpieza sobre un corpus sintético
+# (ver `benchmarks.corpus_sintetico`). Compara una pasada de `preprocesamiento_lotes` por variante, como
+# hacían las columnas comentadas de `Preprocesado.limpieza`, con `preprocesamiento_variantes`, que obtiene
+# todas las pedidas a partir de los mismos tokens, y comprueba que ambas dan los mismos textos.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.variantes [--filas 20000] [--repeticiones 3]
+
+# Se importan las librerías pertinentes:
+import argparse
+import time
+from src.constantes import *
+from src.funciones import preprocesamiento_lotes, preprocesamiento_variantes
+from benchmarks.corpus_sintetico import generar_corpus
+
+# Operaciones de `preprocesamiento` (rm_stopwords, stemming, lematizar) de cada variante:
+OPERACIONES = {
+    'TEXTO_STOPWORDS': (True, False, False),
+    'TEXTO_STOPWORDS_STEMMING': (True, True, False),
+    'TEXTO_STOPWORDS_LEMATIZACION': (True, False, True),
+    'TEXTO_LEMATIZACION': (False, False, True),
+    'TEXTO_STEMMING': (False, True, False),
+}
+
+def medir(funcion, repeticiones=3):
+    """
+    Ejecuta una función varias veces y devuelve su menor tiempo y su último resultado.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        La función sin argumentos a medir.
+    repeticiones : int, opcional
+        El número de ejecuciones.
+
+    Devoluciones:
+    ------------
+    tuple:
+        El menor tiempo en segundos y el resultado de la función.
+    """
+    mejor = float('inf')
+    for _ in range(max(1, repeticiones)):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de las variantes del texto de la limpieza.")
+    parser.add_argument('--filas', type=int, default=20000, help="Filas del corpus sintético.")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args(argumentos)
+
+    from src.clases import Preprocesado, _cargar_recursos
+    df = generar_corpus(args.filas, semilla=42).rename(columns={"text": "TEXTO"})
+    with Preprocesado(df, 'TEXTO') as preprocesamiento:
+        limpios = preprocesamiento.limpieza()['TEXTO_LIMPIO'].tolist()
+    STEMMER_EN, SPACY_NLP_EN, STOPWORDS = _cargar_recursos()
+
+    # Sin cache de lemas, para medir el coste real de spaCy en cada pasada
+    referencias = {}
+    print(f"{'variantes':>9}{'separadas (s)':>15}{'una pasada (s)':>16}{'aceleración':>13}{'coincidencia':>14}")
+    separadas = 0.0
+    for numero, variante in enumerate(VARIANTES_TEXTO, start=1):
+        tiempo, referencias[variante] = medir(lambda: preprocesamiento_lotes(limpios, *OPERACIONES[variante], STEMMER_EN, SPACY_NLP_EN, STOPWORDS),
+                                              args.repeticiones)
+        separadas += tiempo
+        pedidas = VARIANTES_TEXTO[:numero]
+        una_pasada, resultado = medir(lambda: preprocesamiento_variantes(limpios, pedidas, STEMMER_EN, SPACY_NLP_EN, STOPWORDS),
+                                      args.repeticiones)
+        coincidencia = min(sum(a == b for a, b in zip(resultado[pedida], referencias[pedida])) / len(limpios) for pedida in pedidas)
+        print(f"{numero:>9}{separadas:>15.3f}{una_pasada:>16.3f}{separadas / una_pasada:>12.2f}x{coincidencia:>14.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,50 @@ import time
 from src.constantes import *
 from src.funciones import *
 from src.clases import *
+from src.instrumentacion import Instrumentacion
+
+    # Con argumentos en la línea de comandos se ejecuta el trabajo reanudable por bloques (ver src/trabajo.py):
+    #     python main.py --datos datos.csv --modelo modelo.pkl --vectorizador vectorizador.pkl --salida clasificacion.parquet
+import sys
+if len(sys.argv) > 1:
+    from src.trabajo import main
+    main()
+    raise SystemExit
 
 # 2) Carga de datos:
     # Se registra el tiempo de inicio
 tiempo_inicio = time.time()
 archivo_csv = '/ruta_de_datos/.csv'  # Introducir ruta
+modelo_path_RL = "/ruta_del_modelo/modelo_TF_SDG_SW_L.pkl"  # Introducir ruta
+vectorizador_path_RL = "/ruta_del_vectorizador/vectorizador_TF_SDG_SW_L.pkl"  # Introducir ruta
+clasificacion_csv = '/ruta_de_destino/clasificacion_automatica.csv' # Introducir ruta (con extensión .parquet se guarda en formato columnar)
+metricas_json = '/ruta_de_destino/metricas_ejecucion.json' # Introducir ruta
+metricas_prometheus = '/ruta_de_destino/metricas_ejecucion.prom' # Introducir ruta
+    # Se miden el tiempo y las filas de cada etapa; con perfilar=True se añade el perfil de src/funciones.py
+instrumentacion = Instrumentacion(perfilar=False)
+    # Número de procesos con los que se realiza la limpieza
+n_procesos = 1
+    # Si se activa, el CSV se lee, limpia, clasifica y guarda por bloques con memoria acotada
+modo_por_bloques = False
+    # En el modo por bloques, ruta de la cache de resultados en SQLite (None para no usarla)
+path_cache = None
+    # Cascada opcional: las filas cuya probabilidad máxima no llega a umbral_cascada se vuelven a clasificar
+    # con un segundo modelo más preciso y más caro (None para no usarla)
+modelo_path_escalado = None  # Introducir ruta
+vectorizador_path_escalado = None  # Introducir ruta
+umbral_cascada = UMBRAL_CONFIANZA_CASCADA
+escalado = None
+if modelo_path_escalado is not None:
+    escalado = CLasificadorTexto(modelo_path=modelo_path_escalado, vectorizador_path=vectorizador_path_escalado, instrumentacion=instrumentacion)
+if modo_por_bloques:
+    procesador = ProcesadorPorBloques(archivo_csv, modelo_path_RL, vectorizador_path_RL, tamano_bloque=TAMANO_BLOQUE_LECTURA, n_procesos=n_procesos,
+                                      instrumentacion=instrumentacion, path_cache=path_cache, escalado=escalado, umbral_confianza=umbral_cascada)
+    procesador.ejecutar(clasificacion_csv)
+    instrumentacion.exportar(metricas_json, metricas_prometheus)
+    print("Tiempo total de ejecución:", time.time() - tiempo_inicio, "segundos")
+    raise SystemExit
     # Se crea una instancia de CSVReader
-csv_reader = LectorCSV(archivo_csv)
+csv_reader = LectorCSV(archivo_csv, instrumentacion=instrumentacion)
 df = csv_reader.crear_dataframe()
     # Se cambian los nombres de las columnas
 df = df.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
@@ -19,46 +56,45 @@ df = df.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA
 # 3) Preprocesamiento de datos:
     # Se convierten las variables a su tipo correspondiente
 df['ID'] = df['ID'].astype(int)
-df['TEXTO'] = df['TEXTO'].astype(str)
+df['TEXTO'] = df['TEXTO'].astype(TIPO_TEXTO)
 df['CATEGORIA'] = df['CATEGORIA'].astype(int)
-    # Preprocesado y limpieza de la columna TEXTO
-preprocesamiento = Preprocesado(df,'TEXTO')
-df = preprocesamiento.limpieza()
+    # Columna preprocesada con la que se clasifica ('TEXTO_LIMPIO' o una de VARIANTES_TEXTO)
+columna_texto_1 = 'TEXTO_STOPWORDS_LEMATIZACION'
+    # Preprocesado y limpieza de la columna TEXTO, con la variante que necesita el clasificador
+with Preprocesado(df, 'TEXTO', n_procesos=n_procesos, variantes=variantes_columna(columna_texto_1), instrumentacion=instrumentacion) as preprocesamiento:
+    df = preprocesamiento.limpieza()
 
 # 4) Clasificación y predicción:
-    # Se crean las variables con las rutas de vector y modelo
-modelo_path_RL = "/ruta_del_modelo/modelo_TF_SDG_SW_L.pkl"  # Introducir ruta
-vectorizador_path_RL = "/ruta_del_vectorizador/vectorizador_TF_SDG_SW_L.pkl"  # Introducir ruta
 df_1 = df
-columna_texto_1 = 'TEXTO_STOPWORDS_LEMATIZACION'
     # Se instancia el clasificador con el DataFrame y la columna de texto
-clasificador_RL = CLasificadorTexto(modelo_path=modelo_path_RL, vectorizador_path=vectorizador_path_RL, df=df_1, columna_texto=columna_texto_1)
-clasificaciones_RL = clasificador_RL.clasificar_columna_texto()
-probabilidades_RL= clasificador_RL.predecir_probabilidades_columna_texto()
+clasificador_RL = CLasificadorTexto(modelo_path=modelo_path_RL, vectorizador_path=vectorizador_path_RL, df=df_1, columna_texto=columna_texto_1,
+                                    instrumentacion=instrumentacion, escalado=escalado, umbral_confianza=umbral_cascada)
+    # Si se clasifica la columna lematizada, se vectorizan directamente sus tokens, sin volver a separar la columna
+tokens_1 = preprocesamiento.tokens_lematizados if columna_texto_1 == COLUMNA_TEXTO_TOKENS else None
+resultado_RL = clasificador_RL.inferir_columna_texto(tokens=tokens_1)
+    # Se liberan los tokens y las columnas intermedias en cuanto se han usado, sin copiar el DataFrame
+preprocesamiento.tokens_lematizados = None
+df = eliminar_columnas(df, columnas_deseadas)
 
 # 5) Guardado de datos:
+    # La columna de listas de probabilidades solo se crea para el CSV; en Parquet se guarda la matriz
+if not clasificacion_csv.endswith(EXTENSION_PARQUET):
+    df = clasificador_RL.anadir_lista_probabilidades()
     # Se cambian los códigos de las clases por los nombres de las emociones antes de guardar el csv.
-columnas_deseadas = ['ID', 'TEXTO', 'TEXTO_LIMPIO', 'CATEGORIA', 'CATEGORIA_MODELO', 'PROBABILIDADES_CATEGORIAS', 'PROBABILIDAD_MAXIMA']
-df = df.loc[:, columnas_deseadas]
-# Se define un diccionario de mapeo
-mapeo_emociones = {
-    0: 'Tristeza',
-    1: 'Alegría',
-    2: 'Amor',
-    3: 'Ira',
-    4: 'Miedo',
-    5: 'Sorpresa'
-}
 # Se reemplazan los números por las emociones correspondientes
-df['CATEGORIA_MODELO'] = df['CATEGORIA_MODELO'].replace(mapeo_emociones)
-df['CATEGORIA'] = df['CATEGORIA'].replace(mapeo_emociones)
+df['CATEGORIA_MODELO'] = resultado_RL.emociones()
+df['CATEGORIA'] = mapear_emociones(df['CATEGORIA'])
 
     # Se guarda la tabla clasificada en la ruta que se desee especificar
-clasificacion_csv = '/ruta_de_destino/clasificacion_automatica.csv' # Introducir ruta
-if df is not None:
-    guardar = GuardarCSV(df)
+if df is not None and clasificacion_csv.endswith(EXTENSION_PARQUET):
+    with GuardarParquet(clasificacion_csv, clases=clasificador_RL.modelo.classes_, instrumentacion=instrumentacion) as guardar:
+        guardar.guardar_dataframe(df, probabilidades=resultado_RL.probabilidades)
+elif df is not None:
+    guardar = GuardarCSV(df, instrumentacion=instrumentacion)
     guardar.guardar_dataframe(clasificacion_csv, columnas=columnas_deseadas) 
 
+    # Se guardan las métricas de cada etapa
+instrumentacion.exportar(metricas_json, metricas_prometheus)
     # Se registra el tiempo de finalización
 tiempo_fin = time.time()
     # Calcula el tiempo total de ejecución
@@ -0,0 +1,373 @@
+# Formato compacto de artefactos para el vectorizador y el modelo, pensado para mapearse en memoria.
+#
+# El archivo contiene una cabecera JSON y, alineados a 64 bytes, los arrays:
+#   - 'vocabulario': los términos del vectorizador ordenados, como bytes UTF-8 de ancho fijo.
+#   - 'columnas': la columna de la matriz de cada término de 'vocabulario' (int32).
+#   - 'coef' e 'intercept': los pesos del modelo lineal (float32).
+#   - 'clases': las clases del modelo.
+# Al cargarlo con `cargar_artefacto` los arrays se leen directamente del mapa en memoria, por lo que todos
+# los procesos que usan el mismo archivo comparten una sola copia física y la carga es casi inmediata.
+#
+# Exportación desde los .pkl (desde la raíz del repositorio):
+#     python -m src.artefactos modelos/modelo_TF_SDG_SW_L.pkl modelos/vectorizador_TF_SDG_SW_L.pkl modelos/modelo_TF_SDG_SW_L.mmap [textos.csv]
+# Antes de sustituir el archivo de salida se comprueba que el artefacto da las mismas predicciones que los .pkl
+# sobre los textos de la columna 'text' del CSV indicado o, si no se indica, sobre textos formados con el vocabulario.
+
+# Se importan las librerías pertinentes:
+import json
+import mmap
+import os
+import struct
+import sys
+from src.recursos import importar_perezoso
+
+np = importar_perezoso("numpy")
+
+# Identificador del formato al inicio del archivo:
+FIRMA_ARTEFACTO = b"CLTXMM01"
+# Extensión de los archivos de artefacto mapeado:
+EXTENSION_ARTEFACTO = ".mmap"
+# Alineación en bytes de cada array dentro del archivo:
+ALINEACION = 64
+# Parámetros del vectorizador que se guardan para reconstruir su analizador:
+PARAMETROS_ANALIZADOR = ('analyzer', 'lowercase', 'strip_accents', 'token_pattern', 'ngram_range', 'stop_words', 'encoding', 'decode_error')
+# Modelos lineales soportados, cuya decisión es X·coef + intercept:
+MODELOS_SOPORTADOS = ('SGDClassifier', 'LogisticRegression', 'LinearSVC', 'RidgeClassifier')
+
+def _tipo_probabilidad(modelo):
+    """
+    Determina cómo calcula el modelo `predict_proba` a partir de la función de decisión.
+
+    Parámetros:
+    -----------
+    modelo : estimador de scikit-learn
+        El modelo lineal entrenado.
+
+    Devoluciones:
+    ------------
+    str o None:
+        'modified_huber', 'logistica_ovr', 'softmax', o None si el modelo no tiene `predict_proba`.
+    """
+    nombre = type(modelo).__name__
+    if nombre == 'SGDClassifier':
+        if modelo.loss == 'modified_huber':
+            return 'modified_huber'
+        if modelo.loss in ('log', 'log_loss'):
+            return 'logistica_ovr'
+        return None
+    if nombre == 'LogisticRegression':
+        multi_class = getattr(modelo, 'multi_class', 'auto')
+        if len(modelo.classes_) <= 2 or multi_class in ('ovr', 'warn') or (multi_class == 'auto' and modelo.solver == 'liblinear'):
+            return 'logistica_ovr'
+        return 'softmax'
+    return None
+
+def exportar_artefacto(vectorizador, modelo, path, textos_verificacion=None):
+    """
+    Guarda un vectorizador y un modelo lineal en el formato compacto mapeable en memoria.
+
+    Parámetros:
+    -----------
+    vectorizador : CountVectorizer
+        El vectorizador entrenado.
+    modelo : estimador lineal de scikit-learn
+        El modelo entrenado, uno de `MODELOS_SOPORTADOS`.
+    path : str
+        La ruta del archivo de salida.
+    textos_verificacion : list of str, opcional
+        Textos con los que se comprueba, tras guardar, que el artefacto da las mismas predicciones que los originales.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si el vectorizador o el modelo no se pueden representar en este formato, o si las predicciones
+        del artefacto no coinciden con las de los originales. En ese caso `path` no se modifica.
+    """
+    if hasattr(vectorizador, 'idf_') or not hasattr(vectorizador, 'vocabulary_'):
+        raise ValueError("Solo se pueden exportar vectorizadores CountVectorizer entrenados.")
+    parametros = {nombre: getattr(vectorizador, nombre) for nombre in PARAMETROS_ANALIZADOR}
+    if callable(parametros['analyzer']) or vectorizador.preprocessor is not None or vectorizador.tokenizer is not None:
+        raise ValueError("No se pueden exportar vectorizadores con analizador, preprocesador o tokenizador propios.")
+    if type(modelo).__name__ not in MODELOS_SOPORTADOS:
+        raise ValueError(f"Solo se pueden exportar los modelos {MODELOS_SOPORTADOS}.")
+    if modelo.coef_.shape[1] != len(vectorizador.vocabulary_):
+        raise ValueError("El número de columnas del modelo no coincide con el vocabulario del vectorizador.")
+    parametros['ngram_range'] = list(parametros['ngram_range'])
+    if isinstance(parametros['stop_words'], (set, frozenset)):
+        parametros['stop_words'] = sorted(parametros['stop_words'])
+
+    terminos = sorted(vectorizador.vocabulary_)
+    arrays = {
+        'vocabulario': np.array([termino.encode('utf-8') for termino in terminos]),
+        'columnas': np.array([vectorizador.vocabulary_[termino] for termino in terminos], dtype=np.int32),
+        'coef': np.ascontiguousarray(modelo.coef_, dtype=np.float32),
+        'intercept': np.ascontiguousarray(np.atleast_1d(modelo.intercept_), dtype=np.float32),
+        'clases': np.ascontiguousarray(modelo.classes_),
+    }
+    cabecera = {
+        'vectorizador': {'parametros': parametros, 'binary': bool(vectorizador.binary), 'dtype': np.dtype(vectorizador.dtype).str},
+        'modelo': {'tipo': type(modelo).__name__, 'probabilidad': _tipo_probabilidad(modelo)},
+        'arrays': {},
+    }
+    desplazamiento = 0
+    for nombre, array in arrays.items():
+        desplazamiento = -(-desplazamiento // ALINEACION) * ALINEACION
+        cabecera['arrays'][nombre] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': desplazamiento}
+        desplazamiento += array.nbytes
+    cabecera_bytes = json.dumps(cabecera).encode('utf-8')
+    # Los datos empiezan en una posición alineada tras la firma, la longitud de la cabecera y la cabecera
+    inicio_datos = -(-(len(FIRMA_ARTEFACTO) + 8 + len(cabecera_bytes)) // ALINEACION) * ALINEACION
+    # Se escribe y se verifica un temporal en el mismo directorio, que luego sustituye al archivo de forma atómica,
+    # para que los procesos que mapean `path` nunca vean un artefacto a medio escribir
+    temporal = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'wb') as archivo:
+            archivo.write(FIRMA_ARTEFACTO)
+            archivo.write(struct.pack('<Q', len(cabecera_bytes)))
+            archivo.write(cabecera_bytes)
+            for nombre, array in arrays.items():
+                archivo.write(b"\0" * (inicio_datos + cabecera['arrays'][nombre]['offset'] - archivo.tell()))
+                archivo.write(array.tobytes())
+
+        if textos_verificacion is not None:
+            vectorizador_mapeado, modelo_mapeado = cargar_artefacto(temporal)
+            original = modelo.predict(vectorizador.transform(textos_verificacion))
+            mapeado = modelo_mapeado.predict(vectorizador_mapeado.transform(textos_verificacion))
+            if not np.array_equal(original, mapeado):
+                raise ValueError("Las predicciones del artefacto no coinciden con las del modelo original.")
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    os.replace(temporal, path)
+
+def cargar_artefacto(path):
+    """
+    Mapea en memoria un artefacto guardado con `exportar_artefacto`.
+
+    Parámetros:
+    -----------
+    path : str
+        La ruta al archivo del artefacto.
+
+    Devoluciones:
+    ------------
+    tuple:
+        El VectorizadorMapeado y el ModeloMapeado, con la misma interfaz de `transform`, `predict`,
+        `predict_proba` y `classes_` que los objetos de scikit-learn.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si el archivo no es un artefacto de este formato.
+    """
+    with open(path, 'rb') as archivo:
+        buffer = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(FIRMA_ARTEFACTO)] != FIRMA_ARTEFACTO:
+        raise ValueError(f"El archivo {path} no es un artefacto mapeable.")
+    (longitud_cabecera,) = struct.unpack_from('<Q', buffer, len(FIRMA_ARTEFACTO))
+    inicio_cabecera = len(FIRMA_ARTEFACTO) + 8
+    cabecera = json.loads(bytes(buffer[inicio_cabecera:inicio_cabecera + longitud_cabecera]))
+    inicio_datos = -(-(inicio_cabecera + longitud_cabecera) // ALINEACION) * ALINEACION
+    arrays = {}
+    for nombre, descripcion in cabecera['arrays'].items():
+        dtype = np.dtype(descripcion['dtype'])
+        cantidad = int(np.prod(descripcion['shape'], dtype=np.int64))
+        arrays[nombre] = np.frombuffer(buffer, dtype=dtype, count=cantidad, offset=inicio_datos + descripcion['offset']).reshape(descripcion['shape'])
+    vectorizador = VectorizadorMapeado(arrays['vocabulario'], arrays['columnas'], **cabecera['vectorizador'])
+    modelo = ModeloMapeado(arrays['coef'], arrays['intercept'], arrays['clases'], cabecera['modelo']['probabilidad'])
+    return vectorizador, modelo
+
+# Clase con la interfaz de CountVectorizer.transform sobre un vocabulario mapeado en memoria:
+class VectorizadorMapeado:
+    def __init__(self, vocabulario, columnas, parametros, binary, dtype):
+        """
+        Inicializa el objeto VectorizadorMapeado.
+
+        Parámetros:
+        -----------
+        vocabulario : numpy.ndarray
+            Los términos ordenados, como bytes UTF-8 de ancho fijo.
+        columnas : numpy.ndarray
+            La columna de la matriz de cada término.
+        parametros : dict
+            Los parámetros del analizador del CountVectorizer original.
+        binary : bool
+            Si las cuentas se sustituyen por 1.
+        dtype : str
+            El tipo de dato de la matriz resultante.
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+        parametros = dict(parametros, ngram_range=tuple(parametros['ngram_range']))
+        self.vocabulario = vocabulario
+        self.columnas = columnas
+        self.parametros = parametros
+        self.binary = binary
+        self.dtype = np.dtype(dtype)
+        self.analizador = CountVectorizer(**parametros).build_analyzer()
+
+    def buscar_terminos(self, terminos):
+        """
+        Busca las columnas de una lista de términos en el vocabulario ordenado.
+
+        Parámetros:
+        -----------
+        terminos : list of str
+            Los términos a buscar.
+
+        Devoluciones:
+        ------------
+        numpy.ndarray:
+            La columna de cada término, o -1 si no está en el vocabulario.
+        """
+        if len(self.vocabulario) == 0:
+            return np.full(len(terminos), -1, dtype=np.intp)
+        codificados = [termino.encode('utf-8') for termino in terminos]
+        # Los términos más largos que el ancho del vocabulario no pueden estar y se descartan antes de convertirlos,
+        # ya que la conversión a ancho fijo los recortaría
+        validos = np.fromiter((len(codificado) <= self.vocabulario.itemsize for codificado in codificados), dtype=bool, count=len(codificados))
+        candidatos = np.array(codificados, dtype=self.vocabulario.dtype) if codificados else np.empty(0, dtype=self.vocabulario.dtype)
+        posiciones = np.searchsorted(self.vocabulario, candidatos)
+        posiciones[posiciones == len(self.vocabulario)] = 0
+        encontrados = validos & (self.vocabulario[posiciones] == candidatos)
+        return np.where(encontrados, self.columnas[posiciones], -1)
+
+    def transform(self, textos):
+        """
+        Convierte una secuencia de textos en la matriz dispersa de cuentas de términos.
+
+        Parámetros:
+        -----------
+        textos : iterable of str
+            Los textos a vectorizar.
+
+        Devoluciones:
+        ------------
+        scipy.sparse.csr_matrix:
+            La misma matriz que devolvería `CountVectorizer.transform`.
+        """
+        from scipy import sparse
+        terminos_textos = [self.analizador(texto) for texto in textos]
+        longitudes = np.fromiter((len(terminos) for terminos in terminos_textos), dtype=np.int64, count=len(terminos_textos))
+        columnas = self.buscar_terminos([termino for terminos in terminos_textos for termino in terminos])
+        filas = np.repeat(np.arange(len(terminos_textos)), longitudes)
+        encontrados = columnas >= 0
+        matriz = sparse.csr_matrix((np.ones(int(encontrados.sum()), dtype=self.dtype), (filas[encontrados], columnas[encontrados])),
+                                   shape=(len(terminos_textos), len(self.columnas)))
+        matriz.sum_duplicates()
+        if self.binary:
+            matriz.data[:] = 1
+        return matriz
+
+# Clase con la interfaz de predicción de un modelo lineal de scikit-learn sobre pesos mapeados en memoria:
+class ModeloMapeado:
+    def __init__(self, coef, intercept, clases, probabilidad):
+        """
+        Inicializa el objeto ModeloMapeado.
+
+        Parámetros:
+        -----------
+        coef : numpy.ndarray
+            Los pesos del modelo, (n_clases, n_terminos) o (1, n_terminos) en modelos binarios.
+        intercept : numpy.ndarray
+            Los términos independientes.
+        clases : numpy.ndarray
+            Las clases del modelo.
+        probabilidad : str o None
+            Cómo se calcula `predict_proba` ('modified_huber', 'logistica_ovr' o 'softmax').
+        """
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = clases
+        self.probabilidad = probabilidad
+
+    def decision_function(self, X):
+        """
+        Calcula la función de decisión X·coef + intercept.
+
+        Parámetros:
+        -----------
+        X : scipy.sparse matrix
+            La matriz de términos.
+
+        Devoluciones:
+        ------------
+        numpy.ndarray:
+            Las puntuaciones, (n_textos,) en modelos binarios o (n_textos, n_clases).
+        """
+        puntuaciones = np.asarray(X @ self.coef_.T, dtype=np.float64) + self.intercept_
+        return puntuaciones.ravel() if puntuaciones.shape[1] == 1 else puntuaciones
+
+    def predict(self, X):
+        puntuaciones = self.decision_function(X)
+        if puntuaciones.ndim == 1:
+            return self.classes_[(puntuaciones > 0).astype(int)]
+        return self.classes_[puntuaciones.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        puntuaciones = self.decision_function(X)
+        if self.probabilidad == 'softmax':
+            puntuaciones = puntuaciones - puntuaciones.max(axis=1, keepdims=True)
+            probabilidades = np.exp(puntuaciones)
+            return probabilidades / probabilidades.sum(axis=1, keepdims=True)
+        if self.probabilidad == 'logistica_ovr':
+            probabilidades = 1.0 / (1.0 + np.exp(-puntuaciones))
+            if probabilidades.ndim == 1:
+                return np.column_stack([1 - probabilidades, probabilidades])
+            return probabilidades / probabilidades.sum(axis=1, keepdims=True)
+        if self.probabilidad == 'modified_huber':
+            if puntuaciones.ndim == 1:
+                positiva = (np.clip(puntuaciones, -1, 1) + 1) / 2
+                return np.column_stack([1 - positiva, positiva])
+            probabilidades = (np.clip(puntuaciones, -1, 1) + 1) / 2
+            suma = probabilidades.sum(axis=1)
+            todo_cero = suma == 0
+            probabilidades[todo_cero, :] = 1
+            suma[todo_cero] = len(self.classes_)
+            return probabilidades / suma[:, np.newaxis]
+        raise AttributeError("El modelo exportado no tiene predict_proba.")
+
+def textos_vocabulario(vectorizador, n_textos=200, terminos_por_texto=10):
+    """
+    Construye textos de verificación a partir del vocabulario del vectorizador, para comprobar el artefacto
+    cuando no se dispone de textos reales.
+
+    Parámetros:
+    -----------
+    vectorizador : CountVectorizer
+        El vectorizador entrenado.
+    n_textos : int, opcional
+        El número máximo de textos (200 por defecto).
+    terminos_por_texto : int, opcional
+        El número de términos de cada texto (10 por defecto).
+
+    Devoluciones:
+    ------------
+    list of str:
+        Textos formados por términos del vocabulario repartidos de forma uniforme.
+    """
+    terminos = sorted(vectorizador.vocabulary_)
+    paso = max(1, len(terminos) // (n_textos * terminos_por_texto))
+    muestra = terminos[::paso][:n_textos * terminos_por_texto]
+    return [" ".join(muestra[i:i + terminos_por_texto]) for i in range(0, len(muestra), terminos_por_texto)]
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    if len(argumentos) not in (3, 4):
+        print("Uso: python -m src.artefactos <modelo.pkl> <vectorizador.pkl> <salida.mmap> [textos.csv]")
+        return 1
+    import joblib
+    modelo, vectorizador = joblib.load(argumentos[0]), joblib.load(argumentos[1])
+    # Sin un CSV de textos (columna 'text') se verifica con textos formados por términos del vocabulario,
+    # de modo que el artefacto siempre se comprueba antes de sustituir el archivo de salida
+    if len(argumentos) == 4:
+        import pandas as pd
+        textos = pd.read_csv(argumentos[3], usecols=['text'], nrows=1000)['text'].fillna('').tolist()
+    else:
+        textos = textos_vocabulario(vectorizador)
+    exportar_artefacto(vectorizador, modelo, argumentos[2], textos_verificacion=textos)
+    print("El artefacto fue guardado correctamente en", argumentos[2])
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# Se importan las librerías pertinentes:
+import threading
+from collections import OrderedDict
+
+# Políticas de expulsión que admite CacheAcotada:
+POLITICAS_CACHE = ('lru', 'fifo')
+
+# Clase para memorizar resultados con un tamaño máximo:
+class CacheAcotada:
+    def __init__(self, tamano_maximo, politica='lru'):
+        """
+        Inicializa el objeto CacheAcotada.
+
+        Es segura entre hilos. Entre procesos no se comparte: cada proceso del pool crea la suya.
+
+        Parámetros:
+        -----------
+        tamano_maximo : int
+            El número máximo de entradas que se guardan. Con 0 no se guarda nada.
+        politica : str, opcional
+            La política de expulsión cuando la cache está llena: 'lru' expulsa la entrada usada hace más tiempo
+            y 'fifo' la que se insertó antes.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si la política no es una de `POLITICAS_CACHE`.
+        """
+        if politica not in POLITICAS_CACHE:
+            raise ValueError(f"La política de la cache debe ser una de {POLITICAS_CACHE}.")
+        self.tamano_maximo = tamano_maximo
+        self.politica = politica
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, clave, calcular):
+        """
+        Devuelve el valor de una clave, calculándolo y guardándolo si no está en la cache.
+
+        Parámetros:
+        -----------
+        clave : hashable
+            La clave a buscar.
+        calcular : callable
+            Función que recibe la clave y devuelve su valor.
+
+        Devoluciones:
+        ------------
+        object:
+            El valor de la clave.
+        """
+        return self.obtener_varios([clave], calcular)[0]
+
+    def obtener_varios(self, claves, calcular):
+        """
+        Devuelve los valores de varias claves, calculando una a una las que no están en la cache.
+
+        Las claves ausentes se calculan fuera del cerrojo, por lo que otros hilos pueden usar la cache mientras tanto.
+
+        Parámetros:
+        -----------
+        claves : list
+            Las claves a buscar.
+        calcular : callable
+            Función que recibe una clave y devuelve su valor.
+
+        Devoluciones:
+        ------------
+        list:
+            Los valores de las claves, en el mismo orden.
+        """
+        encontrados = {}
+        pendientes = {}
+        with self._cerrojo:
+            for clave in claves:
+                if clave in pendientes:
+                    # Una clave repetida solo cuenta como acierto si se va a guardar
+                    if self.tamano_maximo > 0:
+                        self.aciertos += 1
+                    else:
+                        self.fallos += 1
+                elif clave in encontrados:
+                    self.aciertos += 1
+                elif clave in self._entradas:
+                    self.aciertos += 1
+                    encontrados[clave] = self._consultar(clave)
+                else:
+                    self.fallos += 1
+                    pendientes[clave] = None
+        # El cálculo se hace fuera del cerrojo para no bloquear a otros hilos mientras dura
+        if pendientes:
+            calculados = {clave: calcular(clave) for clave in pendientes}
+            encontrados.update(calculados)
+            self._insertar(calculados)
+        return [encontrados[clave] for clave in claves]
+
+    def obtener_lote(self, claves, calcular_lote):
+        """
+        Devuelve los valores de varias claves calculando de una sola vez las que no están en la cache.
+
+        Cada clave ausente se calcula una única vez aunque aparezca repetida en `claves`.
+
+        Parámetros:
+        -----------
+        claves : list
+            Las claves a buscar.
+        calcular_lote : callable
+            Función que recibe la lista de claves ausentes y devuelve la lista de sus valores en el mismo orden.
+
+        Devoluciones:
+        ------------
+        list:
+            Los valores de las claves, en el mismo orden.
+        """
+        encontrados = {}
+        pendientes = {}
+        with self._cerrojo:
+            for clave in claves:
+                if clave in encontrados or clave in pendientes:
+                    self.aciertos += 1
+                elif clave in self._entradas:
+                    self.aciertos += 1
+                    encontrados[clave] = self._consultar(clave)
+                else:
+                    self.fallos += 1
+                    pendientes[clave] = None
+        # El cálculo se hace fuera del cerrojo para no bloquear a otros hilos mientras dura
+        if pendientes:
+            calculados = dict(zip(pendientes, calcular_lote(list(pendientes))))
+            encontrados.update(calculados)
+            self._insertar(calculados)
+        return [encontrados[clave] for clave in claves]
+
+    def _consultar(self, clave):
+        """
+        Devuelve el valor de una clave presente y, con la política 'lru', la marca como la usada más recientemente.
+        Se llama con el cerrojo tomado.
+        """
+        if self.politica == 'lru':
+            self._entradas.move_to_end(clave)
+        return self._entradas[clave]
+
+    def _insertar(self, calculados):
+        """
+        Guarda los valores calculados fuera del cerrojo, expulsando entradas si se supera el tamaño máximo.
+
+        Si otro hilo ha guardado una clave mientras tanto, se conserva su entrada y su posición, de modo que con
+        la política 'fifo' el orden sigue siendo el de la primera inserción.
+        """
+        if self.tamano_maximo <= 0:
+            return
+        with self._cerrojo:
+            for clave, valor in calculados.items():
+                if clave in self._entradas:
+                    if self.politica == 'lru':
+                        self._entradas.move_to_end(clave)
+                    continue
+                self._entradas[clave] = valor
+                if len(self._entradas) > self.tamano_maximo:
+                    self._entradas.popitem(last=False)
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de uso de la cache.
+
+        Devoluciones:
+        ------------
+        dict:
+            Aciertos, fallos, tasa de aciertos, número de entradas, tamaño máximo y política.
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'entradas': len(self._entradas),
+            'tamano_maximo': self.tamano_maximo,
+            'politica': self.politica,
+        }
+
+    def limpiar(self):
+        """
+        Vacía la cache y reinicia los contadores.
+        """
+        with self._cerrojo:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+def sumar_estadisticas(estadisticas):
+    """
+    Suma los contadores de varias caches, por ejemplo las de los procesos de un pool.
+
+    Parámetros:
+    -----------
+    estadisticas : iterable of dict
+        Resultados de `CacheAcotada.estadisticas`.
+
+    Devoluciones:
+    ------------
+    dict:
+        Aciertos, fallos, tasa de aciertos y número de entradas sumados.
+    """
+    total = {'aciertos': 0, 'fallos': 0, 'entradas': 0}
+    for estadistica in estadisticas:
+        for clave in total:
+            total[clave] += estadistica[clave]
+    consultas = total['aciertos'] + total['fallos']
+    total['tasa_aciertos'] = total['aciertos'] / consultas if consultas else 0.0
+    return total
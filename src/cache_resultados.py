@@ -0,0 +1,415 @@
+# Cache persistente de resultados en SQLite.
+#
+# Cada texto se identifica por el hash de su contenido junto con la huella del modelo y del vectorizador, y
+# se guardan su texto limpio, su texto lematizado, la categoría predicha y las probabilidades. Los textos que
+# ya se clasificaron en una ejecución anterior, y los repetidos dentro de un mismo lote, no vuelven a pasar
+# por el preprocesado ni por el clasificador.
+#
+# La huella se calcula a partir del contenido de los archivos del modelo y del vectorizador y de
+# `VERSION_PREPROCESADO` (y, con una cascada de modelos, de los de cada nivel y sus umbrales, y de la columna que
+# se clasifica si no es `COLUMNA_TEXTO_TOKENS`). Si cambia, la
+# cache se vacía al abrirla. Si el clasificador cambia de modelo mientras se usa (ver
+# `CLasificadorTexto.actualizar_modelo`), la huella se vuelve a calcular.
+
+# Se importan las librerías pertinentes:
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from src.constantes import VERSION_PREPROCESADO, CLAVES_POR_CONSULTA, TIPO_TEXTO, COLUMNA_TEXTO_TOKENS
+from src.funciones import variantes_columna
+from src.recursos import importar_perezoso, obtener_recurso
+from src.resultados import ResultadoClasificacion
+from src.instrumentacion import medir_etapa
+
+np = importar_perezoso("numpy")
+pd = importar_perezoso("pandas")
+
+# Función para calcular la huella de los artefactos:
+def huella_archivos(*paths):
+    """
+    Calcula la huella del contenido de unos archivos y de la versión del preprocesado.
+
+    La huella de cada archivo se memoriza en el registro del proceso junto con su fecha de modificación,
+    por lo que solo se vuelve a leer el archivo si cambia.
+
+    Parámetros:
+    -----------
+    *paths : str
+        Las rutas de los archivos (modelo y vectorizador, o el artefacto mapeado). Se ignoran los None.
+
+    Devoluciones:
+    ------------
+    str:
+        La huella en hexadecimal.
+    """
+    huella = hashlib.sha256(f"preprocesado-{VERSION_PREPROCESADO}".encode())
+    for path in paths:
+        if path is None:
+            continue
+        path = os.path.abspath(path)
+        def calcular():
+            contenido = hashlib.sha256()
+            with open(path, 'rb') as archivo:
+                for bloque in iter(lambda: archivo.read(1 << 20), b''):
+                    contenido.update(bloque)
+            return contenido.digest()
+        huella.update(obtener_recurso(('huella', path, os.stat(path).st_mtime_ns), calcular))
+    return huella.hexdigest()
+
+def huella_objetos(*objetos):
+    """
+    Calcula la huella del contenido de unos objetos en memoria y de la versión del preprocesado.
+
+    Se usa con los modelos que no proceden de un archivo, por ejemplo los que publica el entrenamiento incremental.
+
+    Parámetros:
+    -----------
+    *objetos : object
+        El vectorizador y el modelo.
+
+    Devoluciones:
+    ------------
+    str:
+        La huella en hexadecimal.
+    """
+    huella = hashlib.sha256(f"preprocesado-{VERSION_PREPROCESADO}".encode())
+    for objeto in objetos:
+        huella.update(hashlib.sha256(pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL)).digest())
+    return huella.hexdigest()
+
+def huella_clasificador(clasificador):
+    """
+    Calcula la huella de un CLasificadorTexto: la de sus archivos o, si no tiene, la de su contenido en memoria.
+
+    Si el clasificador es el primer nivel de una cascada, la huella incluye la de cada nivel y su umbral, y si
+    clasifica una columna distinta de `COLUMNA_TEXTO_TOKENS`, el nombre de la columna.
+
+    Parámetros:
+    -----------
+    clasificador : CLasificadorTexto
+        El clasificador.
+
+    Devoluciones:
+    ------------
+    str:
+        La huella en hexadecimal.
+    """
+    partes = []
+    columna_texto = clasificador.columna_texto
+    while clasificador is not None:
+        if clasificador.modelo_path is not None:
+            partes.append(huella_archivos(clasificador.modelo_path, clasificador.vectorizador_path))
+        else:
+            partes.append(huella_objetos(clasificador.vectorizador, clasificador.modelo))
+        if clasificador.escalado is not None:
+            partes.append(repr(clasificador.umbral_confianza))
+        clasificador = clasificador.escalado
+    if columna_texto not in (None, COLUMNA_TEXTO_TOKENS):
+        partes.append(columna_texto)
+    if len(partes) == 1:
+        return partes[0]
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+def _versiones(clasificador):
+    versiones = []
+    while clasificador is not None:
+        versiones.append(clasificador.version_modelo)
+        clasificador = clasificador.escalado
+    return tuple(versiones)
+
+def clave_texto(texto, huella):
+    """
+    Devuelve la clave de un texto en la cache: el hash del texto junto con la huella.
+
+    Parámetros:
+    -----------
+    texto : str
+        El texto original, sin limpiar.
+    huella : str
+        La huella del modelo y del vectorizador.
+
+    Devoluciones:
+    ------------
+    bytes:
+        La clave de 16 bytes.
+    """
+    return hashlib.blake2b(texto.encode('utf-8', 'surrogatepass'), digest_size=16, key=huella.encode()[:64]).digest()
+
+# Clase para guardar los resultados en disco:
+class CacheResultados:
+    def __init__(self, path, huella):
+        """
+        Abre o crea la cache de resultados.
+
+        Si la cache se creó con otra huella se vacía, ya que sus resultados corresponden a otro modelo,
+        otro vectorizador u otra versión del preprocesado.
+
+        Parámetros:
+        -----------
+        path : str
+            La ruta del archivo SQLite.
+        huella : str
+            La huella del modelo y del vectorizador (ver `huella_archivos`).
+        """
+        self.path = path
+        self.huella = huella
+        self.aciertos = 0
+        self.fallos = 0
+        self._cerrojo = threading.Lock()
+        self._conexion = None
+        self._conectar()
+
+    def _conectar(self):
+        """
+        Abre la conexión si está cerrada, crea las tablas y vacía la cache si su huella no coincide.
+
+        Devoluciones:
+        ------------
+        sqlite3.Connection:
+            La conexión abierta.
+        """
+        if self._conexion is not None:
+            return self._conexion
+        conexion = sqlite3.connect(self.path, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        with conexion:
+            conexion.execute("CREATE TABLE IF NOT EXISTS metadatos (clave TEXT PRIMARY KEY, valor TEXT)")
+            conexion.execute("CREATE TABLE IF NOT EXISTS resultados (clave BLOB PRIMARY KEY, texto_limpio TEXT, "
+                             "texto_lematizado TEXT, indice INTEGER, probabilidades BLOB) WITHOUT ROWID")
+            fila = conexion.execute("SELECT valor FROM metadatos WHERE clave = 'huella'").fetchone()
+            if fila is None or fila[0] != self.huella:
+                conexion.execute("DELETE FROM resultados")
+                conexion.execute("INSERT OR REPLACE INTO metadatos VALUES ('huella', ?)", (self.huella,))
+        self._conexion = conexion
+        return conexion
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __len__(self):
+        with self._cerrojo:
+            return self._conectar().execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def cerrar(self):
+        """
+        Cierra la conexión con la base de datos. Se vuelve a abrir si se usa de nuevo la cache.
+        """
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+    def buscar(self, claves):
+        """
+        Busca varias claves en la cache.
+
+        Parámetros:
+        -----------
+        claves : list of bytes
+            Las claves a buscar (ver `clave_texto`).
+
+        Devoluciones:
+        ------------
+        dict:
+            Para cada clave encontrada, una tupla con el texto limpio, el texto lematizado, la posición de la
+            clase predicha y las probabilidades en bytes float32. El texto limpio es None si el texto se
+            descartó en la limpieza.
+        """
+        encontrados = {}
+        with self._cerrojo:
+            for inicio in range(0, len(claves), CLAVES_POR_CONSULTA):
+                lote = claves[inicio:inicio + CLAVES_POR_CONSULTA]
+                consulta = f"SELECT * FROM resultados WHERE clave IN ({','.join('?' * len(lote))})"
+                for clave, *valores in self._conectar().execute(consulta, lote):
+                    encontrados[clave] = tuple(valores)
+            self.aciertos += len(encontrados)
+            self.fallos += len(claves) - len(encontrados)
+        return encontrados
+
+    def guardar(self, filas):
+        """
+        Guarda varios resultados en la cache.
+
+        Parámetros:
+        -----------
+        filas : list of tuple
+            Para cada texto, su clave, el texto limpio, el texto lematizado, la posición de la clase predicha
+            y las probabilidades en bytes float32.
+        """
+        with self._cerrojo:
+            conexion = self._conectar()
+            with conexion:
+                conexion.executemany("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)", filas)
+
+    def estadisticas(self):
+        """
+        Devuelve los aciertos y fallos de la cache.
+
+        Devoluciones:
+        ------------
+        dict:
+            Los aciertos, los fallos y la tasa de aciertos.
+        """
+        total = self.aciertos + self.fallos
+        return {'aciertos': self.aciertos, 'fallos': self.fallos, 'tasa_aciertos': self.aciertos / total if total else 0.0}
+
+# Clase que combina el preprocesado y el clasificador con la cache de resultados:
+class ClasificadorConCache:
+    def __init__(self, preprocesado, clasificador, path_cache, huella=None, instrumentacion=None):
+        """
+        Inicializa el objeto ClasificadorConCache.
+
+        Parámetros:
+        -----------
+        preprocesado : Preprocesado
+            El preprocesado con el que se limpian los textos que no están en la cache.
+        clasificador : CLasificadorTexto
+            El clasificador con el que se clasifican los textos que no están en la cache. Se clasifica su columna de
+            texto, que tiene que ser 'TEXTO_LIMPIO' o una de `VARIANTES_TEXTO`; si no tiene, `COLUMNA_TEXTO_TOKENS`.
+        path_cache : str
+            La ruta del archivo SQLite de la cache.
+        huella : str, opcional
+            La huella del modelo y del vectorizador. Por defecto se calcula con `huella_clasificador`.
+            Si el clasificador o algún nivel de su cascada cambia de modelo, se sustituye por la del modelo nuevo.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se mide la etapa 'cache_resultados' y se registran sus aciertos, fallos y duplicados.
+        """
+        self.preprocesado = preprocesado
+        self.clasificador = clasificador
+        if huella is None:
+            huella = huella_clasificador(clasificador)
+        self.cache = CacheResultados(path_cache, huella)
+        self.versiones_modelo = _versiones(clasificador)
+        self.instrumentacion = instrumentacion
+        self.duplicados = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """
+        Cierra la cache.
+        """
+        self.cache.cerrar()
+
+    def _comprobar_modelo(self):
+        """
+        Si el clasificador ha cambiado de modelo, abre la cache con la huella del nuevo, lo que la vacía.
+        """
+        versiones = _versiones(self.clasificador)
+        if versiones == self.versiones_modelo:
+            return
+        self.versiones_modelo = versiones
+        self.cache.cerrar()
+        self.cache = CacheResultados(self.cache.path, huella_clasificador(self.clasificador))
+
+    def clasificar_textos(self, textos):
+        """
+        Limpia y clasifica una lista de textos, procesando solo una vez cada texto distinto que no esté en la cache.
+
+        Se clasifica la columna de texto del clasificador (`COLUMNA_TEXTO_TOKENS` si no tiene ninguna).
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos originales. Los valores que no son texto (NA o NaN) se descartan sin pasar por la cache.
+
+        Devoluciones:
+        ------------
+        tuple:
+            Los textos limpios y los textos lematizados, en el mismo orden que `textos` y con None en los
+            textos descartados en la limpieza, y el ResultadoClasificacion de los textos no descartados.
+        """
+        self._comprobar_modelo()
+        with medir_etapa(self.instrumentacion, 'cache_resultados', len(textos)):
+            # Se agrupan los textos repetidos y se guarda, para cada texto, la posición de su texto único
+            posiciones = {}
+            inversa = [posiciones.setdefault(texto, len(posiciones)) for texto in textos]
+            unicos = list(posiciones)
+            self.duplicados += len(textos) - len(unicos)
+            clases = self.clasificador.modelo.classes_
+            limpios = [None] * len(unicos)
+            lematizados = [None] * len(unicos)
+            probabilidades = np.zeros((len(unicos), len(clases)), dtype=np.float32)
+            indices = np.zeros(len(unicos), dtype=np.intp)
+
+            # Los textos que faltan (NA o NaN) no se buscan en la cache: se descartan como en la limpieza
+            claves = [clave_texto(texto, self.cache.huella) if isinstance(texto, str) else None for texto in unicos]
+            encontrados = self.cache.buscar([clave for clave in claves if clave is not None])
+            faltan = []
+            for posicion, clave in enumerate(claves):
+                if clave is None:
+                    continue
+                if clave not in encontrados:
+                    faltan.append(posicion)
+                    continue
+                limpios[posicion], lematizados[posicion], indice, datos = encontrados[clave]
+                if limpios[posicion] is not None:
+                    indices[posicion] = indice
+                    probabilidades[posicion] = np.frombuffer(datos, dtype=np.float32)
+
+            if faltan:
+                # Se clasifica la columna del clasificador; los tokens lematizados solo se vectorizan directamente si es la suya
+                columna_texto = self.clasificador.columna_texto or COLUMNA_TEXTO_TOKENS
+                limpios_nuevos, por_variante = self.preprocesado.procesar_variantes([unicos[posicion] for posicion in faltan],
+                                                                                    variantes_columna(columna_texto), devolver_tokens=True)
+                tokens_nuevos = por_variante[COLUMNA_TEXTO_TOKENS]
+                validos = [numero for numero, limpio in enumerate(limpios_nuevos) if limpio is not None]
+                if columna_texto == COLUMNA_TEXTO_TOKENS:
+                    resultado = self.clasificador.inferir_tokens([tokens_nuevos[numero] for numero in validos])
+                else:
+                    textos_columna = limpios_nuevos if columna_texto == 'TEXTO_LIMPIO' else por_variante[columna_texto]
+                    resultado = self.clasificador.inferir_textos([textos_columna[numero] for numero in validos])
+                for numero, posicion in enumerate(faltan):
+                    limpios[posicion] = limpios_nuevos[numero]
+                    lematizados[posicion] = None if limpios_nuevos[numero] is None else " ".join(tokens_nuevos[numero])
+                posiciones_validas = np.array([faltan[numero] for numero in validos], dtype=np.intp)
+                probabilidades[posiciones_validas] = resultado.probabilidades
+                indices[posiciones_validas] = resultado.indices
+                self.cache.guardar([
+                    (claves[posicion], limpios[posicion], lematizados[posicion], int(indices[posicion]),
+                     None if limpios[posicion] is None else probabilidades[posicion].tobytes())
+                    for posicion in faltan
+                ])
+
+            # Se devuelven los resultados en el orden original
+            filas_validas = np.array([posicion for posicion in inversa if limpios[posicion] is not None], dtype=np.intp)
+            resultado = ResultadoClasificacion(probabilidades[filas_validas], clases, indices[filas_validas])
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('cache_resultados', {**self.cache.estadisticas(), 'duplicados': self.duplicados})
+        return [limpios[posicion] for posicion in inversa], [lematizados[posicion] for posicion in inversa], resultado
+
+    def clasificar_dataframe(self, df, text_column):
+        """
+        Limpia y clasifica la columna de texto de un DataFrame.
+
+        Produce las mismas filas y columnas que `Preprocesado.limpieza` seguido de `CLasificadorTexto.inferir_columna_texto`.
+
+        Parámetros:
+        -----------
+        df : pandas.DataFrame
+            El DataFrame que contiene los datos.
+        text_column : str
+            El nombre de la columna con el texto original.
+
+        Devoluciones:
+        ------------
+        tuple:
+            El DataFrame sin las filas descartadas en la limpieza y con las columnas 'TEXTO_LIMPIO',
+            'TEXTO_STOPWORDS_LEMATIZACION', 'CATEGORIA_MODELO' y 'PROBABILIDAD_MAXIMA', y su ResultadoClasificacion.
+        """
+        limpios, lematizados, resultado = self.clasificar_textos(df[text_column].tolist())
+        df = df[np.array([limpio is not None for limpio in limpios], dtype=bool)]
+        df['TEXTO_LIMPIO'] = pd.array([limpio for limpio in limpios if limpio is not None], dtype=TIPO_TEXTO)
+        df['TEXTO_STOPWORDS_LEMATIZACION'] = pd.array([lematizado for limpio, lematizado in zip(limpios, lematizados) if limpio is not None], dtype=TIPO_TEXTO)
+        df['CATEGORIA_MODELO'] = resultado.categorias
+        df['PROBABILIDAD_MAXIMA'] = resultado.probabilidad_maxima
+        return df, resultado
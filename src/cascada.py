@@ -0,0 +1,154 @@
+# Evaluación de una cascada de modelos sobre un conjunto etiquetado reservado (holdout).
+#
+# Una cascada (ver el parámetro `escalado` de CLasificadorTexto) clasifica todas las filas con el primer
+# modelo y solo pasa al siguiente las que no alcanzan el umbral de confianza. Este módulo mide, para cada
+# nivel por separado y para la cascada con cada umbral, la fracción de filas escaladas, la exactitud, el F1
+# ponderado y los textos por segundo, de modo que se puede elegir el umbral con el mejor compromiso.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m src.cascada --datos holdout.csv --modelos modelo_word.pkl modelo_char.pkl --vectorizadores vectorizador_word.pkl vectorizador_char.pkl [--umbrales 0.5 0.6 0.7 0.8 0.9]
+
+# Se importan las librerías pertinentes:
+import argparse
+import sys
+import time
+from src.constantes import *
+from src.recursos import importar_perezoso
+
+np = importar_perezoso("numpy")
+pd = importar_perezoso("pandas")
+
+def niveles_cascada(clasificador):
+    """
+    Devuelve los niveles de una cascada, empezando por el propio clasificador.
+
+    Parámetros:
+    -----------
+    clasificador : CLasificadorTexto
+        El primer nivel de la cascada.
+
+    Devoluciones:
+    ------------
+    list of CLasificadorTexto:
+        Los niveles en orden.
+    """
+    niveles = []
+    while clasificador is not None:
+        niveles.append(clasificador)
+        clasificador = clasificador.escalado
+    return niveles
+
+def _medir(clasificador, elementos, etiquetas, tokens, repeticiones):
+    """
+    Clasifica los elementos y devuelve las métricas, el mejor tiempo de las repeticiones y las filas que llegan a cada nivel.
+    """
+    from sklearn.metrics import accuracy_score, f1_score
+    niveles = niveles_cascada(clasificador)
+    segundos = float('inf')
+    for _ in range(max(1, repeticiones)):
+        for nivel in niveles:
+            nivel.filas_cascada = nivel.filas_escaladas = 0
+        inicio = time.perf_counter()
+        resultado = clasificador.inferir_tokens(elementos) if tokens else clasificador.inferir_textos(elementos)
+        segundos = min(segundos, time.perf_counter() - inicio)
+    medida = {
+        'exactitud': accuracy_score(etiquetas, resultado.categorias),
+        'f1_ponderado': f1_score(etiquetas, resultado.categorias, average='weighted'),
+        'segundos': segundos,
+        'textos_por_segundo': len(elementos) / segundos if segundos else 0.0,
+    }
+    for numero, nivel in enumerate(niveles[:-1], start=2):
+        medida[f'fraccion_nivel_{numero}'] = nivel.filas_escaladas / len(elementos) if len(elementos) else 0.0
+    return medida
+
+def evaluar_cascada(clasificador, elementos, etiquetas, umbrales, tokens=True, repeticiones=3):
+    """
+    Compara cada nivel de una cascada por separado con la cascada completa para varios umbrales.
+
+    Los umbrales se aplican al primer nivel; los niveles siguientes conservan el suyo. Durante la evaluación se
+    modifican temporalmente el umbral y el siguiente nivel del clasificador, y se restauran al terminar.
+
+    Parámetros:
+    -----------
+    clasificador : CLasificadorTexto
+        El primer nivel de la cascada, con `escalado` indicado.
+    elementos : list
+        Las listas de tokens lematizados (o los textos preprocesados si `tokens` es False) del holdout.
+    etiquetas : array-like
+        Las categorías reales.
+    umbrales : list of float
+        Los umbrales de confianza del primer nivel que se prueban.
+    tokens : bool, opcional
+        Si `elementos` son listas de tokens.
+    repeticiones : int, opcional
+        El número de ejecuciones de cada configuración; el tiempo es el mínimo.
+
+    Devoluciones:
+    ------------
+    pandas.DataFrame:
+        Una fila por configuración ('nivel_1', 'nivel_2', ..., 'cascada') con el umbral, la fracción de filas
+        que llega a cada nivel, la exactitud, el F1 ponderado, el tiempo y los textos por segundo.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si el clasificador no tiene un siguiente nivel o si no hay una etiqueta por elemento.
+    """
+    if clasificador.escalado is None:
+        raise ValueError("El clasificador no tiene ningún nivel de escalado.")
+    etiquetas = np.asarray(etiquetas)
+    if len(etiquetas) != len(elementos):
+        raise ValueError("Debe haber una etiqueta por cada elemento.")
+    niveles = niveles_cascada(clasificador)
+    filas = []
+    # Cada nivel por separado, sin su siguiente nivel
+    for numero, nivel in enumerate(niveles, start=1):
+        escalado = nivel.escalado
+        nivel.escalado = None
+        try:
+            filas.append({'configuracion': f'nivel_{numero}', 'umbral': None, **_medir(nivel, elementos, etiquetas, tokens, repeticiones)})
+        finally:
+            nivel.escalado = escalado
+    # La cascada con cada umbral del primer nivel
+    umbral_original = clasificador.umbral_confianza
+    try:
+        for umbral in umbrales:
+            clasificador.umbral_confianza = umbral
+            filas.append({'configuracion': 'cascada', 'umbral': umbral, **_medir(clasificador, elementos, etiquetas, tokens, repeticiones)})
+    finally:
+        clasificador.umbral_confianza = umbral_original
+    columnas = ['configuracion', 'umbral'] + [f'fraccion_nivel_{numero}' for numero in range(2, len(niveles) + 1)] + \
+               ['exactitud', 'f1_ponderado', 'segundos', 'textos_por_segundo']
+    return pd.DataFrame(filas).reindex(columns=columnas)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Evaluación de una cascada de modelos sobre un CSV etiquetado.")
+    parser.add_argument('--datos', required=True, help="Ruta al CSV etiquetado reservado (columnas 'text' y 'label').")
+    parser.add_argument('--modelos', nargs='+', required=True, help="Rutas de los modelos .pkl, del más barato al más caro.")
+    parser.add_argument('--vectorizadores', nargs='+', required=True, help="Rutas de los vectorizadores .pkl, en el mismo orden.")
+    parser.add_argument('--umbrales', nargs='+', type=float, default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--n-procesos', type=int, default=1, help="Procesos de la limpieza.")
+    args = parser.parse_args(argumentos)
+    if len(args.modelos) < 2 or len(args.modelos) != len(args.vectorizadores):
+        parser.error("Se necesitan al menos dos modelos y un vectorizador por modelo.")
+
+    from src.clases import LectorCSV, Preprocesado, CLasificadorTexto
+    df = LectorCSV(args.datos).crear_dataframe()
+    if df is None:
+        # LectorCSV ya ha mostrado el error de lectura
+        return 1
+    df = df.rename(columns={"text": "TEXTO", "label": "CATEGORIA"})
+    df['TEXTO'] = df['TEXTO'].astype(str)
+    with Preprocesado(df, 'TEXTO', n_procesos=args.n_procesos) as preprocesamiento:
+        df = preprocesamiento.limpieza()
+    clasificador = None
+    for modelo_path, vectorizador_path in reversed(list(zip(args.modelos, args.vectorizadores))):
+        clasificador = CLasificadorTexto(modelo_path, vectorizador_path, escalado=clasificador)
+    resultados = evaluar_cascada(clasificador, preprocesamiento.tokens_lematizados, df['CATEGORIA'].astype(int).to_numpy(),
+                                 args.umbrales, repeticiones=args.repeticiones)
+    print(resultados.to_string(index=False, float_format=lambda valor: f"{valor:.4f}"))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
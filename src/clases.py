@@ -1,16 +1,26 @@
-# Se importan las librerías pertinentes:
-import pandas as pd
-import re
-import joblib
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
-import spacy
+# Se importan las librerías pertinentes.
+# pandas y numpy se importan de forma diferida y spaCy, NLTK y joblib solo se importan al cargar los recursos,
+# de modo que importar este módulo es inmediato:
+from __future__ import annotations
+import os
+from functools import partial
+from itertools import compress
 from src.constantes import *
 from src.funciones import *
+from src.cache import CacheAcotada, sumar_estadisticas
+from src.recursos import importar_perezoso, obtener_artefacto, obtener_artefacto_mapeado, obtener_modelo_spacy, obtener_stemmer, obtener_stopwords
+from src.artefactos import EXTENSION_ARTEFACTO
+from src.instrumentacion import medir_etapa
+from src.resultados import ResultadoClasificacion, mapear_emociones
+from src.cache_resultados import ClasificadorConCache
+from src.vectorizacion import VectorizadorTokens
+
+np = importar_perezoso("numpy")
+pd = importar_perezoso("pandas")
 
 # Clase para cargar datos:
 class LectorCSV:
-    def __init__(self, path_csv):
+    def __init__(self, path_csv, instrumentacion=None):
         """
         Inicializa el objeto LectorCSV.
 
@@ -18,8 +28,11 @@ class LectorCSV:
         -----------
         path_csv : str
             La ruta al archivo CSV que se va a leer.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se mide la etapa 'lectura'.
         """
         self.path_csv = path_csv
+        self.instrumentacion = instrumentacion
 
     def crear_dataframe(self):
         """
@@ -39,7 +52,10 @@ class LectorCSV:
             Si ocurre cualquier otro error durante el proceso de carga del archivo CSV.
         """
         try:
-            return pd.read_csv(self.path_csv)
+            with medir_etapa(self.instrumentacion, 'lectura') as medida:
+                df = pd.read_csv(self.path_csv)
+                medida['filas_salida'] = len(df)
+            return df
         except FileNotFoundError:
             print("El archivo CSV especificado no fue encontrado")
             return None
@@ -47,23 +63,372 @@ class LectorCSV:
             print("Ocurrió un error al cargar el archivo CSV:", str(e))
             return None
 
+    def leer_por_bloques(self, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+        """
+        Lee el archivo CSV en bloques de un número fijo de filas.
+
+        Parámetros:
+        -----------
+        tamano_bloque : int, opcional
+            El número de filas de cada bloque.
+
+        Devoluciones:
+        ------------
+        generator of pandas.DataFrame:
+            Los bloques del archivo CSV en orden.
+
+        Excepciones:
+        ------------
+        FileNotFoundError, Exception
+            Los errores de lectura se muestran y se vuelven a lanzar, también a mitad de archivo, para que quien
+            consume los bloques no tome por completa una lectura interrumpida.
+        """
+        try:
+            with pd.read_csv(self.path_csv, chunksize=tamano_bloque) as lector:
+                while True:
+                    with medir_etapa(self.instrumentacion, 'lectura') as medida:
+                        bloque = next(lector, None)
+                        medida['filas_salida'] = 0 if bloque is None else len(bloque)
+                    if bloque is None:
+                        break
+                    yield bloque
+        except FileNotFoundError:
+            print("El archivo CSV especificado no fue encontrado")
+            raise
+        except Exception as e:
+            print("Ocurrió un error al cargar el archivo CSV:", str(e))
+            raise
+
 class GuardarCSV:
-    def __init__(self, dataframe):
+    def __init__(self, dataframe, instrumentacion=None):
         self.dataframe = dataframe
+        self.instrumentacion = instrumentacion
+
+    def guardar_dataframe(self, path_guardado, columnas=None, anexar=False, propagar_errores=False):
+        """
+        Guarda el DataFrame en un archivo CSV.
+
+        Parámetros:
+        -----------
+        path_guardado : str
+            La ruta del archivo CSV.
+        columnas : list of str, opcional
+            Las columnas que se guardan. Por defecto, todas.
+        anexar : bool, opcional
+            Si se añaden las filas al final del archivo sin cabecera, para guardar una tabla bloque a bloque.
+        propagar_errores : bool, opcional
+            Si el error se vuelve a lanzar también al escribir el archivo desde el principio, por ejemplo con el
+            primer bloque de una tabla que se guarda bloque a bloque.
 
-    def guardar_dataframe(self, path_guardado, columnas=None):
+        Excepciones:
+        ------------
+        Exception
+            Al anexar o con `propagar_errores`, si el bloque no se puede escribir se muestra el error y se vuelve
+            a lanzar la excepción, ya que seguir añadiendo bloques dejaría una tabla incompleta.
+        """
         try:
-            if columnas:
-                self.dataframe[columnas].to_csv(path_guardado, index=False)
-            else:
-                self.dataframe.to_csv(path_guardado, index=False)
+            # Al anexar se añaden las filas al final del archivo sin volver a escribir la cabecera
+            modo, cabecera = ('a', False) if anexar else ('w', True)
+            with medir_etapa(self.instrumentacion, 'guardado', len(self.dataframe)):
+                # Las columnas se eligen en `to_csv` para no copiar el DataFrame
+                self.dataframe.to_csv(path_guardado, columns=columnas or None, index=False, mode=modo, header=cabecera)
             print("El DataFrame fue guardado correctamente en", path_guardado)
         except Exception as e:
             print("Ocurrió un error al guardar el DataFrame como CSV:", str(e))
+            if anexar or propagar_errores:
+                raise
+
+# Clase para guardar la tabla clasificada en formato columnar, bloque a bloque:
+class GuardarParquet:
+    def __init__(self, path_guardado, clases=None, compresion=COMPRESION_PARQUET, tamano_grupo=TAMANO_GRUPO_FILAS, instrumentacion=None):
+        """
+        Inicializa el objeto GuardarParquet.
+
+        Cada llamada a `guardar_dataframe` añade uno o varios grupos de filas al archivo, por lo que la tabla
+        se puede escribir bloque a bloque sin tenerla entera en memoria. El archivo queda completo al llamar a
+        `cerrar` o al salir del bloque `with`.
+
+        La tabla tiene una columna float32 'PROBABILIDAD_<EMOCIÓN>' por cada clase en lugar de la lista de
+        'PROBABILIDADES_CATEGORIAS', y 'CATEGORIA' y 'CATEGORIA_MODELO' son categóricas con las etiquetas de
+        `mapeo_emociones`.
+
+        Parámetros:
+        -----------
+        path_guardado : str
+            La ruta del archivo Parquet.
+        clases : list of int, opcional
+            Los códigos de las clases en el orden de las probabilidades (`modelo.classes_`). Por defecto, los de `mapeo_emociones`.
+        compresion : str, opcional
+            El códec de compresión.
+        tamano_grupo : int, opcional
+            El número máximo de filas de cada grupo de filas.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se mide la etapa 'guardado'.
+        """
+        self.path_guardado = path_guardado
+        self.clases = list(mapeo_emociones) if clases is None else [int(clase) for clase in clases]
+        self.compresion = compresion
+        self.tamano_grupo = tamano_grupo
+        self.instrumentacion = instrumentacion
+        self.etiquetas = list(mapeo_emociones.values())
+        self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """
+        Escribe el pie del archivo y lo cierra.
+        """
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    def _categorica(self, serie):
+        """
+        Convierte una columna de códigos o de etiquetas de emoción en un array de diccionario de Arrow.
+        Los valores que no están en `mapeo_emociones` quedan como nulos.
+        """
+        import pyarrow as pa
+        if pd.api.types.is_numeric_dtype(serie):
+            serie = serie.map(mapeo_emociones)
+        codigos = pd.Categorical(serie, categories=self.etiquetas).codes.astype(np.int8)
+        return pa.DictionaryArray.from_arrays(pa.array(codigos, mask=codigos < 0), pa.array(self.etiquetas, type=pa.string()))
+
+    def tabla(self, dataframe, probabilidades=None):
+        """
+        Construye la tabla de Arrow de un bloque clasificado, con el esquema con el que se guarda.
+
+        Parámetros:
+        -----------
+        dataframe : pandas.DataFrame
+            El bloque con las columnas de `columnas_deseadas` (ver `guardar_dataframe`).
+        probabilidades : numpy.ndarray, opcional
+            La matriz de probabilidades (n_filas, n_clases) del bloque. Si no se indica se lee la columna
+            'PROBABILIDADES_CATEGORIAS'.
+
+        Devoluciones:
+        ------------
+        pyarrow.Table:
+            La tabla del bloque.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si las probabilidades no tienen una fila por texto y una columna por clase.
+        """
+        import pyarrow as pa
+        if probabilidades is None:
+            probabilidades = np.array(dataframe['PROBABILIDADES_CATEGORIAS'].tolist(), dtype=np.float32).reshape(len(dataframe), -1)
+        probabilidades = np.asarray(probabilidades, dtype=np.float32)
+        if probabilidades.shape != (len(dataframe), len(self.clases)):
+            raise ValueError("Las probabilidades deben tener una fila por texto y una columna por clase.")
+        columnas = {
+            'ID': pa.array(dataframe['ID'], type=pa.int64()),
+            'TEXTO': pa.array(dataframe['TEXTO'], type=pa.string()),
+            'TEXTO_LIMPIO': pa.array(dataframe['TEXTO_LIMPIO'], type=pa.string()),
+            'CATEGORIA': self._categorica(dataframe['CATEGORIA']),
+            'CATEGORIA_MODELO': self._categorica(dataframe['CATEGORIA_MODELO']),
+        }
+        for posicion, clase in enumerate(self.clases):
+            columnas[f"PROBABILIDAD_{mapeo_emociones.get(clase, str(clase)).upper()}"] = pa.array(probabilidades[:, posicion])
+        columnas['PROBABILIDAD_MAXIMA'] = pa.array(probabilidades.max(axis=1) if len(probabilidades) else np.empty(0, dtype=np.float32))
+        return pa.table(columnas)
+
+    def guardar_dataframe(self, dataframe, probabilidades=None):
+        """
+        Añade un bloque clasificado al archivo Parquet.
+
+        Parámetros:
+        -----------
+        dataframe : pandas.DataFrame
+            El bloque con las columnas de `columnas_deseadas`. 'CATEGORIA' y 'CATEGORIA_MODELO' pueden contener
+            los códigos o las etiquetas de las emociones.
+        probabilidades : numpy.ndarray, opcional
+            La matriz de probabilidades (n_filas, n_clases) del bloque. Si se indica no se lee la columna
+            'PROBABILIDADES_CATEGORIAS'.
+
+        Excepciones:
+        ------------
+        Exception
+            Si el bloque no se puede escribir se muestra el error, se cierra el archivo y se vuelve a lanzar la
+            excepción, ya que seguir añadiendo bloques dejaría una tabla incompleta.
+        """
+        try:
+            import pyarrow.parquet as pq
+            with medir_etapa(self.instrumentacion, 'guardado', len(dataframe)):
+                tabla = self.tabla(dataframe, probabilidades)
+                if self._escritor is None:
+                    self._escritor = pq.ParquetWriter(self.path_guardado, tabla.schema, compression=self.compresion)
+                self._escritor.write_table(tabla, row_group_size=self.tamano_grupo)
+            print("El DataFrame fue guardado correctamente en", self.path_guardado)
+        except Exception as e:
+            print("Ocurrió un error al guardar el DataFrame como Parquet:", str(e))
+            self.cerrar()
+            raise
+
+# Funciones para el preprocesado del texto:
+def _cargar_recursos():
+    """
+    Obtiene del registro compartido los recursos de lenguaje que usa el preprocesado.
+
+    Cada recurso se carga una sola vez por proceso, la primera vez que se pide.
+
+    Devoluciones:
+    ------------
+    tuple:
+        El stemmer en inglés, el modelo de spaCy en inglés y el conjunto de stopwords en inglés.
+    """
+    STEMMER_EN = obtener_stemmer("english")  # Stemmer en inglés
+    SPACY_NLP_EN = obtener_modelo_spacy("en_core_web_sm", excluir=tuple(COMPONENTES_SPACY_EXCLUIDOS))  # Modelo de lenguaje en inglés sin parser ni NER
+    STOPWORDS = obtener_stopwords("english")  # Conjunto de stopwords en inglés
+    return STEMMER_EN, SPACY_NLP_EN, STOPWORDS
+
+def _procesar_textos(textos, STEMMER_EN=None, SPACY_NLP_EN=None, STOPWORDS=None, tamano_lote_spacy=TAMANO_LOTE_SPACY, n_procesos_spacy=1,
+                     cache_palabras=None, cache_lemas=None, devolver_tokens=False, variantes=VARIANTES_TEXTO_DEFECTO):
+    """
+    Limpia y preprocesa una lista de textos.
+
+    Parámetros:
+    -----------
+    textos : list of str
+        Los textos a preprocesar. Los valores ausentes (NaN o NA) se descartan.
+    STEMMER_EN : SnowballStemmer, opcional
+        Objeto stemmer en inglés.
+    SPACY_NLP_EN : spacy.language.Language, opcional
+        Objeto de modelo de procesamiento de lenguaje en inglés.
+    STOPWORDS : frozenset, opcional
+        Conjunto de palabras vacías.
+    tamano_lote_spacy : int, opcional
+        El número de textos que spaCy procesa en cada lote.
+    n_procesos_spacy : int, opcional
+        El número de procesos que usa spaCy para lematizar.
+    cache_palabras : CacheAcotada, opcional
+        Cache de los veredictos de limpieza de cada palabra.
+    cache_lemas : CacheAcotada, opcional
+        Cache de los lemas de cada texto.
+    devolver_tokens : bool, opcional
+        Si 'TEXTO_STOPWORDS_LEMATIZACION' se devuelve como listas de tokens en lugar de cadenas.
+    variantes : tuple of str, opcional
+        Las representaciones del texto que se generan (ver `preprocesamiento_variantes`).
+
+    Devoluciones:
+    ------------
+    tuple:
+        La lista de textos limpios y un diccionario con la lista de cada variante, en el mismo orden que `textos`.
+        Las posiciones de los textos que se descartan en la limpieza contienen None.
+    """
+    # Limpia cada texto en una sola pasada y descarta los que no contienen más de una palabra y los ausentes
+    limpios = [limpieza_texto(texto, patron_mantener, regex_consonantes_repetidas, patron_vocales_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA, cache_palabras)
+               if isinstance(texto, str) else None for texto in textos]
+    # Genera todas las variantes por lotes a partir de una sola separación y un solo análisis de cada texto
+    por_variante = preprocesamiento_variantes([limpio for limpio in limpios if limpio is not None], variantes,
+                                              STEMMER_EN=STEMMER_EN, SPACY_NLP_EN=SPACY_NLP_EN, STOPWORDS=STOPWORDS,
+                                              tamano_lote=tamano_lote_spacy, n_procesos=n_procesos_spacy, cache_lemas=cache_lemas,
+                                              devolver_tokens=devolver_tokens)
+    resultados = {}
+    for variante, procesados in por_variante.items():
+        procesados = iter(procesados)
+        resultados[variante] = [None if limpio is None else next(procesados) for limpio in limpios]
+    return limpios, resultados
+
+def _columna_texto(valores, filas):
+    """
+    Convierte un iterable de cadenas en una columna de texto en Arrow sin crear una lista intermedia.
+
+    Parámetros:
+    -----------
+    valores : iterable of str
+        Las cadenas de la columna; None se guarda como valor ausente.
+    filas : int
+        El número de valores.
+
+    Devoluciones:
+    ------------
+    pandas.arrays.ArrowStringArray:
+        La columna con el tipo `TIPO_TEXTO`.
+    """
+    import pyarrow as pa
+    return pd.array(pa.array(valores, type=pa.large_string(), size=filas), dtype=TIPO_TEXTO)
+
+def eliminar_columnas(df, columnas_conservar):
+    """
+    Elimina del DataFrame, sin copiarlo, las columnas que no están en `columnas_conservar`.
+
+    Parámetros:
+    -----------
+    df : pandas.DataFrame
+        El DataFrame, que se modifica.
+    columnas_conservar : list of str
+        Las columnas que se conservan.
+
+    Devoluciones:
+    ------------
+    pandas.DataFrame:
+        El mismo DataFrame.
+    """
+    for columna in [columna for columna in df.columns if columna not in columnas_conservar]:
+        del df[columna]
+    return df
+
+# Recursos y caches de cada proceso del pool. Se crean una sola vez por proceso en `_inicializar_proceso`:
+_RECURSOS_PROCESO = ()
+_CACHES_PROCESO = {}
+
+def _inicializar_proceso(tamano_cache_palabras=TAMANO_CACHE_PALABRAS, tamano_cache_lemas=TAMANO_CACHE_LEMAS, politica_cache=POLITICA_CACHE):
+    """
+    Carga los recursos de lenguaje y crea las caches en un proceso del pool al arrancarlo.
+
+    Parámetros:
+    -----------
+    tamano_cache_palabras : int, opcional
+        El número máximo de palabras en la cache de veredictos.
+    tamano_cache_lemas : int, opcional
+        El número máximo de textos en la cache de lemas.
+    politica_cache : str, opcional
+        La política de expulsión de las caches.
+    """
+    global _RECURSOS_PROCESO
+    _RECURSOS_PROCESO = _cargar_recursos()
+    _CACHES_PROCESO['palabras'] = CacheAcotada(tamano_cache_palabras, politica_cache)
+    _CACHES_PROCESO['lemas'] = CacheAcotada(tamano_cache_lemas, politica_cache)
+
+def _procesar_fragmento(textos, tamano_lote_spacy=TAMANO_LOTE_SPACY, devolver_tokens=False, variantes=VARIANTES_TEXTO_DEFECTO):
+    """
+    Limpia y preprocesa un fragmento de textos dentro de un proceso del pool.
+
+    Parámetros:
+    -----------
+    textos : list of str
+        El fragmento de textos a preprocesar.
+    tamano_lote_spacy : int, opcional
+        El número de textos que spaCy procesa en cada lote.
+    devolver_tokens : bool, opcional
+        Si 'TEXTO_STOPWORDS_LEMATIZACION' se devuelve como listas de tokens.
+    variantes : tuple of str, opcional
+        Las representaciones del texto que se generan.
+
+    Devoluciones:
+    ------------
+    tuple:
+        El resultado de `_procesar_textos` para el fragmento y, junto al identificador del proceso,
+        las estadísticas acumuladas de sus caches.
+    """
+    limpios, por_variante = _procesar_textos(textos, *_RECURSOS_PROCESO, tamano_lote_spacy=tamano_lote_spacy,
+                                             cache_palabras=_CACHES_PROCESO['palabras'], cache_lemas=_CACHES_PROCESO['lemas'],
+                                             devolver_tokens=devolver_tokens, variantes=variantes)
+    estadisticas = {nombre: cache.estadisticas() for nombre, cache in _CACHES_PROCESO.items()}
+    return limpios, por_variante, (os.getpid(), estadisticas)
 
 # Clase para el preprocesado del texto:
 class Preprocesado:
-    def __init__(self, df: pd.DataFrame, text_column: str):
+    def __init__(self, df: pd.DataFrame, text_column: str, n_procesos: int = 1, tamano_fragmento: int = TAMANO_FRAGMENTO_PROCESO,
+                 tamano_lote_spacy: int = TAMANO_LOTE_SPACY, n_procesos_spacy: int = 1,
+                 tamano_cache_palabras: int = TAMANO_CACHE_PALABRAS, tamano_cache_lemas: int = TAMANO_CACHE_LEMAS,
+                 politica_cache: str = POLITICA_CACHE, instrumentacion=None, variantes=VARIANTES_TEXTO_DEFECTO):
         """
         Inicializa el objeto Preprocesado.
 
@@ -73,17 +438,176 @@ class Preprocesado:
             El DataFrame que contiene los datos.
         text_column : str
             El nombre de la columna que contiene el texto a preprocesar.
+        n_procesos : int, opcional
+            El número de procesos con los que se realiza la limpieza. Con 1 se ejecuta en el proceso actual.
+        tamano_fragmento : int, opcional
+            El número de filas que se envían a cada proceso en cada tarea.
+        tamano_lote_spacy : int, opcional
+            El número de textos que spaCy procesa en cada lote de `nlp.pipe`.
+        n_procesos_spacy : int, opcional
+            El número de procesos que usa `nlp.pipe` en la ejecución secuencial. Con `n_procesos` mayor
+            que 1 cada proceso del pool lematiza su fragmento en un único proceso.
+        tamano_cache_palabras : int, opcional
+            El número máximo de palabras cuyos veredictos de limpieza se memorizan. Con 0 no se memoriza nada.
+        tamano_cache_lemas : int, opcional
+            El número máximo de textos cuyos lemas se memorizan. Con 0 no se memoriza nada.
+        politica_cache : str, opcional
+            La política de expulsión de las caches, 'lru' o 'fifo'. Cada proceso del pool tiene sus propias caches.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se miden la limpieza y cada uno de sus filtros y se registran las estadísticas de las caches.
+        variantes : iterable of str, opcional
+            Las representaciones del texto que añade la limpieza, entre las de `VARIANTES_TEXTO`. Todas se
+            obtienen de los mismos tokens de cada texto (ver `preprocesamiento_variantes`) y solo se crean
+            las columnas de las indicadas.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si alguna variante no es válida o no se indica ninguna.
         """
+        variantes = tuple(dict.fromkeys(variantes))
+        if not variantes or any(variante not in VARIANTES_TEXTO for variante in variantes):
+            raise ValueError(f"Las variantes deben ser una o varias de {list(VARIANTES_TEXTO)}.")
         self.df = df  
         self.text_column = text_column
-        self.STEMMER_EN = SnowballStemmer("english")  # Inicializa el stemmer en inglés
-        self.SPACY_NLP_EN = spacy.load("en_core_web_sm")  # Carga el modelo de procesamiento de lenguaje en inglés
-        self.STOPWORDS = stopwords.words('english')  # Obtiene la lista de stopwords en inglés
+        self.n_procesos = n_procesos
+        self.tamano_fragmento = tamano_fragmento
+        self.tamano_lote_spacy = tamano_lote_spacy
+        self.n_procesos_spacy = n_procesos_spacy
+        self.STEMMER_EN, self.SPACY_NLP_EN, self.STOPWORDS = _cargar_recursos()
+        self.cache_palabras = CacheAcotada(tamano_cache_palabras, politica_cache)
+        self.cache_lemas = CacheAcotada(tamano_cache_lemas, politica_cache)
+        self._pool = None  # Pool de procesos, se crea en la primera limpieza en paralelo y se reutiliza
+        self._estadisticas_procesos = {}  # Últimas estadísticas de las caches de cada proceso del pool
+        self.tokens_lematizados = None  # Tokens lematizados de cada fila tras la última limpieza
+        self.instrumentacion = instrumentacion
+        self.variantes = variantes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """
+        Cierra el pool de procesos si se ha creado.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def estadisticas_cache(self):
+        """
+        Devuelve los aciertos y fallos de las caches de palabras y de lemas.
+
+        En la ejecución en paralelo se suman las caches de todos los procesos del pool.
+
+        Devoluciones:
+        ------------
+        dict:
+            Las estadísticas de la cache de 'palabras' y de la de 'lemas'.
+        """
+        return {
+            nombre: sumar_estadisticas([cache.estadisticas()] + [estadisticas[nombre] for estadisticas in self._estadisticas_procesos.values()])
+            for nombre, cache in (('palabras', self.cache_palabras), ('lemas', self.cache_lemas))
+        }
+
+    def _procesar_en_paralelo(self, textos, devolver_tokens=False, variantes=VARIANTES_TEXTO_DEFECTO):
+        """
+        Reparte los textos en fragmentos entre los procesos del pool y une los resultados en orden.
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos a preprocesar.
+        devolver_tokens : bool, opcional
+            Si 'TEXTO_STOPWORDS_LEMATIZACION' se devuelve como listas de tokens.
+        variantes : tuple of str, opcional
+            Las representaciones del texto que se generan.
+
+        Devoluciones:
+        ------------
+        tuple:
+            El resultado de `_procesar_textos` para todos los textos.
+        """
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.n_procesos, initializer=_inicializar_proceso,
+                                             initargs=(self.cache_palabras.tamano_maximo, self.cache_lemas.tamano_maximo, self.cache_palabras.politica))
+        fragmentos = (textos[inicio:inicio + self.tamano_fragmento] for inicio in range(0, len(textos), self.tamano_fragmento))
+        limpios = []
+        por_variante = {variante: [] for variante in variantes}
+        procesar_fragmento = partial(_procesar_fragmento, tamano_lote_spacy=self.tamano_lote_spacy, devolver_tokens=devolver_tokens, variantes=variantes)
+        n_fragmentos = 0
+        for limpios_fragmento, variantes_fragmento, (pid, estadisticas) in self._pool.map(procesar_fragmento, fragmentos):
+            limpios.extend(limpios_fragmento)
+            for variante, procesados in variantes_fragmento.items():
+                por_variante[variante].extend(procesados)
+            self._estadisticas_procesos[pid] = estadisticas
+            n_fragmentos += 1
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('fragmentos', {'fragmentos': n_fragmentos, 'textos': len(textos)}, acumular=True)
+        return limpios, por_variante
+
+    def procesar_variantes(self, textos, variantes=None, devolver_tokens=False):
+        """
+        Limpia una lista de textos y genera varias representaciones de cada uno sin necesidad de un DataFrame.
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos a preprocesar.
+        variantes : iterable of str, opcional
+            Las representaciones del texto que se generan. Por defecto, las indicadas al crear el objeto.
+        devolver_tokens : bool, opcional
+            Si 'TEXTO_STOPWORDS_LEMATIZACION' se devuelve como listas de tokens en lugar de cadenas.
+
+        Devoluciones:
+        ------------
+        tuple:
+            La lista de textos limpios y un diccionario con la lista de cada variante, en el mismo orden que `textos`.
+            Las posiciones de los textos que se descartan en la limpieza contienen None.
+        """
+        variantes = self.variantes if variantes is None else tuple(dict.fromkeys(variantes))
+        if self.n_procesos > 1:
+            return self._procesar_en_paralelo(textos, devolver_tokens, variantes)
+        return _procesar_textos(textos, self.STEMMER_EN, self.SPACY_NLP_EN, self.STOPWORDS,
+                                tamano_lote_spacy=self.tamano_lote_spacy, n_procesos_spacy=self.n_procesos_spacy,
+                                cache_palabras=self.cache_palabras, cache_lemas=self.cache_lemas,
+                                devolver_tokens=devolver_tokens, variantes=variantes)
+
+    def procesar_textos(self, textos, devolver_tokens=False):
+        """
+        Limpia y preprocesa una lista de textos sin necesidad de un DataFrame.
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos a preprocesar.
+        devolver_tokens : bool, opcional
+            Si los textos con stopwords y lematización se devuelven como listas de tokens en lugar de cadenas.
+
+        Devoluciones:
+        ------------
+        tuple of list:
+            Los textos limpios y los textos con stopwords y lematización, en el mismo orden que `textos`.
+            Las posiciones de los textos que se descartan en la limpieza contienen None.
+        """
+        limpios, por_variante = self.procesar_variantes(textos, VARIANTES_TEXTO_DEFECTO, devolver_tokens)
+        return limpios, por_variante['TEXTO_STOPWORDS_LEMATIZACION']
 
     def limpieza(self):
         """
         Realiza el preprocesamiento del texto en el DataFrame.
 
+        Si `n_procesos` es mayor que 1 las filas se reparten entre un pool de procesos y el resultado
+        conserva el mismo orden que en la ejecución secuencial. Se añade una columna por cada variante de
+        `variantes`, todas calculadas en la misma pasada y guardadas en Arrow (`TIPO_TEXTO`). Las filas descartadas
+        se quitan con una sola máscara al final. Si entre las variantes está 'TEXTO_STOPWORDS_LEMATIZACION',
+        los tokens lematizados de cada fila del resultado quedan en `tokens_lematizados`, para vectorizarlos
+        sin volver a separar la columna.
+
         Devoluciones:
         ------------
         pandas.DataFrame:
@@ -93,59 +617,183 @@ class Preprocesado:
         ------------
         None
         """
-        # Elimina patrones específicos del texto
-        self.df['TEXTO_LIMPIO'] = self.df[self.text_column].apply(lambda x: re.sub(patron_mantener, ' ', x))
-        # Elimina espacios en blanco adicionales
-        self.df['TEXTO_LIMPIO'] = self.df['TEXTO_LIMPIO'].apply(lambda x: re.sub(r'\s+', ' ', x))
-        # Realiza validaciones sobre el texto limpio
-        self.df['TEXTO_LIMPIO'] = self.df['TEXTO_LIMPIO'].apply(lambda x: validacion(x, letras_permitidas_repetidas, patron_palabras_repetidas, patron_consonantes_repetidas))
-        # Elimina palabras repetidas
-        self.df['TEXTO_LIMPIO'] = self.df['TEXTO_LIMPIO'].apply(lambda x: palabras_repetidas(x, patron_palabras_repetidas))
-        # Realiza validaciones sobre las vocales del texto
-        self.df['TEXTO_LIMPIO'] = self.df['TEXTO_LIMPIO'].apply(lambda x: validacion_vocales(x, patron_vocales_repetidas))
-        # Filtra las filas que contienen palabras con longitud mayor a 1
-        self.df = self.df[self.df['TEXTO_LIMPIO'].apply(lambda x: longitud_palabras(x))]
-        # Convierte el texto a minúsculas
-        self.df['TEXTO_LIMPIO'] = self.df['TEXTO_LIMPIO'].apply(lambda x: x.lower())
-
-        # Realiza el preprocesamiento con eliminación de stopwords pero sin stemming ni lematización
-        # self.df['TEXTO_STOPWORDS'] = self.df['TEXTO_LIMPIO'].apply(lambda texto: preprocesamiento(texto, rm_stopwords=True, stemming=False, lematizar=False))
-        # Realiza el preprocesamiento con eliminación de stopwords y stemming
-        # self.df['TEXTO_STOPWORDS_STEMMING'] = self.df['TEXTO_LIMPIO'].apply(lambda texto: preprocesamiento(texto, rm_stopwords=True, stemming=True, lematizar=False))
-        # Realiza el preprocesamiento con eliminación de stopwords y lematización
-        self.df['TEXTO_STOPWORDS_LEMATIZACION'] = self.df['TEXTO_LIMPIO'].apply(lambda texto: preprocesamiento(texto, rm_stopwords=True, stemming=False, lematizar=True))
-        # Realiza el preprocesamiento con lematización pero sin eliminación de stopwords ni stemming
-        # self.df['TEXTO_LEMATIZACION'] = self.df['TEXTO_LIMPIO'].apply(lambda texto: preprocesamiento(texto, rm_stopwords=False, stemming=False, lematizar=True))
-        # Realiza el preprocesamiento con stemming pero sin eliminación de stopwords ni lematización
-        # self.df['TEXTO_STEMMING'] = self.df['TEXTO_LIMPIO'].apply(lambda texto: preprocesamiento(texto, rm_stopwords=False, stemming=True, lematizar=False))
-        
-        # Filtra las filas que contienen valores no nulos en ciertas columnas
-        # self.df = self.df[self.df[['TEXTO_STOPWORDS', 'TEXTO_STOPWORDS_STEMMING','TEXTO_STOPWORDS_LEMATIZACION','TEXTO_LEMATIZACION','TEXTO_STEMMING']].notnull().all(axis=1)]
-        self.df = self.df[self.df[['TEXTO_STOPWORDS_LEMATIZACION']].notnull().all(axis=1)]
+        filas = len(self.df)
+        with medir_etapa(self.instrumentacion, 'limpieza', filas) as medida:
+            with medir_etapa(self.instrumentacion, 'limpieza.procesado', filas):
+                limpios, por_variante = self.procesar_variantes(self.df[self.text_column].tolist(), devolver_tokens=True)
+            # Las filas se filtran con una sola máscara, que se aplica una vez al final de los dos filtros
+            # Filtra las filas que contienen palabras con longitud mayor a 1
+            with medir_etapa(self.instrumentacion, 'limpieza.filtro_longitud_palabras', filas) as filtro:
+                validos = np.fromiter((limpio is not None for limpio in limpios), dtype=bool, count=filas)
+                filtro['filas_salida'] = int(validos.sum())
+            # Filtra las filas que contienen valores no nulos en las columnas de las variantes
+            with medir_etapa(self.instrumentacion, 'limpieza.filtro_notnull', int(validos.sum())) as filtro:
+                for procesados in por_variante.values():
+                    validos &= np.fromiter((procesado is not None for procesado in procesados), dtype=bool, count=filas)
+                self.df = self.df[validos]
+                filtro['filas_salida'] = len(self.df)
+            # Crea las columnas ya filtradas y libera cada lista en cuanto se convierte en columna
+            with medir_etapa(self.instrumentacion, 'limpieza.columnas', len(self.df)):
+                self.df['TEXTO_LIMPIO'] = _columna_texto(compress(limpios, validos), len(self.df))
+                del limpios
+                self.tokens_lematizados = None
+                # Solo se crean las columnas de las variantes pedidas
+                for variante in VARIANTES_TEXTO:
+                    if variante not in por_variante:
+                        continue
+                    procesados = por_variante.pop(variante)
+                    if variante == 'TEXTO_STOPWORDS_LEMATIZACION':
+                        self.tokens_lematizados = list(compress(procesados, validos))
+                        procesados = (" ".join(tokens_texto) for tokens_texto in self.tokens_lematizados)
+                    else:
+                        procesados = compress(procesados, validos)
+                    self.df[variante] = _columna_texto(procesados, len(self.df))
+                    del procesados
+            medida['filas_salida'] = len(self.df)
+        if self.instrumentacion is not None:
+            for nombre, estadisticas in self.estadisticas_cache().items():
+                self.instrumentacion.registrar_estadisticas(f'cache_{nombre}', estadisticas)
         return self.df
 
 # # Clase para la predicción del modelo:
 class CLasificadorTexto:
-    def __init__(self, modelo_path, vectorizador_path, df=None, columna_texto=None):
+    def __init__(self, modelo_path, vectorizador_path=None, df=None, columna_texto=None, tamano_lote=TAMANO_LOTE_INFERENCIA, instrumentacion=None,
+                 escalado=None, umbral_confianza=UMBRAL_CONFIANZA_CASCADA):
         """
         Inicializa el objeto CLasificadorTexto.
 
+        Con `escalado` el clasificador es el primer nivel de una cascada: todas las filas se clasifican con este
+        modelo y solo las que no alcanzan `umbral_confianza` se vuelven a clasificar con el siguiente, que puede
+        tener a su vez su propio `escalado`. Así un modelo más caro solo se paga en las filas dudosas.
+
         Parámetros:
         -----------
         modelo_path : str
-            La ruta al archivo .pkl que contiene el modelo entrenado.
-        vectorizador_path : str
-            La ruta al archivo .pkl que contiene el vectorizador entrenado.
+            La ruta al archivo .pkl que contiene el modelo entrenado, o a un artefacto mapeable en memoria
+            (extensión `EXTENSION_ARTEFACTO`, ver `src.artefactos`) que contiene el modelo y el vectorizador.
+        vectorizador_path : str, opcional
+            La ruta al archivo .pkl que contiene el vectorizador entrenado. No se usa con un artefacto mapeable.
         df : pandas.DataFrame, opcional
             El DataFrame que contiene la columna de texto a clasificar.
         columna_texto : str, opcional
             El nombre de la columna de texto en el DataFrame.
+        tamano_lote : int, opcional
+            Número de textos que se vectorizan y clasifican de una sola vez en la inferencia por columnas.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se mide la etapa 'inferencia' y se registran los lotes procesados.
+        escalado : CLasificadorTexto, opcional
+            El siguiente nivel de la cascada, con las mismas clases que este modelo.
+        umbral_confianza : float, opcional
+            La probabilidad máxima por debajo de la cual una fila se pasa al siguiente nivel.
 
+        Excepciones:
+        ------------
+        ValueError:
+            Si el siguiente nivel de la cascada no tiene las mismas clases.
         """
-        self.modelo = joblib.load(modelo_path)
-        self.vectorizador = joblib.load(vectorizador_path)
+        # El modelo y el vectorizador se comparten entre todas las instancias que usan los mismos archivos
+        self.modelo_path = modelo_path
+        self.vectorizador_path = None if modelo_path.endswith(EXTENSION_ARTEFACTO) else vectorizador_path
+        # El vectorizador y el modelo se guardan juntos en una tupla, de modo que `actualizar_modelo` los
+        # cambia con una sola asignación y cada inferencia usa siempre una pareja coherente
+        self._artefactos = self._cargar_artefactos()
+        self.version_modelo = 0
         self.df = df
         self.columna_texto = columna_texto
+        self.tamano_lote = tamano_lote
+        self._inferencia = None  # ResultadoClasificacion de la última inferencia sobre la columna
+        self._vectorizador_tokens = None  # VectorizadorTokens, se crea la primera vez que se vectorizan tokens
+        self.instrumentacion = instrumentacion
+        if escalado is not None and not np.array_equal(escalado.modelo.classes_, self.modelo.classes_):
+            raise ValueError("El siguiente nivel de la cascada debe tener las mismas clases que el modelo.")
+        self.escalado = escalado
+        self.umbral_confianza = umbral_confianza
+        self.filas_cascada = 0
+        self.filas_escaladas = 0
+
+    @property
+    def vectorizador(self):
+        return self._artefactos[0]
+
+    @property
+    def modelo(self):
+        return self._artefactos[1]
+
+    def _cargar_artefactos(self):
+        """
+        Carga el vectorizador y el modelo de `modelo_path` y `vectorizador_path` a través del registro de recursos.
+        """
+        if self.modelo_path.endswith(EXTENSION_ARTEFACTO):
+            return tuple(obtener_artefacto_mapeado(self.modelo_path))
+        return obtener_artefacto(self.vectorizador_path), obtener_artefacto(self.modelo_path)
+
+    def actualizar_modelo(self, modelo, vectorizador=None, modelo_path=None, vectorizador_path=None):
+        """
+        Sustituye el modelo (y opcionalmente el vectorizador) sin detener la inferencia.
+
+        El cambio es una única asignación: las inferencias en curso terminan con los pesos anteriores y las
+        siguientes usan los nuevos. El modelo que se recibe no se debe modificar después (por ejemplo con
+        `partial_fit`); para seguir entrenándolo se debe pasar una copia.
+
+        Parámetros:
+        -----------
+        modelo : estimador de scikit-learn
+            El nuevo modelo entrenado.
+        vectorizador : CountVectorizer o HashingVectorizer, opcional
+            El nuevo vectorizador. Si no se indica se mantiene el actual.
+        modelo_path : str, opcional
+            La ruta del archivo del nuevo modelo, si está guardado. Si no se indica, el clasificador deja de
+            estar asociado a un archivo y la huella de la cache de resultados se calcula a partir del contenido.
+        vectorizador_path : str, opcional
+            La ruta del archivo del nuevo vectorizador, si está guardado.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si las clases del nuevo modelo no coinciden con las del actual.
+        """
+        if not np.array_equal(modelo.classes_, self.modelo.classes_):
+            raise ValueError("Las clases del nuevo modelo no coinciden con las del modelo actual.")
+        self._artefactos = (self.vectorizador if vectorizador is None else vectorizador, modelo)
+        self.modelo_path = modelo_path
+        self.vectorizador_path = vectorizador_path if modelo_path is not None else None
+        self.version_modelo += 1
+
+    def recargar_si_cambia(self):
+        """
+        Vuelve a cargar el modelo y el vectorizador si sus archivos han cambiado, por ejemplo al guardar un punto
+        de control del entrenamiento incremental, y los sustituye con `actualizar_modelo`.
+
+        La carga se hace antes del cambio, por lo que se puede llamar desde otro hilo sin detener la inferencia.
+
+        Devoluciones:
+        ------------
+        bool:
+            True si se han cargado artefactos nuevos.
+        """
+        if self.modelo_path is None:
+            return False
+        vectorizador, modelo = self._cargar_artefactos()
+        if vectorizador is self.vectorizador and modelo is self.modelo:
+            return False
+        self.actualizar_modelo(modelo, vectorizador, self.modelo_path, self.vectorizador_path)
+        return True
+
+    def asignar_dataframe(self, df, columna_texto=None):
+        """
+        Cambia el DataFrame a clasificar sin volver a cargar el modelo ni el vectorizador.
+
+        Parámetros:
+        -----------
+        df : pandas.DataFrame
+            El nuevo DataFrame que contiene la columna de texto a clasificar.
+        columna_texto : str, opcional
+            El nombre de la columna de texto. Si no se indica se mantiene la actual.
+        """
+        self.df = df
+        if columna_texto is not None:
+            self.columna_texto = columna_texto
+        self._inferencia = None
 
     def clasificar_texto(self, texto):
         """
@@ -161,8 +809,11 @@ class CLasificadorTexto:
         int:
             La categoría predicha para el texto.
         """
-        texto_vectorizado = self.vectorizador.transform([texto])
-        categoria_predicha = self.modelo.predict(texto_vectorizado)[0]
+        if self.escalado is not None:
+            return self.inferir_textos([texto]).categorias[0]
+        vectorizador, modelo = self._artefactos
+        texto_vectorizado = vectorizador.transform([texto])
+        categoria_predicha = modelo.predict(texto_vectorizado)[0]
         return categoria_predicha
 
     def predecir_probabilidades(self, texto):
@@ -179,12 +830,175 @@ class CLasificadorTexto:
         dict:
             Un diccionario que mapea cada categoría a su probabilidad de pertenencia para el texto dado.
         """
-        texto_vectorizado = self.vectorizador.transform([texto])
-        probabilidades = self.modelo.predict_proba(texto_vectorizado)[0]
-        categorias = self.modelo.classes_
+        if self.escalado is not None:
+            resultado = self.inferir_textos([texto])
+            return dict(zip(resultado.clases, resultado.probabilidades[0]))
+        vectorizador, modelo = self._artefactos
+        texto_vectorizado = vectorizador.transform([texto])
+        probabilidades = modelo.predict_proba(texto_vectorizado)[0]
+        categorias = modelo.classes_
         probabilidades_dict = {categoria: probabilidad for categoria, probabilidad in zip(categorias, probabilidades)}
         return probabilidades_dict
 
+    def inferir_textos(self, textos):
+        """
+        Clasifica y predice las probabilidades de una secuencia de textos por lotes.
+
+        Cada lote se vectoriza y se evalúa con `predict_proba` una única vez; la categoría predicha de cada
+        texto es la de mayor probabilidad (la primera en el orden de `modelo.classes_` si hay empate).
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos que se van a clasificar.
+
+        Devoluciones:
+        ------------
+        ResultadoClasificacion:
+            Las probabilidades de cada categoría (n_textos, n_categorias) en float32, con las columnas en el orden
+            de `modelo.classes_`, y la posición de la categoría predicha de cada texto.
+        """
+        return self._inferir(textos)
+
+    def inferir_tokens(self, listas_tokens):
+        """
+        Clasifica y predice las probabilidades de textos ya separados en tokens, por lotes.
+
+        Los tokens se vectorizan directamente contra el vocabulario del vectorizador (ver `VectorizadorTokens`),
+        sin unirlos en una cadena para volver a separarlos. El resultado es el mismo que el de `inferir_textos`
+        con los tokens unidos por espacios.
+
+        Parámetros:
+        -----------
+        listas_tokens : list of list of str
+            Los tokens de cada texto.
+
+        Devoluciones:
+        ------------
+        ResultadoClasificacion:
+            El mismo resultado que `inferir_textos`.
+        """
+        return self._inferir(listas_tokens, tokens=True)
+
+    def _inferir(self, elementos, tokens=False):
+        """
+        Vectoriza y clasifica por lotes una secuencia de textos, o de listas de tokens si `tokens` es True.
+        """
+        # Se toma la pareja actual una sola vez, por si otro hilo cambia el modelo durante la inferencia
+        vectorizador, modelo = self._artefactos
+        vectorizar = vectorizador.transform
+        if tokens:
+            vectorizador_tokens = self._vectorizador_tokens
+            if vectorizador_tokens is None or vectorizador_tokens.vectorizador is not vectorizador:
+                vectorizador_tokens = self._vectorizador_tokens = VectorizadorTokens(vectorizador)
+            vectorizar = vectorizador_tokens.transform
+        clases = modelo.classes_
+        # Los lotes se escriben directamente en la matriz final, sin concatenar resultados intermedios
+        probabilidades = np.empty((len(elementos), len(clases)), dtype=np.float32)
+        indices = np.empty(len(elementos), dtype=np.intp)
+        lotes = 0
+        for inicio in range(0, len(elementos), self.tamano_lote):
+            lote = elementos[inicio:inicio + self.tamano_lote]
+            # El modelo se evalúa una sola vez por lote: la clase predicha es la de mayor probabilidad
+            probabilidades_lote = modelo.predict_proba(vectorizar(lote))
+            indices[inicio:inicio + len(lote)] = probabilidades_lote.argmax(axis=1)
+            probabilidades[inicio:inicio + len(lote)] = probabilidades_lote
+            lotes += 1
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('inferencia', {'lotes': lotes, 'textos': len(elementos)}, acumular=True)
+        if self.escalado is not None:
+            self._escalar(elementos, tokens, probabilidades, indices)
+        return ResultadoClasificacion(probabilidades, clases, indices)
+
+    def _escalar(self, elementos, tokens, probabilidades, indices):
+        """
+        Vuelve a clasificar con el siguiente nivel de la cascada las filas que no alcanzan el umbral de confianza,
+        sustituyendo en el sitio sus probabilidades y sus índices.
+        """
+        filas = np.flatnonzero(probabilidades.max(axis=1, initial=0) < self.umbral_confianza)
+        if len(filas):
+            inferir = self.escalado.inferir_tokens if tokens else self.escalado.inferir_textos
+            with medir_etapa(self.instrumentacion, 'inferencia.escalado', len(filas)):
+                escalado = inferir([elementos[fila] for fila in filas])
+            probabilidades[filas] = escalado.probabilidades
+            indices[filas] = escalado.indices
+        self.filas_cascada += len(elementos)
+        self.filas_escaladas += len(filas)
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('cascada', self.estadisticas_cascada())
+
+    def estadisticas_cascada(self):
+        """
+        Devuelve cuántas filas ha clasificado este nivel y cuántas ha pasado al siguiente.
+
+        Devoluciones:
+        ------------
+        dict:
+            Las filas, las filas escaladas y la fracción escalada.
+        """
+        return {
+            'filas': self.filas_cascada,
+            'escaladas': self.filas_escaladas,
+            'fraccion_escalada': self.filas_escaladas / self.filas_cascada if self.filas_cascada else 0.0,
+        }
+
+    def inferir_columna_texto(self, tokens=None):
+        """
+        Clasifica toda la columna de texto del DataFrame en una única pasada por lotes.
+
+        Añade al DataFrame las columnas 'CATEGORIA_MODELO' y 'PROBABILIDAD_MAXIMA'. La columna de listas
+        'PROBABILIDADES_CATEGORIAS' solo se crea al pedirla con `anadir_lista_probabilidades`.
+        El resultado se guarda para que `clasificar_columna_texto` y `predecir_probabilidades_columna_texto`
+        no vuelvan a vectorizar la columna.
+
+        Parámetros:
+        -----------
+        tokens : list of list of str, opcional
+            Los tokens de cada fila de la columna (`Preprocesado.tokens_lematizados`). Si se indican se vectorizan
+            directamente con `inferir_tokens` en lugar de volver a separar la columna. Solo se admiten si la
+            columna de texto es `COLUMNA_TEXTO_TOKENS`.
+
+        Devoluciones:
+        ------------
+        ResultadoClasificacion:
+            Las categorías predichas y las probabilidades de cada categoría para cada texto de la columna.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si no hay DataFrame o columna de texto, si se indican tokens para otra columna o si no hay
+            una lista de tokens por fila.
+        """
+        if self.df is None or self.columna_texto is None:
+            raise ValueError("Se requiere un DataFrame y el nombre de la columna de texto.")
+        if tokens is not None and self.columna_texto != COLUMNA_TEXTO_TOKENS:
+            raise ValueError(f"Los tokens solo se pueden indicar al clasificar la columna '{COLUMNA_TEXTO_TOKENS}', no '{self.columna_texto}'.")
+        if self._inferencia is None:
+            with medir_etapa(self.instrumentacion, 'inferencia', len(self.df)):
+                if tokens is not None:
+                    if len(tokens) != len(self.df):
+                        raise ValueError("Debe haber una lista de tokens por cada fila del DataFrame.")
+                    resultado = self.inferir_tokens(tokens)
+                else:
+                    resultado = self.inferir_textos(self.df[self.columna_texto].tolist())
+                self.df['CATEGORIA_MODELO'] = resultado.categorias
+                self.df['PROBABILIDAD_MAXIMA'] = resultado.probabilidad_maxima
+            self._inferencia = resultado
+        return self._inferencia
+
+    def anadir_lista_probabilidades(self):
+        """
+        Añade al DataFrame la columna 'PROBABILIDADES_CATEGORIAS' con una lista de probabilidades por texto,
+        el formato con el que se guarda en CSV.
+
+        Devoluciones:
+        ------------
+        pandas.DataFrame:
+            El DataFrame con la nueva columna.
+        """
+        self.df['PROBABILIDADES_CATEGORIAS'] = self.inferir_columna_texto().lista_probabilidades()
+        return self.df
+
     def clasificar_columna_texto(self):
         """
         Clasifica toda la columna de texto en el DataFrame utilizando el clasificador.
@@ -194,11 +1008,7 @@ class CLasificadorTexto:
         pandas.Series:
             Una Serie de pandas que contiene las categorías predichas para cada texto en la columna.
         """
-        if self.df is None or self.columna_texto is None:
-            raise ValueError("Se requiere un DataFrame y el nombre de la columna de texto.")
-        categorias_predichas = self.df[self.columna_texto].apply(self.clasificar_texto)
-        self.df['CATEGORIA_MODELO'] = categorias_predichas
-        return categorias_predichas
+        return pd.Series(self.inferir_columna_texto().categorias, index=self.df.index)
 
     def predecir_probabilidades_columna_texto(self):
         """
@@ -210,11 +1020,152 @@ class CLasificadorTexto:
             Un DataFrame que contiene las probabilidades de pertenencia a cada categoría para cada texto en la columna.
             Las columnas del DataFrame incluyen 'TEXTO' y las probabilidades de cada categoría.
         """
-        if self.df is None or self.columna_texto is None:
-            raise ValueError("Se requiere un DataFrame y el nombre de la columna de texto.")
-        probabilidades = self.df[self.columna_texto].apply(self.predecir_probabilidades)
-        probabilidades_df = pd.DataFrame(probabilidades.tolist(), index=self.df.index)
-        self.df['PROBABILIDADES_CATEGORIAS'] = probabilidades_df.values.tolist()
-        self.df['PROBABILIDAD_MAXIMA'] = self.df['PROBABILIDADES_CATEGORIAS'].apply(lambda x: max(x))
-        return probabilidades_df 
-    
+        return self.inferir_columna_texto().a_dataframe(index=self.df.index)
+
+# Clase para procesar un CSV por bloques con memoria acotada:
+class ProcesadorPorBloques:
+    def __init__(self, path_csv, modelo_path, vectorizador_path, columna_texto='TEXTO_STOPWORDS_LEMATIZACION', tamano_bloque=TAMANO_BLOQUE_LECTURA, n_procesos=1,
+                 instrumentacion=None, path_cache=None, escalado=None, umbral_confianza=UMBRAL_CONFIANZA_CASCADA):
+        """
+        Inicializa el objeto ProcesadorPorBloques.
+
+        El modelo, el vectorizador y los recursos del preprocesado se cargan una sola vez y se reutilizan en todos los bloques.
+
+        Parámetros:
+        -----------
+        path_csv : str
+            La ruta al archivo CSV con los datos a clasificar.
+        modelo_path : str
+            La ruta al archivo .pkl que contiene el modelo entrenado.
+        vectorizador_path : str
+            La ruta al archivo .pkl que contiene el vectorizador entrenado.
+        columna_texto : str, opcional
+            El nombre de la columna preprocesada que se usa para clasificar: 'TEXTO_LIMPIO' o una de `VARIANTES_TEXTO`.
+            La limpieza genera esa variante además de las de `VARIANTES_TEXTO_DEFECTO` (ver `variantes_columna`).
+        tamano_bloque : int, opcional
+            El número de filas que se leen, procesan y guardan en cada bloque.
+        n_procesos : int, opcional
+            El número de procesos con los que se realiza la limpieza de cada bloque.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, cada etapa acumula sus medidas de todos los bloques.
+        path_cache : str, opcional
+            La ruta de un archivo SQLite con la cache de resultados (ver `src.cache_resultados`). Si se indica,
+            los textos ya clasificados en ejecuciones anteriores y los repetidos no se vuelven a procesar.
+        escalado : CLasificadorTexto, opcional
+            El siguiente nivel de la cascada para las filas que no alcanzan `umbral_confianza` (ver CLasificadorTexto).
+        umbral_confianza : float, opcional
+            El umbral de confianza de la cascada.
+        """
+        self.instrumentacion = instrumentacion
+        self.lector = LectorCSV(path_csv, instrumentacion=instrumentacion)
+        self.tamano_bloque = tamano_bloque
+        self.preprocesado = Preprocesado(None, 'TEXTO', n_procesos=n_procesos, variantes=variantes_columna(columna_texto), instrumentacion=instrumentacion)
+        self.clasificador = CLasificadorTexto(modelo_path=modelo_path, vectorizador_path=vectorizador_path, columna_texto=columna_texto,
+                                              instrumentacion=instrumentacion, escalado=escalado, umbral_confianza=umbral_confianza)
+        self.cache_resultados = None
+        if path_cache is not None:
+            self.cache_resultados = ClasificadorConCache(self.preprocesado, self.clasificador, path_cache, instrumentacion=instrumentacion)
+
+    def procesar_bloque(self, bloque, lista_probabilidades=True, devolver_resultado=False):
+        """
+        Limpia y clasifica un bloque del CSV.
+
+        Parámetros:
+        -----------
+        bloque : pandas.DataFrame
+            El bloque tal y como se lee del CSV.
+        lista_probabilidades : bool, opcional
+            Si se crea la columna de listas 'PROBABILIDADES_CATEGORIAS', necesaria solo para guardar en CSV.
+        devolver_resultado : bool, opcional
+            Si se devuelve también el ResultadoClasificacion de las filas del bloque, por ejemplo para guardar
+            sus probabilidades en Parquet sin pasar por la columna de listas.
+
+        Devoluciones:
+        ------------
+        pandas.DataFrame o tuple:
+            El bloque clasificado con las columnas de `columnas_deseadas` y las emociones ya mapeadas, junto
+            con su ResultadoClasificacion si `devolver_resultado` es True.
+        """
+        # Se cambian los nombres de las columnas y se convierten a su tipo correspondiente
+        bloque = bloque.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+        bloque['ID'] = bloque['ID'].astype(int)
+        bloque['TEXTO'] = bloque['TEXTO'].astype(TIPO_TEXTO)
+        bloque['CATEGORIA'] = bloque['CATEGORIA'].astype(int)
+        if self.cache_resultados is not None:
+            # Preprocesado y clasificación a través de la cache de resultados
+            bloque, resultado = self.cache_resultados.clasificar_dataframe(bloque, 'TEXTO')
+        else:
+            # Preprocesado y limpieza de la columna TEXTO
+            self.preprocesado.df = bloque
+            bloque = self.preprocesado.limpieza()
+            # Clasificación y predicción. Los tokens de la limpieza solo se usan si se clasifica su columna
+            self.clasificador.asignar_dataframe(bloque)
+            tokens = self.preprocesado.tokens_lematizados if self.clasificador.columna_texto == COLUMNA_TEXTO_TOKENS else None
+            resultado = self.clasificador.inferir_columna_texto(tokens=tokens)
+            self.preprocesado.tokens_lematizados = None
+        # Se eliminan las columnas intermedias en lugar de copiar las que se guardan
+        eliminar_columnas(bloque, columnas_deseadas)
+        if lista_probabilidades:
+            bloque['PROBABILIDADES_CATEGORIAS'] = resultado.lista_probabilidades()
+        # Se reemplazan los números por las emociones correspondientes
+        bloque['CATEGORIA_MODELO'] = resultado.emociones()
+        bloque['CATEGORIA'] = mapear_emociones(bloque['CATEGORIA'])
+        if devolver_resultado:
+            return bloque, resultado
+        return bloque
+
+    def ejecutar(self, path_guardado):
+        """
+        Lee, limpia, clasifica y guarda el CSV bloque a bloque.
+
+        Cada bloque se anexa al archivo de salida en cuanto se procesa, por lo que la memoria
+        máxima depende del tamaño del bloque y no del tamaño del archivo de entrada. Un error al escribir
+        cualquier bloque detiene la ejecución. Si la entrada no tiene filas, se guarda igualmente la tabla
+        vacía con su cabecera (o su esquema en Parquet).
+
+        Parámetros:
+        -----------
+        path_guardado : str
+            La ruta donde se guarda la tabla clasificada. Si termina en `EXTENSION_PARQUET` se guarda en
+            formato Parquet con un grupo de filas por bloque (ver `GuardarParquet`); si no, en CSV.
+
+        Devoluciones:
+        ------------
+        int:
+            El número de filas guardadas.
+
+        Excepciones:
+        ------------
+        Exception
+            Los errores de lectura y de escritura de cualquier bloque se vuelven a lanzar.
+        """
+        filas_guardadas = 0
+        bloques = 0
+        escritor_parquet = None
+        if path_guardado.endswith(EXTENSION_PARQUET):
+            escritor_parquet = GuardarParquet(path_guardado, clases=self.clasificador.modelo.classes_, instrumentacion=self.instrumentacion)
+        with self.preprocesado:
+            try:
+                for numero_bloque, bloque in enumerate(self.lector.leer_por_bloques(self.tamano_bloque)):
+                    bloque, resultado = self.procesar_bloque(bloque, lista_probabilidades=escritor_parquet is None, devolver_resultado=True)
+                    if escritor_parquet is not None:
+                        # Las probabilidades se toman de la matriz de la inferencia y no de la columna de listas
+                        escritor_parquet.guardar_dataframe(bloque, probabilidades=resultado.probabilidades)
+                    else:
+                        GuardarCSV(bloque, instrumentacion=self.instrumentacion).guardar_dataframe(path_guardado, columnas=columnas_deseadas, anexar=numero_bloque > 0,
+                                                                                                   propagar_errores=True)
+                    filas_guardadas += len(bloque)
+                    bloques += 1
+                if bloques == 0:
+                    # Sin filas en la entrada se guarda la tabla vacía, para que la salida tenga cabecera y esquema
+                    vacio = pd.DataFrame({columna: [] for columna in columnas_deseadas})
+                    if escritor_parquet is not None:
+                        escritor_parquet.guardar_dataframe(vacio, probabilidades=np.empty((0, len(escritor_parquet.clases)), dtype=np.float32))
+                    else:
+                        GuardarCSV(vacio, instrumentacion=self.instrumentacion).guardar_dataframe(path_guardado, columnas=columnas_deseadas, propagar_errores=True)
+            finally:
+                if escritor_parquet is not None:
+                    escritor_parquet.cerrar()
+                if self.cache_resultados is not None:
+                    self.cache_resultados.cerrar()
+        return filas_guardadas
@@ -15,3 +15,118 @@ patron_palabras_repetidas= r"(\b\w+( \w+)*?\b)(\s\1)+"
 
 # Patrón que busca vocales repetidas:
 patron_vocales_repetidas = r"(^[aeiou]{3,})"
+
+# Versión precompilada del patrón de consonantes que usa la limpieza en una sola pasada (`limpieza_texto`):
+regex_consonantes_repetidas = re.compile(patron_consonantes_repetidas)
+
+# Número máximo de palabras de un grupo repetido que se colapsa en la limpieza:
+LONGITUD_MAXIMA_FRASE_REPETIDA = 16
+
+# Número de textos que se vectorizan y clasifican de una sola vez en la inferencia por lotes:
+TAMANO_LOTE_INFERENCIA = 50000
+
+# Número de filas del CSV que se leen, procesan y guardan en cada bloque en el modo por bloques:
+TAMANO_BLOQUE_LECTURA = 100000
+
+# Diccionario de mapeo de los códigos de las clases a los nombres de las emociones:
+mapeo_emociones = {
+    0: 'Tristeza',
+    1: 'Alegría',
+    2: 'Amor',
+    3: 'Ira',
+    4: 'Miedo',
+    5: 'Sorpresa'
+}
+
+# Columnas que se guardan en la tabla clasificada:
+columnas_deseadas = ['ID', 'TEXTO', 'TEXTO_LIMPIO', 'CATEGORIA', 'CATEGORIA_MODELO', 'PROBABILIDADES_CATEGORIAS', 'PROBABILIDAD_MAXIMA']
+
+# Representaciones del texto que puede generar la limpieza, en el orden en que se añaden al DataFrame:
+VARIANTES_TEXTO = ('TEXTO_STOPWORDS', 'TEXTO_STOPWORDS_STEMMING', 'TEXTO_STOPWORDS_LEMATIZACION', 'TEXTO_LEMATIZACION', 'TEXTO_STEMMING')
+
+# Representaciones que genera la limpieza por defecto (la que usa el modelo en producción):
+VARIANTES_TEXTO_DEFECTO = ('TEXTO_STOPWORDS_LEMATIZACION',)
+
+# Columna preprocesada cuyos tokens guarda la limpieza (ver `Preprocesado.tokens_lematizados`), la única que se
+# puede vectorizar directamente desde los tokens:
+COLUMNA_TEXTO_TOKENS = 'TEXTO_STOPWORDS_LEMATIZACION'
+
+# Tipo de las columnas de texto (cadenas en Arrow, más compactas que los objetos de Python):
+TIPO_TEXTO = 'string[pyarrow]'
+
+# Número de filas que se envían a cada proceso en cada tarea de la limpieza en paralelo:
+TAMANO_FRAGMENTO_PROCESO = 2000
+
+# Componentes del modelo de spaCy que no se necesitan para lematizar y no se cargan:
+COMPONENTES_SPACY_EXCLUIDOS = ["parser", "ner"]
+
+# Número de textos que spaCy procesa en cada lote de `nlp.pipe`:
+TAMANO_LOTE_SPACY = 1000
+
+# Número máximo de palabras cuyos veredictos de limpieza se memorizan en cada proceso:
+TAMANO_CACHE_PALABRAS = 200000
+
+# Número máximo de textos cuyos lemas se memorizan en cada proceso:
+TAMANO_CACHE_LEMAS = 100000
+
+# Política de expulsión de las caches anteriores ('lru' o 'fifo'):
+POLITICA_CACHE = 'lru'
+
+# Espera máxima, en milisegundos, de un micro-lote del servicio en línea antes de procesarse:
+VENTANA_LATENCIA_MS = 5
+
+# Número máximo de textos de un micro-lote del servicio en línea:
+TAMANO_MAXIMO_MICROLOTE = 256
+
+# Número máximo de textos en espera en el servicio en línea; con la cola llena se responde 503:
+TAMANO_COLA_SERVICIO = 10000
+
+# Tamaño máximo, en bytes, del cuerpo de una petición al servicio en línea; con uno mayor se responde 413:
+TAMANO_MAXIMO_CUERPO = 1024 * 1024
+
+# Prefijo de las métricas que se exportan en el formato de texto de Prometheus:
+PREFIJO_METRICAS = 'clasificador_texto'
+
+# Extensión con la que se guarda la tabla clasificada en formato columnar (Parquet) en lugar de CSV:
+EXTENSION_PARQUET = '.parquet'
+
+# Compresión de los archivos Parquet ('zstd', 'snappy', 'gzip' o None):
+COMPRESION_PARQUET = 'zstd'
+
+# Número máximo de filas de cada grupo de filas de los archivos Parquet:
+TAMANO_GRUPO_FILAS = 100000
+
+# Versión de la limpieza y del preprocesado. Forma parte de la huella de la cache de resultados,
+# por lo que al incrementarla se invalidan los resultados guardados con la versión anterior:
+VERSION_PREPROCESADO = 1
+
+# Número máximo de claves por consulta a la cache de resultados (SQLite limita las variables por sentencia):
+CLAVES_POR_CONSULTA = 900
+
+# Número máximo de tokens cuyas columnas del vocabulario se memorizan al vectorizar listas de tokens:
+TAMANO_CACHE_TOKENS = 200000
+
+# Número de particiones de la validación cruzada estratificada con la que se seleccionan los modelos:
+N_PARTICIONES_CV = 10
+
+# Semilla de las particiones, de las submuestras y de los modelos del entrenamiento:
+SEMILLA_ENTRENAMIENTO = 42
+
+# Factor de la búsqueda por reducción sucesiva: en cada ronda sigue 1/FACTOR_REDUCCION de los candidatos,
+# que se entrenan con FACTOR_REDUCCION veces más filas:
+FACTOR_REDUCCION = 3
+
+# Directorio y nombres de los artefactos del modelo elegido, los que carga CLasificadorTexto:
+DIRECTORIO_MODELOS = 'modelos'
+NOMBRE_MODELO = 'modelo_TF_SDG_SW_L.pkl'
+NOMBRE_VECTORIZADOR = 'vectorizador_TF_SDG_SW_L.pkl'
+
+# Número de bloques entre dos puntos de control del entrenamiento incremental:
+INTERVALO_PUNTO_CONTROL = 10
+
+# Número de columnas del vectorizador por hashing del entrenamiento incremental:
+N_CARACTERISTICAS_HASHING = 2 ** 20
+
+# Umbral de confianza de la cascada de modelos: las filas cuya PROBABILIDAD_MAXIMA no llega a este valor
+# se vuelven a clasificar con el siguiente modelo de la cascada:
+UMBRAL_CONFIANZA_CASCADA = 0.7
@@ -0,0 +1,569 @@
+# Entrenamiento y selección del modelo con una búsqueda por reducción sucesiva (successive halving).
+#
+# Sustituye a las búsquedas GridSearchCV de `pruebas.ipynb` (SGD, regresión logística, SVC y LinearSVC con
+# StratifiedKFold de 10 particiones y 'f1_weighted'). En GridSearchCV cada candidato vuelve a ajustar el
+# CountVectorizer en cada partición aunque los parámetros del vectorizador no cambien. Aquí el vectorizador se
+# ajusta una sola vez por partición y por combinación de sus parámetros (el analizador), y las matrices se
+# reutilizan en todos los candidatos y en todas las rondas. En cada ronda los candidatos se evalúan en paralelo
+# y solo sigue 1/factor de ellos, entrenados con factor veces más filas, hasta usar las particiones completas.
+# Se registra el tiempo de ajuste y de evaluación de cada candidato, y el ganador se vuelve a entrenar con
+# todos los datos y se guarda con los nombres de `modelos/` que carga CLasificadorTexto en el directorio que se
+# indique. El directorio es obligatorio para no sustituir por descuido el modelo en producción de `modelos/`.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m src.entrenamiento --datos df_limpio.pkl --directorio modelos_candidatos [--modelos sgd logistica svc linear_svc] [--n-jobs -1]
+#     python -m src.entrenamiento --datos datos.csv --preprocesar --directorio modelos_candidatos   (limpia el CSV original como main.py antes de entrenar)
+
+# Se importan las librerías pertinentes:
+import argparse
+import hashlib
+import importlib
+import math
+import os
+import time
+import warnings
+from src.constantes import *
+from src.instrumentacion import medir_etapa
+from src.recursos import importar_perezoso
+
+np = importar_perezoso("numpy")
+pd = importar_perezoso("pandas")
+
+# Espacios de búsqueda de `pruebas.ipynb`. Para cada familia: la clase del modelo, sus parámetros fijos y la
+# rejilla de sus hiperparámetros. La pérdida 'log' del SGD se llama 'log_loss' en las versiones actuales de
+# scikit-learn, y LogisticRegression con 'lbfgs' ya es multinomial sin indicar `multi_class`:
+ESPACIOS_BUSQUEDA = {
+    'sgd': ('sklearn.linear_model.SGDClassifier', {'max_iter': 2000, 'tol': 1e-3}, {
+        'loss': ['modified_huber', 'log_loss'],
+        'penalty': ['l2', 'l1', 'elasticnet'],
+        'alpha': [0.0001, 0.001, 0.01, 0.1],
+        'class_weight': ['balanced', None],
+    }),
+    'logistica': ('sklearn.linear_model.LogisticRegression', {'solver': 'lbfgs', 'max_iter': 2000}, {
+        'C': [0.01, 0.1, 1.0, 10.0],
+        'class_weight': ['balanced', None],
+    }),
+    'svc': ('sklearn.svm.SVC', {'kernel': 'linear'}, {
+        'C': [0.01, 0.1, 1.0, 10.0],
+        'class_weight': ['balanced', None],
+    }),
+    'linear_svc': ('sklearn.svm.LinearSVC', {'multi_class': 'crammer_singer', 'max_iter': 2000}, {
+        'C': [0.01, 0.1, 1.0, 10.0],
+        'class_weight': ['balanced', None],
+    }),
+}
+
+# Rejilla de los parámetros del CountVectorizer, común a todas las familias:
+REJILLA_VECTORIZADOR = {'analyzer': ['word', 'char_wb']}
+
+def crear_modelo(familia, parametros=None, semilla=SEMILLA_ENTRENAMIENTO):
+    """
+    Crea un modelo sin entrenar de una de las familias de `ESPACIOS_BUSQUEDA`.
+
+    Parámetros:
+    -----------
+    familia : str
+        La familia del modelo ('sgd', 'logistica', 'svc' o 'linear_svc').
+    parametros : dict, opcional
+        Los hiperparámetros del candidato, que se suman a los fijos de la familia.
+    semilla : int, opcional
+        La semilla del modelo, si el modelo la admite.
+
+    Devoluciones:
+    ------------
+    estimador de scikit-learn:
+        El modelo sin entrenar.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si la familia no existe.
+    """
+    if familia not in ESPACIOS_BUSQUEDA:
+        raise ValueError(f"La familia de modelos debe ser una de {list(ESPACIOS_BUSQUEDA)}.")
+    ruta_clase, fijos, _ = ESPACIOS_BUSQUEDA[familia]
+    modulo, nombre = ruta_clase.rsplit('.', 1)
+    modelo = getattr(importlib.import_module(modulo), nombre)(**fijos)
+    if 'random_state' in modelo.get_params():
+        modelo.set_params(random_state=semilla)
+    return modelo.set_params(**(parametros or {}))
+
+def generar_candidatos(familias=None, rejilla_vectorizador=REJILLA_VECTORIZADOR):
+    """
+    Genera todas las combinaciones de parámetros del vectorizador y del modelo de las familias indicadas.
+
+    Parámetros:
+    -----------
+    familias : list of str, opcional
+        Las familias de `ESPACIOS_BUSQUEDA` que se prueban. Por defecto, todas.
+    rejilla_vectorizador : dict, opcional
+        La rejilla de los parámetros del CountVectorizer.
+
+    Devoluciones:
+    ------------
+    list of dict:
+        Los candidatos, cada uno con las claves 'familia', 'vectorizador' y 'modelo'.
+    """
+    from sklearn.model_selection import ParameterGrid
+    candidatos = []
+    for familia in familias or list(ESPACIOS_BUSQUEDA):
+        if familia not in ESPACIOS_BUSQUEDA:
+            raise ValueError(f"La familia de modelos debe ser una de {list(ESPACIOS_BUSQUEDA)}.")
+        for parametros_vectorizador in ParameterGrid(rejilla_vectorizador):
+            for parametros_modelo in ParameterGrid(ESPACIOS_BUSQUEDA[familia][2]):
+                candidatos.append({'familia': familia, 'vectorizador': parametros_vectorizador, 'modelo': parametros_modelo})
+    return candidatos
+
+def _clave_vectorizador(parametros):
+    return tuple(sorted(parametros.items()))
+
+def _vectorizar_particion(textos_entrenamiento, textos_validacion, parametros):
+    """
+    Ajusta un CountVectorizer con las filas de entrenamiento de una partición y transforma las dos partes.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    vectorizador = CountVectorizer(**parametros)
+    return vectorizador.fit_transform(textos_entrenamiento), vectorizador.transform(textos_validacion)
+
+def _evaluar(modelo, X_entrenamiento, y_entrenamiento, X_validacion, y_validacion):
+    """
+    Entrena un candidato en una partición y calcula su F1 ponderado en la parte de validación.
+
+    Devoluciones:
+    ------------
+    tuple:
+        La puntuación, los segundos de ajuste y los segundos de evaluación.
+    """
+    from sklearn.metrics import f1_score
+    inicio = time.perf_counter()
+    modelo.fit(X_entrenamiento, y_entrenamiento)
+    segundos_ajuste = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    puntuacion = f1_score(y_validacion, modelo.predict(X_validacion), average='weighted')
+    return puntuacion, segundos_ajuste, time.perf_counter() - inicio
+
+def guardar_artefacto(objeto, path):
+    """
+    Guarda un objeto con joblib a través de un temporal, para que CLasificadorTexto nunca cargue un archivo a medio escribir.
+
+    Parámetros:
+    -----------
+    objeto : object
+        El modelo o el vectorizador.
+    path : str
+        La ruta del archivo .pkl.
+    """
+    import joblib
+    temporal = f"{path}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as archivo:
+        joblib.dump(objeto, archivo)
+    os.replace(temporal, path)
+
+# Clase para guardar las matrices vectorizadas de cada partición:
+class CacheMatrices:
+    def __init__(self, textos, particiones, directorio=None):
+        """
+        Inicializa el objeto CacheMatrices.
+
+        Guarda, para cada partición y cada combinación de parámetros del vectorizador, la matriz de las filas
+        de entrenamiento (con el vectorizador ajustado solo con ellas) y la de las filas de validación.
+
+        Parámetros:
+        -----------
+        textos : numpy.ndarray
+            Los textos de entrenamiento.
+        particiones : list of tuple
+            Los índices de entrenamiento y de validación de cada partición.
+        directorio : str, opcional
+            Si se indica, las matrices también se guardan en archivos .npz en este directorio y se reutilizan
+            en las siguientes ejecuciones con los mismos textos y particiones.
+        """
+        self.textos = textos
+        self.particiones = particiones
+        self.directorio = directorio
+        self.matrices = {}
+        self.huella = None
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+            resumen = hashlib.blake2b(digest_size=16)
+            for texto in textos:
+                resumen.update(texto.encode('utf-8', 'surrogatepass') + b'\0')
+            for indices_entrenamiento, _ in particiones:
+                resumen.update(np.ascontiguousarray(indices_entrenamiento, dtype=np.int64).tobytes())
+            self.huella = resumen.hexdigest()
+
+    def _paths(self, particion, parametros):
+        nombre = hashlib.blake2b(repr(_clave_vectorizador(parametros)).encode('utf-8'), digest_size=8).hexdigest()
+        base = os.path.join(self.directorio, f"{self.huella}_{particion}_{nombre}")
+        return f"{base}_entrenamiento.npz", f"{base}_validacion.npz"
+
+    def preparar(self, lista_parametros, n_jobs=1):
+        """
+        Vectoriza, en paralelo, las particiones que aún no están en la cache.
+
+        Parámetros:
+        -----------
+        lista_parametros : list of dict
+            Las combinaciones de parámetros del vectorizador que se necesitan.
+        n_jobs : int, opcional
+            El número de procesos con los que se ajustan los vectorizadores.
+        """
+        from joblib import Parallel, delayed
+        from scipy import sparse
+        pendientes = []
+        for parametros in {_clave_vectorizador(parametros): parametros for parametros in lista_parametros}.values():
+            for particion in range(len(self.particiones)):
+                clave = (particion, _clave_vectorizador(parametros))
+                if clave in self.matrices:
+                    continue
+                if self.directorio and all(os.path.exists(path) for path in self._paths(particion, parametros)):
+                    self.matrices[clave] = tuple(sparse.load_npz(path) for path in self._paths(particion, parametros))
+                    continue
+                pendientes.append((particion, parametros))
+        resultados = Parallel(n_jobs=n_jobs, prefer='processes')(
+            delayed(_vectorizar_particion)(self.textos[self.particiones[particion][0]], self.textos[self.particiones[particion][1]], parametros)
+            for particion, parametros in pendientes
+        )
+        for (particion, parametros), matrices in zip(pendientes, resultados):
+            self.matrices[(particion, _clave_vectorizador(parametros))] = matrices
+            if self.directorio:
+                for path, matriz in zip(self._paths(particion, parametros), matrices):
+                    temporal = f"{path}.{os.getpid()}.tmp"
+                    with open(temporal, 'wb') as archivo:
+                        sparse.save_npz(archivo, matriz, compressed=False)
+                    os.replace(temporal, path)
+
+    def obtener(self, particion, parametros):
+        """
+        Devuelve las matrices de entrenamiento y de validación de una partición.
+
+        Parámetros:
+        -----------
+        particion : int
+            El número de la partición.
+        parametros : dict
+            Los parámetros del vectorizador.
+
+        Devoluciones:
+        ------------
+        tuple of scipy.sparse.csr_matrix:
+            La matriz de entrenamiento y la de validación.
+        """
+        clave = (particion, _clave_vectorizador(parametros))
+        if clave not in self.matrices:
+            self.preparar([parametros])
+        return self.matrices[clave]
+
+# Clase para seleccionar el modelo con una búsqueda por reducción sucesiva:
+class SeleccionModelos:
+    def __init__(self, familias=None, rejilla_vectorizador=REJILLA_VECTORIZADOR, n_particiones=N_PARTICIONES_CV,
+                 factor=FACTOR_REDUCCION, n_jobs=-1, preferencia='threads', semilla=SEMILLA_ENTRENAMIENTO,
+                 directorio_cache=None, instrumentacion=None):
+        """
+        Inicializa el objeto SeleccionModelos.
+
+        El recurso que crece en cada ronda es el número de filas de entrenamiento de cada partición. Las filas de
+        una ronda son las primeras de una permutación fija de la partición, y el vectorizador de la partición se
+        ajusta con todas sus filas, por lo que las rondas solo cuestan el ajuste de los modelos. La validación se
+        hace siempre con la parte de validación completa.
+
+        Parámetros:
+        -----------
+        familias : list of str, opcional
+            Las familias de `ESPACIOS_BUSQUEDA` que se prueban. Por defecto, todas.
+        rejilla_vectorizador : dict, opcional
+            La rejilla de los parámetros del CountVectorizer.
+        n_particiones : int, opcional
+            El número de particiones de StratifiedKFold.
+        factor : int, opcional
+            En cada ronda sigue 1/factor de los candidatos, con factor veces más filas.
+        n_jobs : int, opcional
+            El número de candidatos y particiones que se evalúan a la vez (-1 para usar todos los núcleos).
+        preferencia : str, opcional
+            'threads' o 'processes'. Con hilos las matrices se comparten sin copiarse; los ajustes de SGD,
+            liblinear y libsvm liberan el GIL.
+        semilla : int, opcional
+            La semilla de las particiones, de las permutaciones y de los modelos.
+        directorio_cache : str, opcional
+            El directorio donde se guardan las matrices vectorizadas para reutilizarlas entre ejecuciones.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se miden la vectorización, cada ronda y el ajuste final.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si el factor es menor que 2 o el número de particiones menor que 2.
+        """
+        if factor < 2:
+            raise ValueError("El factor de reducción debe ser al menos 2.")
+        if n_particiones < 2:
+            raise ValueError("Se necesitan al menos 2 particiones.")
+        self.candidatos = generar_candidatos(familias, rejilla_vectorizador)
+        self.n_particiones = n_particiones
+        self.factor = factor
+        self.n_jobs = n_jobs
+        self.preferencia = preferencia
+        self.semilla = semilla
+        self.directorio_cache = directorio_cache
+        self.instrumentacion = instrumentacion
+        self.resultados = []
+        self.mejor_candidato = None
+        self.mejor_puntuacion = None
+        self.vectorizador = None
+        self.modelo = None
+
+    def _particiones(self, etiquetas):
+        from sklearn.model_selection import StratifiedKFold
+        aleatorio = np.random.default_rng(self.semilla)
+        validacion_cruzada = StratifiedKFold(n_splits=self.n_particiones, shuffle=True, random_state=self.semilla)
+        # Las filas de entrenamiento se permutan para que las primeras n sean una submuestra aleatoria
+        return [(aleatorio.permutation(entrenamiento), validacion) for entrenamiento, validacion in validacion_cruzada.split(np.zeros(len(etiquetas)), etiquetas)]
+
+    def _recursos(self, n_maximo, n_clases):
+        """
+        Calcula las filas de entrenamiento de cada ronda, de modo que la última use las particiones completas.
+        """
+        n_rondas = 1 + int(math.floor(math.log(len(self.candidatos), self.factor) + 1e-9)) if len(self.candidatos) > 1 else 1
+        minimo = max(2 * self.n_particiones * n_clases, n_maximo // self.factor ** (n_rondas - 1))
+        # Si no hay filas suficientes se reducen las rondas
+        while n_rondas > 1 and minimo * self.factor ** (n_rondas - 1) > n_maximo:
+            n_rondas -= 1
+        return [min(n_maximo, minimo * self.factor ** ronda) for ronda in range(n_rondas)]
+
+    def buscar(self, textos, etiquetas):
+        """
+        Ejecuta la búsqueda y guarda el mejor candidato en `mejor_candidato`.
+
+        Parámetros:
+        -----------
+        textos : array-like of str
+            Los textos preprocesados.
+        etiquetas : array-like
+            Las categorías de los textos.
+
+        Devoluciones:
+        ------------
+        pandas.DataFrame:
+            Una fila por candidato y ronda, con la puntuación media y su desviación, y los segundos medios
+            y totales de ajuste y de evaluación, ordenada por ronda y puntuación.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si los textos y las etiquetas no tienen la misma longitud.
+        """
+        from joblib import Parallel, delayed
+        from sklearn.exceptions import ConvergenceWarning
+        textos = np.asarray(textos, dtype=object)
+        etiquetas = np.asarray(etiquetas)
+        if len(textos) != len(etiquetas):
+            raise ValueError("Debe haber una etiqueta por cada texto.")
+        particiones = self._particiones(etiquetas)
+        cache = CacheMatrices(textos, particiones, self.directorio_cache)
+        with medir_etapa(self.instrumentacion, 'entrenamiento.vectorizacion', len(textos)):
+            cache.preparar([candidato['vectorizador'] for candidato in self.candidatos], self.n_jobs)
+        recursos = self._recursos(min(len(entrenamiento) for entrenamiento, _ in particiones), len(np.unique(etiquetas)))
+        self.resultados = []
+        n_ajustes = 0
+        def tarea(indice, particion, n_filas):
+            candidato = self.candidatos[indice]
+            X_entrenamiento, X_validacion = cache.obtener(particion, candidato['vectorizador'])
+            entrenamiento, validacion = particiones[particion]
+            return delayed(_evaluar)(crear_modelo(candidato['familia'], candidato['modelo'], self.semilla),
+                                     X_entrenamiento[:n_filas], etiquetas[entrenamiento[:n_filas]], X_validacion, etiquetas[validacion])
+        supervivientes = list(range(len(self.candidatos)))
+        for ronda, n_filas in enumerate(recursos):
+            tareas = [(indice, particion) for indice in supervivientes for particion in range(self.n_particiones)]
+            n_ajustes += len(tareas)
+            with medir_etapa(self.instrumentacion, 'entrenamiento.ronda', len(tareas)), warnings.catch_warnings():
+                warnings.simplefilter('ignore', ConvergenceWarning)
+                medidas = Parallel(n_jobs=self.n_jobs, prefer=self.preferencia)(tarea(indice, particion, n_filas) for indice, particion in tareas)
+            por_candidato = {}
+            for (indice, _), medida in zip(tareas, medidas):
+                por_candidato.setdefault(indice, []).append(medida)
+            puntuaciones = {}
+            for indice, medidas_candidato in por_candidato.items():
+                puntuacion, segundos_ajuste, segundos_evaluacion = (np.array(valores) for valores in zip(*medidas_candidato))
+                puntuaciones[indice] = puntuacion.mean()
+                self.resultados.append({
+                    'ronda': ronda,
+                    'filas': n_filas,
+                    'candidato': indice,
+                    'familia': self.candidatos[indice]['familia'],
+                    'vectorizador': self.candidatos[indice]['vectorizador'],
+                    'modelo': self.candidatos[indice]['modelo'],
+                    'puntuacion_media': puntuacion.mean(),
+                    'puntuacion_std': puntuacion.std(),
+                    'segundos_ajuste_medio': segundos_ajuste.mean(),
+                    'segundos_evaluacion_medio': segundos_evaluacion.mean(),
+                    'segundos_ajuste_total': segundos_ajuste.sum(),
+                    'segundos_evaluacion_total': segundos_evaluacion.sum(),
+                })
+            supervivientes = sorted(supervivientes, key=lambda indice: puntuaciones[indice], reverse=True)
+            if ronda < len(recursos) - 1:
+                supervivientes = supervivientes[:max(1, math.ceil(len(supervivientes) / self.factor))]
+        self.mejor_candidato = self.candidatos[supervivientes[0]]
+        self.mejor_puntuacion = puntuaciones[supervivientes[0]]
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('entrenamiento', {
+                'candidatos': len(self.candidatos), 'rondas': len(recursos), 'ajustes': n_ajustes,
+                'mejor_puntuacion': float(self.mejor_puntuacion),
+            })
+        return pd.DataFrame(self.resultados).sort_values(['ronda', 'puntuacion_media'], ascending=[True, False], ignore_index=True)
+
+    def ajustar_mejor(self, textos, etiquetas):
+        """
+        Entrena el vectorizador y el modelo del mejor candidato con todos los datos.
+
+        CLasificadorTexto necesita `predict_proba`; los modelos que no lo tienen (SVC y LinearSVC, o el SGD con
+        pérdida 'hinge') se calibran con CalibratedClassifierCV.
+
+        Parámetros:
+        -----------
+        textos : array-like of str
+            Los textos preprocesados.
+        etiquetas : array-like
+            Las categorías de los textos.
+
+        Devoluciones:
+        ------------
+        tuple:
+            El CountVectorizer y el modelo entrenados.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si todavía no se ha ejecutado `buscar`.
+        """
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.exceptions import ConvergenceWarning
+        from sklearn.feature_extraction.text import CountVectorizer
+        if self.mejor_candidato is None:
+            raise ValueError("Primero se debe ejecutar la búsqueda con buscar().")
+        with medir_etapa(self.instrumentacion, 'entrenamiento.ajuste_final', len(textos)):
+            self.vectorizador = CountVectorizer(**self.mejor_candidato['vectorizador'])
+            matriz = self.vectorizador.fit_transform(textos)
+            modelo = crear_modelo(self.mejor_candidato['familia'], self.mejor_candidato['modelo'], self.semilla)
+            if not hasattr(modelo, 'predict_proba'):
+                modelo = CalibratedClassifierCV(modelo, cv=3)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', ConvergenceWarning)
+                self.modelo = modelo.fit(matriz, np.asarray(etiquetas))
+        return self.vectorizador, self.modelo
+
+    def exportar(self, directorio, nombre_modelo=NOMBRE_MODELO, nombre_vectorizador=NOMBRE_VECTORIZADOR):
+        """
+        Guarda el vectorizador y el modelo entrenados con los nombres que carga CLasificadorTexto.
+
+        Parámetros:
+        -----------
+        directorio : str
+            El directorio de los artefactos. Se pide de forma explícita porque, con los nombres por defecto,
+            exportar en `DIRECTORIO_MODELOS` sustituye al modelo en producción.
+        nombre_modelo : str, opcional
+            El nombre del archivo del modelo.
+        nombre_vectorizador : str, opcional
+            El nombre del archivo del vectorizador.
+
+        Devoluciones:
+        ------------
+        tuple of str:
+            Las rutas del modelo y del vectorizador, o None si no se pudieron guardar.
+        """
+        try:
+            if self.modelo is None:
+                raise ValueError("Primero se debe entrenar el mejor candidato con ajustar_mejor().")
+            os.makedirs(directorio, exist_ok=True)
+            path_modelo = os.path.join(directorio, nombre_modelo)
+            path_vectorizador = os.path.join(directorio, nombre_vectorizador)
+            guardar_artefacto(self.vectorizador, path_vectorizador)
+            guardar_artefacto(self.modelo, path_modelo)
+            print("El modelo y el vectorizador fueron guardados correctamente en", directorio)
+            return path_modelo, path_vectorizador
+        except Exception as e:
+            print("Ocurrió un error al guardar el modelo y el vectorizador:", str(e))
+            return None
+
+def cargar_datos(path, columna_texto, columna_objetivo, preprocesar=False, n_procesos=1):
+    """
+    Carga los datos de entrenamiento desde un archivo .pkl, .parquet o .csv.
+
+    Parámetros:
+    -----------
+    path : str
+        La ruta del archivo.
+    columna_texto : str
+        La columna con los textos preprocesados.
+    columna_objetivo : str
+        La columna con las categorías.
+    preprocesar : bool, opcional
+        Si el archivo es el CSV original (columnas 'text' y 'label') y se limpia con Preprocesado como en `main.py`.
+    n_procesos : int, opcional
+        El número de procesos de la limpieza.
+
+    Devoluciones:
+    ------------
+    tuple of numpy.ndarray:
+        Los textos y las categorías, sin las filas con valores nulos.
+    """
+    if path.endswith('.pkl'):
+        df = pd.read_pickle(path)
+    elif path.endswith(EXTENSION_PARQUET):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if preprocesar:
+        from src.clases import Preprocesado
+        df = df.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+        df['TEXTO'] = df['TEXTO'].astype(str)
+        with Preprocesado(df, 'TEXTO', n_procesos=n_procesos) as preprocesamiento:
+            df = preprocesamiento.limpieza()
+    df = df[[columna_texto, columna_objetivo]].dropna()
+    return df[columna_texto].astype(str).to_numpy(dtype=object), df[columna_objetivo].to_numpy()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Selección y entrenamiento del modelo de clasificación de textos.")
+    parser.add_argument('--datos', required=True, help="Ruta a los datos (.pkl, .parquet o .csv).")
+    parser.add_argument('--columna-texto', default='TEXTO_STOPWORDS_LEMATIZACION')
+    parser.add_argument('--columna-objetivo', default='CATEGORIA')
+    parser.add_argument('--preprocesar', action='store_true', help="Limpia el CSV original con Preprocesado antes de entrenar.")
+    parser.add_argument('--n-procesos', type=int, default=1, help="Procesos de la limpieza con --preprocesar.")
+    parser.add_argument('--modelos', nargs='+', choices=list(ESPACIOS_BUSQUEDA), help="Familias de modelos que se prueban (por defecto, todas).")
+    parser.add_argument('--particiones', type=int, default=N_PARTICIONES_CV)
+    parser.add_argument('--factor', type=int, default=FACTOR_REDUCCION)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--procesos', action='store_true', help="Evalúa los candidatos en procesos en lugar de hilos.")
+    parser.add_argument('--proporcion-prueba', type=float, default=0.0, help="Fracción estratificada que se reserva para evaluar al ganador.")
+    parser.add_argument('--cache', help="Directorio donde se guardan las matrices vectorizadas de cada partición.")
+    parser.add_argument('--resultados', help="Ruta del CSV con los resultados de cada candidato y ronda.")
+    parser.add_argument('--directorio', required=True, help=f"Directorio donde se guardan el modelo y el vectorizador ('{DIRECTORIO_MODELOS}' sustituye al modelo en producción).")
+    args = parser.parse_args(argumentos)
+
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import train_test_split
+    from src.instrumentacion import Instrumentacion
+    instrumentacion = Instrumentacion()
+    textos, etiquetas = cargar_datos(args.datos, args.columna_texto, args.columna_objetivo, args.preprocesar, args.n_procesos)
+    textos_prueba = etiquetas_prueba = None
+    if args.proporcion_prueba > 0:
+        textos, textos_prueba, etiquetas, etiquetas_prueba = train_test_split(textos, etiquetas, test_size=args.proporcion_prueba,
+                                                                              stratify=etiquetas, random_state=SEMILLA_ENTRENAMIENTO)
+    seleccion = SeleccionModelos(args.modelos, n_particiones=args.particiones, factor=args.factor, n_jobs=args.n_jobs,
+                                 preferencia='processes' if args.procesos else 'threads', directorio_cache=args.cache,
+                                 instrumentacion=instrumentacion)
+    resultados = seleccion.buscar(textos, etiquetas)
+    if args.resultados:
+        resultados.to_csv(args.resultados, index=False)
+    ultima = resultados[resultados['ronda'] == resultados['ronda'].max()]
+    print(ultima[['familia', 'vectorizador', 'modelo', 'puntuacion_media', 'puntuacion_std', 'segundos_ajuste_medio']].to_string(index=False))
+    print(f"Mejores parámetros: {seleccion.mejor_candidato}")
+    print(f"Score: {seleccion.mejor_puntuacion}")
+    vectorizador, modelo = seleccion.ajustar_mejor(textos, etiquetas)
+    if textos_prueba is not None:
+        print(f"Puntuación en el conjunto de prueba: {f1_score(etiquetas_prueba, modelo.predict(vectorizador.transform(textos_prueba)), average='weighted')}")
+    seleccion.exportar(args.directorio)
+    for nombre, etapa in instrumentacion.etapas.items():
+        print(f"{nombre}: {etapa['segundos']:.2f} segundos")
+
+if __name__ == '__main__':
+    main()
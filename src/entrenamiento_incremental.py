@@ -0,0 +1,244 @@
+# Entrenamiento incremental del SGDClassifier con `partial_fit`, fuera de memoria.
+#
+# Los CSV etiquetados se leen por bloques y cada bloque pasa por la misma limpieza que en `main.py` antes de
+# actualizar el modelo, por lo que la memoria depende del tamaño del bloque y no del tamaño de los datos.
+# El vocabulario puede ser fijo (el del vectorizador en producción, o el del primer bloque si no hay ninguno)
+# o por hashing, que no tiene vocabulario y admite palabras nuevas sin cambiar el número de columnas.
+# Cada `intervalo_punto_control` bloques el modelo se guarda en el directorio indicado, con los nombres que carga
+# CLasificadorTexto, y se publica en los CLasificadorTexto indicados con `actualizar_modelo`, sin recargarlos ni
+# detener su inferencia. Un proceso distinto (por ejemplo `src.servicio` con --recarga-segundos) lo detecta con
+# `recargar_si_cambia`. El directorio se pide de forma explícita porque con `modelos/` cada punto de control
+# sustituye al modelo en producción.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m src.entrenamiento_incremental --datos nuevos.csv --modelo modelos/modelo_TF_SDG_SW_L.pkl --vectorizador modelos/vectorizador_TF_SDG_SW_L.pkl --directorio puntos_control
+#     python -m src.entrenamiento_incremental --datos nuevos.csv --vocabulario hashing --directorio puntos_control
+
+# Se importan las librerías pertinentes:
+import argparse
+import copy
+import os
+from src.constantes import *
+from src.clases import LectorCSV, Preprocesado
+from src.entrenamiento import guardar_artefacto
+from src.instrumentacion import medir_etapa
+from src.recursos import importar_perezoso
+from src.vectorizacion import VectorizadorTokens
+
+np = importar_perezoso("numpy")
+
+# Tipos de vocabulario admitidos:
+VOCABULARIOS = ('fijo', 'hashing')
+
+# Clase para actualizar el modelo con bloques de datos etiquetados:
+class EntrenadorIncremental:
+    def __init__(self, directorio, modelo_path=None, vectorizador_path=None, vocabulario='fijo', n_caracteristicas=N_CARACTERISTICAS_HASHING,
+                 intervalo_punto_control=INTERVALO_PUNTO_CONTROL, clasificadores=None, n_procesos=1, instrumentacion=None):
+        """
+        Inicializa el objeto EntrenadorIncremental.
+
+        Parámetros:
+        -----------
+        directorio : str
+            El directorio donde se guardan los puntos de control, con los nombres que carga CLasificadorTexto.
+            Se pide de forma explícita porque, con `DIRECTORIO_MODELOS`, cada punto de control sustituye al
+            modelo en producción.
+        modelo_path : str, opcional
+            La ruta del modelo .pkl que se sigue entrenando. Si no se indica se crea un SGDClassifier nuevo
+            con pérdida 'modified_huber', la del modelo en producción.
+        vectorizador_path : str, opcional
+            La ruta del vectorizador .pkl. Con vocabulario 'fijo' y sin vectorizador, el vocabulario se ajusta con el primer bloque.
+        vocabulario : str, opcional
+            'fijo' (CountVectorizer; las palabras fuera del vocabulario se ignoran) o 'hashing' (HashingVectorizer).
+        n_caracteristicas : int, opcional
+            El número de columnas del vectorizador por hashing.
+        intervalo_punto_control : int, opcional
+            El número de bloques entre dos puntos de control.
+        clasificadores : list of CLasificadorTexto, opcional
+            Los clasificadores en ejecución que pasan a usar el modelo de cada punto de control.
+        n_procesos : int, opcional
+            El número de procesos de la limpieza de cada bloque.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se miden la lectura, la limpieza y la actualización del modelo de cada bloque.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si el vocabulario no es válido, si el modelo no admite `partial_fit`, o si el vectorizador no
+            corresponde al vocabulario o no tiene tantas columnas como el modelo.
+        """
+        import joblib
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+        if vocabulario not in VOCABULARIOS:
+            raise ValueError(f"El vocabulario debe ser uno de {VOCABULARIOS}.")
+        # El modelo se carga sin el registro de recursos, ya que `partial_fit` lo modifica
+        self.modelo = joblib.load(modelo_path) if modelo_path else SGDClassifier(loss='modified_huber', random_state=SEMILLA_ENTRENAMIENTO)
+        if not hasattr(self.modelo, 'partial_fit'):
+            raise ValueError("El modelo debe admitir partial_fit, como SGDClassifier.")
+        if vectorizador_path:
+            self.vectorizador = joblib.load(vectorizador_path)
+        elif vocabulario == 'hashing':
+            self.vectorizador = HashingVectorizer(n_features=n_caracteristicas, alternate_sign=False, norm=None)
+        else:
+            self.vectorizador = None
+        if self.vectorizador is not None and hasattr(self.vectorizador, 'vocabulary_') != (vocabulario == 'fijo'):
+            raise ValueError(f"El vectorizador no corresponde al vocabulario '{vocabulario}'.")
+        entrenado = hasattr(self.modelo, 'coef_')
+        if entrenado and self.vectorizador is not None and self.modelo.coef_.shape[1] != self._n_columnas():
+            raise ValueError("El número de columnas del modelo no coincide con el del vectorizador.")
+        self.clases = self.modelo.classes_ if entrenado else np.array(sorted(mapeo_emociones))
+        self.vocabulario = vocabulario
+        self.directorio = directorio
+        self.intervalo_punto_control = intervalo_punto_control
+        self.clasificadores = list(clasificadores or [])
+        self.instrumentacion = instrumentacion
+        self.preprocesado = Preprocesado(None, 'TEXTO', n_procesos=n_procesos, instrumentacion=instrumentacion)
+        self._vectorizador_tokens = None if self.vectorizador is None else VectorizadorTokens(self.vectorizador)
+        self._vectorizador_guardado = None
+        self.bloques = 0
+        self.filas = 0
+        self.puntos_control = 0
+        # Precisión progresiva: cada bloque se evalúa con el modelo anterior antes de entrenar con él
+        self.aciertos_previos = 0
+        self.filas_evaluadas = 0
+
+    def _n_columnas(self):
+        if hasattr(self.vectorizador, 'vocabulary_'):
+            return len(self.vectorizador.vocabulary_)
+        return self.vectorizador.n_features
+
+    def entrenar_bloque(self, bloque):
+        """
+        Limpia un bloque del CSV etiquetado y actualiza el modelo con él.
+
+        Parámetros:
+        -----------
+        bloque : pandas.DataFrame
+            El bloque tal y como se lee del CSV, con las columnas 'text' y 'label'.
+
+        Devoluciones:
+        ------------
+        int:
+            El número de filas con las que se ha entrenado, tras descartar las que no superan la limpieza.
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+        bloque = bloque.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+        bloque['TEXTO'] = bloque['TEXTO'].astype(str)
+        bloque['CATEGORIA'] = bloque['CATEGORIA'].astype(int)
+        self.preprocesado.df = bloque
+        bloque = self.preprocesado.limpieza()
+        tokens = self.preprocesado.tokens_lematizados
+        if not tokens:
+            return 0
+        with medir_etapa(self.instrumentacion, 'entrenamiento_incremental', len(tokens)):
+            if self.vectorizador is None:
+                self.vectorizador = CountVectorizer().fit([" ".join(tokens_texto) for tokens_texto in tokens])
+                self._vectorizador_tokens = VectorizadorTokens(self.vectorizador)
+            matriz = self._vectorizador_tokens.transform(tokens)
+            etiquetas = bloque['CATEGORIA'].to_numpy()
+            if hasattr(self.modelo, 'coef_'):
+                self.aciertos_previos += int((self.modelo.predict(matriz) == etiquetas).sum())
+                self.filas_evaluadas += len(etiquetas)
+            self.modelo.partial_fit(matriz, etiquetas, classes=self.clases)
+        self.bloques += 1
+        self.filas += len(etiquetas)
+        if self.bloques % self.intervalo_punto_control == 0:
+            self.guardar_punto_control()
+        return len(etiquetas)
+
+    def entrenar_csv(self, path_csv, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+        """
+        Lee un CSV etiquetado por bloques y actualiza el modelo con cada uno. Al terminar guarda un último punto de control.
+
+        Parámetros:
+        -----------
+        path_csv : str
+            La ruta del CSV, con las columnas 'text' y 'label'.
+        tamano_bloque : int, opcional
+            El número de filas de cada bloque.
+
+        Devoluciones:
+        ------------
+        dict:
+            Las estadísticas del entrenamiento (ver `estadisticas`).
+        """
+        lector = LectorCSV(path_csv, instrumentacion=self.instrumentacion)
+        with self.preprocesado:
+            for bloque in lector.leer_por_bloques(tamano_bloque):
+                self.entrenar_bloque(bloque)
+        if self.bloques % self.intervalo_punto_control != 0:
+            self.guardar_punto_control()
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('entrenamiento_incremental', self.estadisticas())
+        return self.estadisticas()
+
+    def guardar_punto_control(self):
+        """
+        Guarda una copia del modelo y la publica en los clasificadores en ejecución.
+
+        El modelo se copia para que los clasificadores no vean los cambios de los siguientes `partial_fit`.
+        El vectorizador solo se guarda si ha cambiado, de modo que un proceso que recarga los archivos nunca
+        combina un vectorizador nuevo con un modelo antiguo.
+
+        Devoluciones:
+        ------------
+        tuple of str:
+            Las rutas del modelo y del vectorizador, o None si no se pudieron guardar.
+        """
+        try:
+            if not hasattr(self.modelo, 'coef_'):
+                raise ValueError("El modelo todavía no se ha entrenado con ningún bloque.")
+            os.makedirs(self.directorio, exist_ok=True)
+            path_modelo = os.path.join(self.directorio, NOMBRE_MODELO)
+            path_vectorizador = os.path.join(self.directorio, NOMBRE_VECTORIZADOR)
+            modelo = copy.deepcopy(self.modelo)
+            if self._vectorizador_guardado is not self.vectorizador or not os.path.exists(path_vectorizador):
+                guardar_artefacto(self.vectorizador, path_vectorizador)
+                self._vectorizador_guardado = self.vectorizador
+            guardar_artefacto(modelo, path_modelo)
+            for clasificador in self.clasificadores:
+                clasificador.actualizar_modelo(modelo, self.vectorizador, path_modelo, path_vectorizador)
+            self.puntos_control += 1
+            print(f"El punto de control {self.puntos_control} ({self.filas} filas) fue guardado correctamente en", self.directorio)
+            return path_modelo, path_vectorizador
+        except Exception as e:
+            print("Ocurrió un error al guardar el punto de control:", str(e))
+            return None
+
+    def estadisticas(self):
+        """
+        Devuelve el progreso del entrenamiento.
+
+        Devoluciones:
+        ------------
+        dict:
+            Los bloques y filas procesados, los puntos de control guardados y la precisión progresiva
+            (la de cada bloque con el modelo anterior a entrenar con él).
+        """
+        return {
+            'bloques': self.bloques,
+            'filas': self.filas,
+            'puntos_control': self.puntos_control,
+            'precision_progresiva': self.aciertos_previos / self.filas_evaluadas if self.filas_evaluadas else 0.0,
+        }
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Entrenamiento incremental del modelo con bloques de un CSV etiquetado.")
+    parser.add_argument('--datos', required=True, help="Ruta al CSV etiquetado (columnas 'text' y 'label').")
+    parser.add_argument('--modelo', help="Ruta al modelo .pkl que se sigue entrenando (por defecto, uno nuevo).")
+    parser.add_argument('--vectorizador', help="Ruta al vectorizador .pkl.")
+    parser.add_argument('--vocabulario', choices=VOCABULARIOS, default='fijo')
+    parser.add_argument('--n-caracteristicas', type=int, default=N_CARACTERISTICAS_HASHING, help="Columnas del vectorizador por hashing.")
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE_LECTURA)
+    parser.add_argument('--intervalo-punto-control', type=int, default=INTERVALO_PUNTO_CONTROL, help="Bloques entre dos puntos de control.")
+    parser.add_argument('--n-procesos', type=int, default=1, help="Procesos de la limpieza.")
+    parser.add_argument('--directorio', required=True, help=f"Directorio de los puntos de control ('{DIRECTORIO_MODELOS}' sustituye al modelo en producción).")
+    args = parser.parse_args(argumentos)
+
+    entrenador = EntrenadorIncremental(args.directorio, args.modelo, args.vectorizador, args.vocabulario, args.n_caracteristicas,
+                                       args.intervalo_punto_control, n_procesos=args.n_procesos)
+    print(entrenador.entrenar_csv(args.datos, args.tamano_bloque))
+
+if __name__ == '__main__':
+    main()
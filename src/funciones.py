@@ -1,5 +1,8 @@
 # Imports pertinentes:
 import re 
+from itertools import islice
+from sys import intern
+from src.constantes import VARIANTES_TEXTO, VARIANTES_TEXTO_DEFECTO
 
 # Se importa 'emoji' para futurois usos:
 # import emoji
@@ -139,6 +142,55 @@ def palabras_repetidas(frase, patron_palabras_repetidas):
         frase_original = frase  
     return frase
 
+# Función que elimina las palabras o grupos de palabras repetidos de forma consecutiva trabajando sobre la lista de palabras.
+# Sustituye al bucle de `palabras_repetidas`, cuyo patrón con retroceso puede tardar un tiempo cuadrático en cada pasada.
+# Las palabras se apilan una a una y, tras cada una, solo se comprueba si el final de la pila es un grupo repetido
+# de como mucho `longitud_maxima` palabras. Cada repetición encontrada saca palabras de la pila, así que el número
+# total de comprobaciones está acotado por el número de palabras y el coste es lineal.
+# Igual que el patrón de `palabras_repetidas`, la última palabra de la repetición puede ser solo un prefijo:
+# "the theory" se convierte en "theory", ya que el patrón sustituye "the the" por "the".
+def colapsar_palabras_repetidas(palabras, longitud_maxima):
+    """
+    Elimina las repeticiones consecutivas de palabras o grupos de palabras, sin distinguir mayúsculas.
+
+    Da el mismo resultado que `palabras_repetidas` salvo en textos con repeticiones solapadas poco habituales,
+    y no colapsa los grupos de más de `longitud_maxima` palabras.
+
+    Parámetros:
+    -----------
+    palabras : list of str
+        Las palabras del texto en orden.
+    longitud_maxima : int
+        El número máximo de palabras del grupo repetido.
+
+    Devoluciones:
+    ------------
+    list of str:
+        Las palabras después de eliminar las repeticiones.
+    """
+    resultado = []
+    claves = []  # Palabras normalizadas con `casefold`, que se comparan sin distinguir mayúsculas
+    for palabra in palabras:
+        resultado.append(palabra)
+        claves.append(palabra.casefold())
+        while True:
+            n = len(claves)
+            for k in range(1, min(longitud_maxima, n // 2) + 1):
+                # El final de la pila repite el grupo de las k palabras anteriores, con la última quizá como prefijo
+                if claves[n - 1].startswith(claves[n - 1 - k]) and claves[n - k:n - 1] == claves[n - 2 * k:n - 1 - k]:
+                    break
+            else:
+                break
+            sobrante = resultado[n - 1][len(resultado[n - 1 - k]):]
+            del resultado[n - k:]
+            del claves[n - k:]
+            # Si la repetición era completa, la pila vuelve a un estado que ya se había comprobado
+            if not sobrante:
+                break
+            resultado[-1] += sobrante
+            claves[-1] = resultado[-1].casefold()
+    return resultado
+
 # Función para eliminar las vocales repetidas:
 def vocales_repetidas(palabra,patron_vocales):
     """
@@ -202,6 +254,77 @@ def longitud_palabras(fila):
         return True
     return False
 
+# Función que calcula de una vez los dos veredictos que la limpieza necesita de cada palabra.
+# Solo depende de la palabra, por lo que su resultado se puede memorizar:
+def veredicto_palabra(palabra, patron_consonantes_repetidas, patron_vocales):
+    """
+    Calcula si una palabra pasa la validación de letras de relleno y la de vocales repetidas.
+
+    Parámetros:
+    -----------
+    palabra : str
+        La palabra a verificar.
+    patron_consonantes_repetidas : re.Pattern
+        Patrón compilado para buscar consonantes consecutivas.
+    patron_vocales : str
+        Patrón de vocales repetidas tal y como lo recibe `validacion_vocales`.
+
+    Devoluciones:
+    ------------
+    tuple of bool:
+        Si la palabra se mantiene en `validacion` y si se mantiene en `validacion_vocales`.
+    """
+    # `split` divide por cualquier espacio en blanco, igual que el patrón r"\s+".
+    # En `limpieza` a `validacion` se le pasa el patrón de palabras repetidas como patrón de letras, y ese patrón
+    # nunca coincide dentro de una palabra sin espacios, así que `letras_repetidas` no descarta nada y se omite.
+    valida = len(palabra) <= 2 * len(set(palabra)) and patron_consonantes_repetidas.search(palabra) is None
+    # `vocales_repetidas` busca la palabra como patrón dentro de `patron_vocales`. Tras la limpieza las palabras
+    # solo contienen caracteres que en una expresión regular son literales, así que equivale a buscar la subcadena.
+    return valida, palabra not in patron_vocales
+
+# Función que realiza toda la limpieza de un texto en una sola pasada por sus palabras.
+# Equivale a aplicar en cadena la sustitución de `patron_mantener`, la eliminación de espacios adicionales,
+# `validacion`, la eliminación de palabras repetidas, `validacion_vocales`, el filtro de `longitud_palabras` y
+# el paso a minúsculas, pero el texto solo se divide en palabras una vez y todos los patrones llegan ya compilados.
+# Las palabras repetidas se eliminan con `colapsar_palabras_repetidas` en lugar de con `palabras_repetidas`.
+def limpieza_texto(texto, patron_mantener, patron_consonantes_repetidas, patron_vocales, longitud_maxima_frase, cache_palabras=None):
+    """
+    Limpia un texto y devuelve None si tras la limpieza no contiene más de una palabra.
+
+    Parámetros:
+    -----------
+    texto : str
+        El texto de entrada para limpiar.
+    patron_mantener : re.Pattern
+        Patrón compilado de los caracteres que se sustituyen por espacios.
+    patron_consonantes_repetidas : re.Pattern
+        Patrón compilado para buscar consonantes consecutivas.
+    patron_vocales : str
+        Patrón de vocales repetidas tal y como lo recibe `validacion_vocales`.
+    longitud_maxima_frase : int
+        El número máximo de palabras de un grupo repetido que se colapsa.
+    cache_palabras : CacheAcotada, opcional
+        Cache donde se memorizan los veredictos de `veredicto_palabra` de cada palabra.
+
+    Devoluciones:
+    ------------
+    str o None:
+        El texto limpio en minúsculas, o None si el texto se descarta.
+    """
+    palabras = patron_mantener.sub(' ', texto).split()
+    if cache_palabras is None:
+        veredictos = [veredicto_palabra(palabra, patron_consonantes_repetidas, patron_vocales) for palabra in palabras]
+    else:
+        veredictos = cache_palabras.obtener_varios(palabras, lambda palabra: veredicto_palabra(palabra, patron_consonantes_repetidas, patron_vocales))
+    veredictos = dict(zip(palabras, veredictos))
+    palabras = colapsar_palabras_repetidas([palabra for palabra in palabras if veredictos[palabra][0]], longitud_maxima_frase)
+    # Al colapsar una repetición parcial se forman palabras nuevas, cuyo veredicto de vocales se calcula aquí
+    palabras = [palabra for palabra in palabras
+                if (veredictos[palabra] if palabra in veredictos else veredicto_palabra(palabra, patron_consonantes_repetidas, patron_vocales))[1]]
+    if len(palabras) > 1:
+        return " ".join(palabras).lower()
+    return None
+
 # Función para aplicar stemming, lematización o stopwords a nuestro texto: 
 def preprocesamiento(texto: str,
                         rm_stopwords: bool,
@@ -245,3 +368,219 @@ def preprocesamiento(texto: str,
         lista_palabras = [palabra.lemma_ for palabra in doc_spacy]
     texto = " ".join(lista_palabras)
     return texto
+
+# Versión por lotes de la función anterior. La lematización se hace con `nlp.pipe`,
+# que procesa los textos en lotes en lugar de llamar al modelo de spaCy texto a texto:
+def preprocesamiento_lotes(textos,
+                           rm_stopwords: bool,
+                           stemming: bool,
+                           lematizar: bool,
+                           STEMMER_EN=None,
+                           SPACY_NLP_EN=None,
+                           STOPWORDS=None,
+                           tamano_lote: int = 1000,
+                           n_procesos: int = 1,
+                           cache_lemas=None,
+                           devolver_tokens: bool = False) -> list:
+    """
+    Preprocesa una secuencia de textos según las operaciones especificadas.
+
+    El resultado de cada texto es el mismo que el de `preprocesamiento`.
+
+    Parámetros:
+    -----------
+    textos : iterable of str
+        Los textos de entrada para preprocesar.
+    rm_stopwords : bool
+        Si se deben eliminar las palabras vacías o no.
+    stemming : bool
+        Si se debe realizar el stemming o no.
+    lematizar : bool
+        Si se debe realizar la lematización o no.
+    STEMMER_EN : SnowballStemmer
+        Objeto stemmer en inglés.
+    SPACY_NLP_EN : spacy.language.Language
+        Objeto de modelo de procesamiento de lenguaje en inglés.
+    STOPWORDS : frozenset
+        Conjunto de palabras vacías para eliminar del texto.
+    tamano_lote : int
+        El número de textos que spaCy procesa en cada lote.
+    n_procesos : int
+        El número de procesos que usa spaCy para lematizar.
+    cache_lemas : CacheAcotada, opcional
+        Cache donde se memorizan los lemas de cada texto que recibe spaCy. La lematización depende del
+        contexto de cada palabra, por lo que la clave es el texto completo y no cada palabra.
+    devolver_tokens : bool, opcional
+        Si se devuelve la lista de tokens de cada texto en lugar de unirlos en una cadena.
+
+    Devoluciones:
+    ------------
+    list of str o list of list of str:
+        Los textos preprocesados, o sus tokens, en el mismo orden que `textos`.
+    """
+    listas_palabras = [texto.split() for texto in textos]
+    if rm_stopwords and STOPWORDS:
+        listas_palabras = [[palabra for palabra in lista if palabra.lower() not in STOPWORDS] for lista in listas_palabras]
+    if stemming and STEMMER_EN:
+        listas_palabras = [[STEMMER_EN.stem(palabra) for palabra in lista] for lista in listas_palabras]
+    if lematizar and SPACY_NLP_EN:
+        def lematizar_lote(textos_spacy):
+            docs_spacy = SPACY_NLP_EN.pipe(textos_spacy, batch_size=tamano_lote, n_process=n_procesos)
+            return [tuple(intern(palabra.lemma_) for palabra in doc_spacy) for doc_spacy in docs_spacy]
+        textos_spacy = [" ".join(lista) for lista in listas_palabras]
+        if cache_lemas is None:
+            listas_palabras = lematizar_lote(textos_spacy)
+        else:
+            listas_palabras = cache_lemas.obtener_lote(textos_spacy, lematizar_lote)
+    if devolver_tokens:
+        return listas_palabras
+    return [" ".join(lista) for lista in listas_palabras]
+
+# Versión por lotes que obtiene varias representaciones del texto a partir de los mismos tokens. Cada texto se
+# separa una vez, cada palabra distinta se pasa por el stemmer una vez y spaCy se ejecuta una vez por texto y por
+# variante lematizada:
+def preprocesamiento_variantes(textos,
+                               variantes,
+                               STEMMER_EN=None,
+                               SPACY_NLP_EN=None,
+                               STOPWORDS=None,
+                               tamano_lote: int = 1000,
+                               n_procesos: int = 1,
+                               cache_lemas=None,
+                               devolver_tokens: bool = False) -> dict:
+    """
+    Preprocesa una secuencia de textos y devuelve las variantes pedidas a partir de los mismos tokens.
+
+    Las variantes son los nombres de las columnas de `Preprocesado.limpieza`: 'TEXTO_STOPWORDS',
+    'TEXTO_STOPWORDS_STEMMING', 'TEXTO_STOPWORDS_LEMATIZACION', 'TEXTO_LEMATIZACION' y 'TEXTO_STEMMING'.
+    Cada variante coincide con la de `preprocesamiento` y no depende de qué otras variantes se pidan.
+
+    Parámetros:
+    -----------
+    textos : iterable of str
+        Los textos de entrada para preprocesar.
+    variantes : iterable of str
+        Las variantes que se devuelven.
+    STEMMER_EN : SnowballStemmer
+        Objeto stemmer en inglés.
+    SPACY_NLP_EN : spacy.language.Language
+        Objeto de modelo de procesamiento de lenguaje en inglés.
+    STOPWORDS : frozenset
+        Conjunto de palabras vacías para eliminar del texto.
+    tamano_lote : int
+        El número de textos que spaCy procesa en cada lote.
+    n_procesos : int
+        El número de procesos que usa spaCy para lematizar.
+    cache_lemas : CacheAcotada, opcional
+        Cache donde se memorizan los lemas de cada texto que recibe spaCy.
+    devolver_tokens : bool, opcional
+        Si 'TEXTO_STOPWORDS_LEMATIZACION' se devuelve como la lista de tokens de cada texto, que es lo que vectoriza
+        `VectorizadorTokens`. Las demás variantes siempre se devuelven como cadenas.
+
+    Devoluciones:
+    ------------
+    dict:
+        Para cada variante, los textos preprocesados en el mismo orden que `textos`.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si alguna variante no es válida.
+    """
+    variantes = tuple(dict.fromkeys(variantes))
+    invalidas = [variante for variante in variantes if variante not in VARIANTES_TEXTO]
+    if invalidas:
+        raise ValueError(f"Variantes no válidas: {invalidas}. Las válidas son {list(VARIANTES_TEXTO)}.")
+    resultados = {variante: [] for variante in variantes}
+    raices = {}
+    # Con un solo proceso de spaCy los textos se procesan por tramos de `tamano_lote`, de modo que las listas de
+    # palabras intermedias solo existen para un tramo. Con varios se procesan de una vez, para no reiniciar sus procesos
+    textos = iter(textos)
+    tamano_tramo = tamano_lote if n_procesos == 1 else None
+    while True:
+        tramo = list(islice(textos, tamano_tramo))
+        if not tramo:
+            break
+        for variante, procesados in _variantes_tramo(tramo, variantes, STEMMER_EN, SPACY_NLP_EN, STOPWORDS, tamano_lote, n_procesos,
+                                                     cache_lemas, devolver_tokens, raices).items():
+            resultados[variante].extend(procesados)
+        if tamano_tramo is None:
+            break
+    return resultados
+
+# Función que indica qué variantes tiene que generar la limpieza para clasificar una columna:
+def variantes_columna(columna_texto):
+    """
+    Devuelve las variantes que tiene que generar la limpieza para clasificar una columna preprocesada.
+
+    Siempre incluye las de `VARIANTES_TEXTO_DEFECTO`, de modo que las filas que se descartan en la limpieza
+    son las mismas sea cual sea la columna que se clasifica.
+
+    Parámetros:
+    -----------
+    columna_texto : str
+        La columna que se clasifica: 'TEXTO_LIMPIO' o una de `VARIANTES_TEXTO`.
+
+    Devoluciones:
+    ------------
+    tuple of str:
+        Las variantes de la limpieza.
+
+    Excepciones:
+    ------------
+    ValueError:
+        Si la columna no es 'TEXTO_LIMPIO' ni una de `VARIANTES_TEXTO`.
+    """
+    if columna_texto == 'TEXTO_LIMPIO':
+        return VARIANTES_TEXTO_DEFECTO
+    if columna_texto not in VARIANTES_TEXTO:
+        raise ValueError(f"La columna de texto debe ser 'TEXTO_LIMPIO' o una de {list(VARIANTES_TEXTO)}.")
+    return tuple(dict.fromkeys(VARIANTES_TEXTO_DEFECTO + (columna_texto,)))
+
+def _variantes_tramo(textos, variantes, STEMMER_EN, SPACY_NLP_EN, STOPWORDS, tamano_lote, n_procesos, cache_lemas, devolver_tokens, raices):
+    """
+    Calcula las variantes de un tramo de textos para `preprocesamiento_variantes`. `raices` memoriza la raíz de
+    cada palabra entre tramos.
+    """
+    listas_palabras = [texto.split() for texto in textos]
+    STOPWORDS = STOPWORDS or frozenset()
+    # Se marca una sola vez qué palabras de cada texto son vacías
+    mascaras = [[palabra.lower() not in STOPWORDS for palabra in lista] for lista in listas_palabras]
+    resultados = {}
+    if 'TEXTO_STOPWORDS' in variantes:
+        resultados['TEXTO_STOPWORDS'] = [[palabra for palabra, valida in zip(lista, mascara) if valida]
+                                         for lista, mascara in zip(listas_palabras, mascaras)]
+    if ('TEXTO_STEMMING' in variantes or 'TEXTO_STOPWORDS_STEMMING' in variantes) and STEMMER_EN:
+        # El stemming no depende del contexto: cada palabra distinta se procesa una vez
+        listas_raices = [[raices[palabra] if palabra in raices else raices.setdefault(palabra, STEMMER_EN.stem(palabra)) for palabra in lista]
+                         for lista in listas_palabras]
+        if 'TEXTO_STEMMING' in variantes:
+            resultados['TEXTO_STEMMING'] = listas_raices
+        if 'TEXTO_STOPWORDS_STEMMING' in variantes:
+            resultados['TEXTO_STOPWORDS_STEMMING'] = [[raiz for raiz, valida in zip(lista, mascara) if valida]
+                                                      for lista, mascara in zip(listas_raices, mascaras)]
+    else:
+        if 'TEXTO_STEMMING' in variantes:
+            resultados['TEXTO_STEMMING'] = listas_palabras
+        if 'TEXTO_STOPWORDS_STEMMING' in variantes:
+            resultados['TEXTO_STOPWORDS_STEMMING'] = [[palabra for palabra, valida in zip(lista, mascara) if valida]
+                                                      for lista, mascara in zip(listas_palabras, mascaras)]
+    # Cada variante lematizada se obtiene como en `preprocesamiento`: spaCy analiza el texto filtrado para la variante
+    # sin stopwords y el texto completo para la otra, ya que el lema de una palabra depende de las que la rodean
+    if 'TEXTO_STOPWORDS_LEMATIZACION' in variantes:
+        filtrados = resultados.get('TEXTO_STOPWORDS') or [[palabra for palabra, valida in zip(lista, mascara) if valida]
+                                                          for lista, mascara in zip(listas_palabras, mascaras)]
+        resultados['TEXTO_STOPWORDS_LEMATIZACION'] = preprocesamiento_lotes((" ".join(lista) for lista in filtrados),
+                                                                            rm_stopwords=False, stemming=False, lematizar=True,
+                                                                            SPACY_NLP_EN=SPACY_NLP_EN, tamano_lote=tamano_lote,
+                                                                            n_procesos=n_procesos, cache_lemas=cache_lemas,
+                                                                            devolver_tokens=True)
+    if 'TEXTO_LEMATIZACION' in variantes:
+        resultados['TEXTO_LEMATIZACION'] = preprocesamiento_lotes((" ".join(lista) for lista in listas_palabras),
+                                                                  rm_stopwords=False, stemming=False, lematizar=True,
+                                                                  SPACY_NLP_EN=SPACY_NLP_EN, tamano_lote=tamano_lote,
+                                                                  n_procesos=n_procesos, cache_lemas=cache_lemas,
+                                                                  devolver_tokens=True)
+    # Solo la variante lematizada sin stopwords se conserva como tokens; el resto se une en cadenas dentro del tramo
+    return {variante: resultados[variante] if devolver_tokens and variante == 'TEXTO_STOPWORDS_LEMATIZACION'
+            else [" ".join(lista) for lista in resultados[variante]] for variante in variantes}
@@ -0,0 +1,247 @@
+# Se importan las librerías pertinentes:
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from src.constantes import PREFIJO_METRICAS
+
+# Archivo cuyas funciones se incluyen en el perfil de cProfile:
+ARCHIVO_FUNCIONES_PERFILADAS = os.path.join('src', 'funciones.py')
+
+# Clase para medir las etapas de una ejecución:
+class Instrumentacion:
+    def __init__(self, perfilar=False, funciones_perfil=20):
+        """
+        Inicializa el objeto Instrumentacion.
+
+        Cada etapa acumula su tiempo, su número de llamadas y las filas que entran y salen, de modo que en el
+        modo por bloques una etapa que se repite en cada bloque aparece una sola vez con el total. Es segura entre
+        hilos: las etapas y las estadísticas se actualizan con un cerrojo y la profundidad de anidamiento es propia de
+        cada hilo.
+
+        Parámetros:
+        -----------
+        perfilar : bool, opcional
+            Si se activa cProfile mientras se ejecutan las etapas. El perfil solo recoge las funciones de
+            `src/funciones.py` del hilo que crea el objeto; con la limpieza en paralelo no incluye los procesos del pool.
+        funciones_perfil : int, opcional
+            El número máximo de funciones del perfil que se exportan, ordenadas por tiempo acumulado.
+        """
+        self.etapas = {}
+        self.estadisticas = {}
+        self.funciones_perfil = funciones_perfil
+        self.inicio = time.time()
+        self._perfil = None
+        self._hilo_perfil = threading.get_ident()
+        self._local = threading.local()
+        self._cerrojo = threading.Lock()
+        if perfilar:
+            import cProfile
+            self._perfil = cProfile.Profile()
+
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=0):
+        """
+        Mide una etapa. El bloque puede indicar las filas de salida con `medida['filas_salida']`;
+        si no lo hace se consideran iguales a las de entrada.
+
+        Parámetros:
+        -----------
+        nombre : str
+            El nombre de la etapa.
+        filas_entrada : int, opcional
+            El número de filas que entran en la etapa.
+
+        Devoluciones:
+        ------------
+        dict:
+            La medida de la etapa en curso, con la clave 'filas_salida'.
+        """
+        with self._cerrojo:
+            registro = self.etapas.setdefault(nombre, {'llamadas': 0, 'segundos': 0.0, 'filas_entrada': 0, 'filas_salida': 0})
+        medida = {'filas_salida': filas_entrada}
+        profundidad = getattr(self._local, 'profundidad', 0)
+        # El perfil se activa solo en la etapa más externa, ya que las etapas pueden anidarse
+        perfilar = self._perfil is not None and profundidad == 0 and threading.get_ident() == self._hilo_perfil
+        if perfilar:
+            self._perfil.enable()
+        self._local.profundidad = profundidad + 1
+        inicio = time.perf_counter()
+        try:
+            yield medida
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._local.profundidad = profundidad
+            if perfilar:
+                self._perfil.disable()
+            with self._cerrojo:
+                registro['segundos'] += segundos
+                registro['llamadas'] += 1
+                registro['filas_entrada'] += filas_entrada
+                registro['filas_salida'] += medida['filas_salida']
+
+    def registrar_estadisticas(self, nombre, valores, acumular=False):
+        """
+        Guarda un grupo de estadísticas numéricas, por ejemplo las de una cache o las de los lotes.
+
+        Parámetros:
+        -----------
+        nombre : str
+            El nombre del grupo.
+        valores : dict
+            Las estadísticas del grupo. Solo se guardan los valores numéricos.
+        acumular : bool, opcional
+            Si se suman a las que ya había en lugar de sustituirlas.
+        """
+        with self._cerrojo:
+            grupo = self.estadisticas.setdefault(nombre, {})
+            for clave, valor in valores.items():
+                if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                    continue
+                grupo[clave] = grupo.get(clave, 0) + valor if acumular else valor
+
+    def perfil(self):
+        """
+        Devuelve las funciones de `src/funciones.py` que más tiempo han consumido según cProfile.
+
+        Devoluciones:
+        ------------
+        list of dict:
+            Para cada función, su nombre, su línea, su número de llamadas, su tiempo propio y su tiempo acumulado en segundos.
+            La lista está vacía si no se ha activado el perfil.
+        """
+        if self._perfil is None:
+            return []
+        import pstats
+        funciones = [
+            {'funcion': funcion, 'linea': linea, 'llamadas': llamadas, 'segundos_propios': propio, 'segundos_acumulados': acumulado}
+            for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in pstats.Stats(self._perfil).stats.items()
+            if archivo.endswith(ARCHIVO_FUNCIONES_PERFILADAS)
+        ]
+        funciones.sort(key=lambda funcion: funcion['segundos_acumulados'], reverse=True)
+        return funciones[:self.funciones_perfil]
+
+    def resumen(self):
+        """
+        Devuelve todas las medidas de la ejecución.
+
+        Devoluciones:
+        ------------
+        dict:
+            El inicio y la duración de la ejecución, las etapas, las estadísticas y el perfil.
+        """
+        with self._cerrojo:
+            etapas = {nombre: dict(registro) for nombre, registro in self.etapas.items()}
+            estadisticas = {nombre: dict(grupo) for nombre, grupo in self.estadisticas.items()}
+        return {
+            'inicio': self.inicio,
+            'duracion_segundos': time.time() - self.inicio,
+            'etapas': etapas,
+            'estadisticas': estadisticas,
+            'perfil': self.perfil(),
+        }
+
+    def exportar_json(self, path):
+        """
+        Guarda el resumen de la ejecución en un archivo JSON.
+
+        Parámetros:
+        -----------
+        path : str
+            La ruta del archivo.
+        """
+        escribir_atomico(path, json.dumps(self.resumen(), indent=2, ensure_ascii=False))
+
+    def exportar_prometheus(self, path):
+        """
+        Guarda las medidas en el formato de texto de Prometheus, apto para el colector de archivos de texto de node_exporter.
+
+        Parámetros:
+        -----------
+        path : str
+            La ruta del archivo, normalmente con extensión .prom.
+        """
+        resumen = self.resumen()
+        lineas = []
+        def metrica(nombre, ayuda, muestras):
+            lineas.append(f"# HELP {PREFIJO_METRICAS}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {PREFIJO_METRICAS}_{nombre} gauge")
+            for etiquetas, valor in muestras:
+                texto_etiquetas = ','.join(f'{clave}="{_escapar(valor_etiqueta)}"' for clave, valor_etiqueta in etiquetas.items())
+                lineas.append(f"{PREFIJO_METRICAS}_{nombre}{{{texto_etiquetas}}} {valor}" if etiquetas else f"{PREFIJO_METRICAS}_{nombre} {valor}")
+        metrica('duracion_segundos', "Duración total de la ejecución.", [({}, resumen['duracion_segundos'])])
+        for clave, ayuda in (('segundos', "Tiempo acumulado de cada etapa."),
+                             ('llamadas', "Número de veces que se ha ejecutado cada etapa."),
+                             ('filas_entrada', "Filas que entran en cada etapa."),
+                             ('filas_salida', "Filas que salen de cada etapa.")):
+            metrica(f'etapa_{clave}', ayuda, [({'etapa': nombre}, registro[clave]) for nombre, registro in resumen['etapas'].items()])
+        metrica('estadistica', "Estadísticas de las caches y de los lotes.",
+                [({'grupo': grupo, 'nombre': clave}, valor) for grupo, valores in resumen['estadisticas'].items() for clave, valor in valores.items()])
+        if resumen['perfil']:
+            metrica('funcion_segundos_acumulados', "Tiempo acumulado de las funciones de src/funciones.py según cProfile.",
+                    [({'funcion': funcion['funcion'], 'linea': funcion['linea']}, funcion['segundos_acumulados']) for funcion in resumen['perfil']])
+            metrica('funcion_llamadas', "Llamadas a las funciones de src/funciones.py según cProfile.",
+                    [({'funcion': funcion['funcion'], 'linea': funcion['linea']}, funcion['llamadas']) for funcion in resumen['perfil']])
+        escribir_atomico(path, '\n'.join(lineas) + '\n')
+
+    def exportar(self, path_json=None, path_prometheus=None):
+        """
+        Guarda las medidas en los formatos indicados.
+
+        Parámetros:
+        -----------
+        path_json : str, opcional
+            La ruta del archivo JSON.
+        path_prometheus : str, opcional
+            La ruta del archivo de texto de Prometheus.
+        """
+        try:
+            if path_json:
+                self.exportar_json(path_json)
+            if path_prometheus:
+                self.exportar_prometheus(path_prometheus)
+            print("Las métricas de la ejecución fueron guardadas correctamente")
+        except Exception as e:
+            print("Ocurrió un error al guardar las métricas de la ejecución:", str(e))
+
+def medir_etapa(instrumentacion, nombre, filas_entrada=0):
+    """
+    Devuelve el contexto que mide una etapa, o uno que no hace nada si no hay instrumentación.
+
+    Parámetros:
+    -----------
+    instrumentacion : Instrumentacion o None
+        La instrumentación de la ejecución.
+    nombre : str
+        El nombre de la etapa.
+    filas_entrada : int, opcional
+        El número de filas que entran en la etapa.
+
+    Devoluciones:
+    ------------
+    contextmanager:
+        El contexto de la etapa, que produce el diccionario de la medida.
+    """
+    if instrumentacion is None:
+        return nullcontext({'filas_salida': filas_entrada})
+    return instrumentacion.etapa(nombre, filas_entrada)
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def escribir_atomico(path, contenido):
+    """
+    Escribe un archivo a través de un temporal, para que quien lo lea nunca vea un archivo a medio escribir.
+
+    Parámetros:
+    -----------
+    path : str
+        La ruta del archivo.
+    contenido : str
+        El texto que se escribe en UTF-8.
+    """
+    temporal = f"{path}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, path)
@@ -0,0 +1,178 @@
+# Se importan las librerías pertinentes.
+# Este módulo no importa ninguna dependencia pesada al cargarse: spaCy, NLTK, joblib, pandas y numpy
+# se importan la primera vez que se necesitan.
+import importlib.util
+import os
+import sys
+import threading
+from src.constantes import COMPONENTES_SPACY_EXCLUIDOS
+
+# Función para importar un módulo de forma diferida:
+def importar_perezoso(nombre):
+    """
+    Devuelve un módulo que solo se ejecuta la primera vez que se accede a uno de sus atributos.
+
+    Parámetros:
+    -----------
+    nombre : str
+        El nombre del módulo.
+
+    Devoluciones:
+    ------------
+    module:
+        El módulo, ya cargado si otro código lo había importado antes.
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    especificacion = importlib.util.find_spec(nombre)
+    cargador = importlib.util.LazyLoader(especificacion.loader)
+    especificacion.loader = cargador
+    modulo = importlib.util.module_from_spec(especificacion)
+    sys.modules[nombre] = modulo
+    cargador.exec_module(modulo)
+    return modulo
+
+# Registro de los recursos del proceso. Cada recurso se carga una sola vez y todas las instancias lo comparten:
+_REGISTRO = {}
+_CERROJO_REGISTRO = threading.RLock()
+
+def obtener_recurso(clave, cargar):
+    """
+    Devuelve un recurso del registro del proceso, cargándolo si es la primera vez que se pide.
+
+    Parámetros:
+    -----------
+    clave : hashable
+        La clave que identifica el recurso.
+    cargar : callable
+        Función sin argumentos que carga el recurso.
+
+    Devoluciones:
+    ------------
+    object:
+        El recurso compartido.
+    """
+    with _CERROJO_REGISTRO:
+        if clave not in _REGISTRO:
+            _REGISTRO[clave] = cargar()
+        return _REGISTRO[clave]
+
+def _descartar_versiones(tipo, path):
+    """
+    Quita del registro las versiones anteriores de un archivo, para que al recargarlo no se acumulen en memoria.
+    Las instancias que aún las usan las conservan hasta que las sustituyen.
+    """
+    with _CERROJO_REGISTRO:
+        for clave in [clave for clave in _REGISTRO if clave[:2] == (tipo, path)]:
+            del _REGISTRO[clave]
+
+def limpiar_registro():
+    """
+    Vacía el registro, de modo que los recursos se vuelven a cargar la próxima vez que se pidan.
+    """
+    with _CERROJO_REGISTRO:
+        _REGISTRO.clear()
+
+def obtener_modelo_spacy(nombre="en_core_web_sm", excluir=tuple(COMPONENTES_SPACY_EXCLUIDOS)):
+    """
+    Devuelve el modelo de spaCy compartido.
+
+    Parámetros:
+    -----------
+    nombre : str, opcional
+        El nombre del modelo de spaCy.
+    excluir : tuple of str, opcional
+        Los componentes del modelo que no se cargan.
+
+    Devoluciones:
+    ------------
+    spacy.language.Language:
+        El modelo de procesamiento de lenguaje.
+    """
+    def cargar():
+        import spacy
+        return spacy.load(nombre, exclude=list(excluir))
+    return obtener_recurso(('spacy', nombre, tuple(excluir)), cargar)
+
+def obtener_stemmer(idioma="english"):
+    """
+    Devuelve el stemmer de NLTK compartido.
+
+    Parámetros:
+    -----------
+    idioma : str, opcional
+        El idioma del stemmer.
+
+    Devoluciones:
+    ------------
+    SnowballStemmer:
+        El objeto stemmer.
+    """
+    def cargar():
+        from nltk.stem import SnowballStemmer
+        return SnowballStemmer(idioma)
+    return obtener_recurso(('stemmer', idioma), cargar)
+
+def obtener_stopwords(idioma="english"):
+    """
+    Devuelve el conjunto de stopwords de NLTK compartido.
+
+    Parámetros:
+    -----------
+    idioma : str, opcional
+        El idioma de las stopwords.
+
+    Devoluciones:
+    ------------
+    frozenset:
+        El conjunto de stopwords.
+    """
+    def cargar():
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(idioma))
+    return obtener_recurso(('stopwords', idioma), cargar)
+
+def obtener_artefacto(path):
+    """
+    Devuelve un objeto guardado con joblib (modelo o vectorizador) compartido.
+
+    La clave incluye la fecha de modificación del archivo, por lo que si el archivo cambia se vuelve a cargar
+    y la versión anterior sale del registro.
+
+    Parámetros:
+    -----------
+    path : str
+        La ruta al archivo .pkl.
+
+    Devoluciones:
+    ------------
+    object:
+        El objeto cargado.
+    """
+    path = os.path.abspath(path)
+    def cargar():
+        import joblib
+        _descartar_versiones('joblib', path)
+        return joblib.load(path)
+    return obtener_recurso(('joblib', path, os.stat(path).st_mtime_ns), cargar)
+
+def obtener_artefacto_mapeado(path):
+    """
+    Devuelve el vectorizador y el modelo de un artefacto mapeado en memoria compartidos.
+
+    Parámetros:
+    -----------
+    path : str
+        La ruta al archivo del artefacto (ver `src.artefactos`).
+
+    Devoluciones:
+    ------------
+    tuple:
+        El VectorizadorMapeado y el ModeloMapeado.
+    """
+    path = os.path.abspath(path)
+    def cargar():
+        from src.artefactos import cargar_artefacto
+        _descartar_versiones('mmap', path)
+        return cargar_artefacto(path)
+    return obtener_recurso(('mmap', path, os.stat(path).st_mtime_ns), cargar)
@@ -0,0 +1,128 @@
+# Se importan las librerías pertinentes:
+from src.constantes import mapeo_emociones
+from src.recursos import importar_perezoso
+
+np = importar_perezoso("numpy")
+pd = importar_perezoso("pandas")
+
+# Función para convertir códigos de clase en etiquetas de emoción:
+def mapear_emociones(codigos, mapeo=mapeo_emociones):
+    """
+    Convierte los códigos de clase en las etiquetas de emoción de forma vectorizada.
+
+    Parámetros:
+    -----------
+    codigos : array-like
+        Los códigos de clase.
+    mapeo : dict, opcional
+        El diccionario que asigna a cada código su etiqueta.
+
+    Devoluciones:
+    ------------
+    pandas.Categorical:
+        Las etiquetas de cada código, con las etiquetas de `mapeo` como categorías.
+        Los códigos que no están en `mapeo` quedan como nulos.
+    """
+    posiciones = pd.Index(list(mapeo)).get_indexer(np.asarray(codigos))
+    return pd.Categorical.from_codes(posiciones, categories=list(mapeo.values()))
+
+# Clase con el resultado de clasificar un conjunto de textos:
+class ResultadoClasificacion:
+    def __init__(self, probabilidades, clases, indices=None):
+        """
+        Inicializa el objeto ResultadoClasificacion.
+
+        El resultado se guarda en una matriz float32 de probabilidades y en un array con la posición de la
+        clase predicha de cada texto, del entero más estrecho que admite el número de clases (int8 con las
+        seis emociones), sin crear ningún objeto de Python por texto. Las conversiones a
+        etiquetas, listas o DataFrame solo se hacen cuando se piden.
+
+        Parámetros:
+        -----------
+        probabilidades : numpy.ndarray
+            Las probabilidades de cada clase (n_textos, n_clases), con las columnas en el orden de `clases`.
+        clases : numpy.ndarray
+            Los códigos de las clases (`modelo.classes_`).
+        indices : numpy.ndarray, opcional
+            La posición en `clases` de la clase predicha de cada texto. Si no se indica es la de mayor probabilidad.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si las dimensiones de las probabilidades, las clases y los índices no coinciden, o si algún índice
+            no corresponde a ninguna clase.
+        """
+        self.probabilidades = np.asarray(probabilidades, dtype=np.float32).reshape(-1, len(clases))
+        self.clases = np.asarray(clases)
+        tipo_indices = next(tipo for tipo in (np.int8, np.int16, np.intp) if len(self.clases) <= np.iinfo(tipo).max)
+        if indices is None:
+            indices = self.probabilidades.argmax(axis=1)
+        indices = np.asarray(indices)
+        if indices.shape != (len(self.probabilidades),):
+            raise ValueError("Debe haber un índice de clase por cada fila de probabilidades.")
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self.clases)):
+            raise ValueError("Los índices de clase deben estar entre 0 y el número de clases menos uno.")
+        self.indices = indices.astype(tipo_indices, copy=False)
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def categorias(self):
+        """
+        numpy.ndarray: Los códigos de las clases predichas.
+        """
+        return self.clases[self.indices]
+
+    @property
+    def probabilidad_maxima(self):
+        """
+        numpy.ndarray: La mayor probabilidad de cada texto, en float32.
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.float32)
+        return self.probabilidades.max(axis=1)
+
+    def emociones(self, mapeo=mapeo_emociones):
+        """
+        Devuelve las etiquetas de emoción de las clases predichas.
+
+        Parámetros:
+        -----------
+        mapeo : dict, opcional
+            El diccionario que asigna a cada código su etiqueta.
+
+        Devoluciones:
+        ------------
+        pandas.Categorical:
+            La etiqueta de cada texto. Se calcula una vez por clase y no una vez por texto.
+        """
+        posiciones = pd.Index(list(mapeo)).get_indexer(self.clases)
+        return pd.Categorical.from_codes(posiciones[self.indices], categories=list(mapeo.values()))
+
+    def lista_probabilidades(self):
+        """
+        Devuelve las probabilidades como una lista por texto, el formato de la columna 'PROBABILIDADES_CATEGORIAS' del CSV.
+
+        Devoluciones:
+        ------------
+        list of list of float:
+            Las probabilidades de cada texto.
+        """
+        return self.probabilidades.tolist()
+
+    def a_dataframe(self, index=None):
+        """
+        Convierte las probabilidades en un DataFrame.
+
+        Parámetros:
+        -----------
+        index : array-like, opcional
+            El índice del DataFrame.
+
+        Devoluciones:
+        ------------
+        pandas.DataFrame:
+            Una columna float32 por clase, con los códigos de las clases como nombres de columna.
+        """
+        return pd.DataFrame(self.probabilidades, index=index, columns=self.clases)
@@ -0,0 +1,331 @@
+# Servicio local de clasificación en línea con micro-lotes dinámicos.
+#
+# Las peticiones concurrentes se agrupan en micro-lotes: el primer texto que llega abre una ventana de
+# `ventana_ms` milisegundos y todos los que llegan dentro de ella (hasta `tamano_lote`) se limpian y se
+# clasifican juntos, de modo que el vectorizador y el modelo se llaman una vez por lote y no por texto.
+#
+# Rutas:
+#   POST /clasificar   {"texto": "..."} -> categoría, emoción, probabilidades y texto limpio.
+#   GET  /metricas     Latencias p50/p99, rendimiento y tamaño medio de los lotes.
+#   GET  /salud        Comprobación de que el servicio está activo.
+# Si el procesado de un micro-lote falla, todas sus peticiones reciben un 500. Si ya hay `tamano_cola` textos en
+# espera, las peticiones nuevas se rechazan con un 503 en lugar de acumularse en memoria, y si el cuerpo de una
+# petición supera `tamano_maximo_cuerpo` bytes se responde 413 y se cierra la conexión sin leerlo.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m src.servicio --modelo modelos/modelo_TF_SDG_SW_L.pkl --vectorizador modelos/vectorizador_TF_SDG_SW_L.pkl [--puerto 8000 | --socket /tmp/clasificador.sock]
+# Con --recarga-segundos el servicio comprueba periódicamente si los archivos del modelo han cambiado (por
+# ejemplo, por un punto de control de `src.entrenamiento_incremental`) y cambia al modelo nuevo sin detenerse.
+
+# Se importan las librerías pertinentes:
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.constantes import *
+from src.clases import Preprocesado, CLasificadorTexto
+
+# Textos de las respuestas HTTP según el código de estado:
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+                422: 'Unprocessable Entity', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Clase que agrupa las peticiones concurrentes en micro-lotes:
+class ServicioClasificacion:
+    def __init__(self, clasificador, preprocesado, ventana_ms=VENTANA_LATENCIA_MS, tamano_lote=TAMANO_MAXIMO_MICROLOTE, muestras_latencia=10000,
+                 tamano_cola=TAMANO_COLA_SERVICIO, tamano_maximo_cuerpo=TAMANO_MAXIMO_CUERPO):
+        """
+        Inicializa el objeto ServicioClasificacion.
+
+        Parámetros:
+        -----------
+        clasificador : CLasificadorTexto
+            El clasificador con el modelo y el vectorizador cargados.
+        preprocesado : Preprocesado
+            El preprocesado con el que se limpian los textos, el mismo que en el flujo por lotes.
+        ventana_ms : float, opcional
+            El tiempo máximo, en milisegundos, que espera un lote a que lleguen más textos.
+        tamano_lote : int, opcional
+            El número máximo de textos de un micro-lote.
+        muestras_latencia : int, opcional
+            El número de latencias recientes con las que se calculan los percentiles.
+        tamano_cola : int, opcional
+            El número máximo de textos en espera de un micro-lote. Con la cola llena las peticiones se rechazan.
+        tamano_maximo_cuerpo : int, opcional
+            El tamaño máximo, en bytes, del cuerpo de una petición. Las peticiones mayores se rechazan con un 413.
+        """
+        self.clasificador = clasificador
+        self.preprocesado = preprocesado
+        self.ventana = ventana_ms / 1000
+        self.tamano_lote = tamano_lote
+        self.tamano_cola = tamano_cola
+        self.tamano_maximo_cuerpo = tamano_maximo_cuerpo
+        self.latencias = deque(maxlen=muestras_latencia)
+        self.peticiones = 0
+        self.lotes = 0
+        self.inicio = time.monotonic()
+        self._cola = None
+        # La limpieza y la inferencia se ejecutan en un único hilo para no bloquear el bucle de eventos
+        self._ejecutor = ThreadPoolExecutor(max_workers=1)
+
+    async def clasificar(self, texto):
+        """
+        Encola un texto y espera al resultado de su micro-lote.
+
+        Parámetros:
+        -----------
+        texto : str
+            El texto a clasificar.
+
+        Devoluciones:
+        ------------
+        dict o None:
+            El resultado de la clasificación, o None si el texto se descarta en la limpieza.
+
+        Excepciones:
+        ------------
+        asyncio.QueueFull:
+            Si ya hay `tamano_cola` textos en espera.
+        Exception:
+            El error con el que haya fallado el procesado del micro-lote.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        self._cola.put_nowait((texto, futuro, time.perf_counter()))
+        return await futuro
+
+    async def _agrupar(self):
+        """
+        Forma los micro-lotes a partir de la cola y los procesa uno detrás de otro.
+        """
+        bucle = asyncio.get_running_loop()
+        while True:
+            lote = [await self._cola.get()]
+            limite = bucle.time() + self.ventana
+            while len(lote) < self.tamano_lote:
+                restante = limite - bucle.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                resultados = await bucle.run_in_executor(self._ejecutor, self._procesar_lote, [texto for texto, _, _ in lote])
+            except Exception as e:
+                for _, futuro, _ in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            fin = time.perf_counter()
+            self.lotes += 1
+            for (_, futuro, llegada), resultado in zip(lote, resultados):
+                self.peticiones += 1
+                self.latencias.append(fin - llegada)
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+    def _procesar_lote(self, textos):
+        """
+        Limpia y clasifica un micro-lote de textos.
+
+        Parámetros:
+        -----------
+        textos : list of str
+            Los textos del lote.
+
+        Devoluciones:
+        ------------
+        list:
+            Un diccionario con el resultado de cada texto, o None si se descarta en la limpieza.
+        """
+        # Los tokens lematizados se vectorizan directamente, sin unirlos en una cadena para volver a separarlos
+        limpios, lematizados = self.preprocesado.procesar_textos(textos, devolver_tokens=True)
+        validos = [lematizado for lematizado in lematizados if lematizado is not None]
+        resultado = self.clasificador.inferir_tokens(validos)
+        categorias, probabilidades, clases = resultado.categorias, resultado.probabilidades, resultado.clases
+        posicion = 0
+        resultados = []
+        for limpio, lematizado in zip(limpios, lematizados):
+            if lematizado is None:
+                resultados.append(None)
+                continue
+            categoria = categorias[posicion].item()
+            resultados.append({
+                'texto_limpio': limpio,
+                'categoria': categoria,
+                'emocion': mapeo_emociones.get(categoria, str(categoria)),
+                'probabilidades': {mapeo_emociones.get(clase.item(), str(clase)): float(probabilidad)
+                                   for clase, probabilidad in zip(clases, probabilidades[posicion])},
+            })
+            posicion += 1
+        return resultados
+
+    def metricas(self):
+        """
+        Devuelve las latencias y el rendimiento del servicio.
+
+        Devoluciones:
+        ------------
+        dict:
+            Número de peticiones y lotes, tamaño medio de lote, peticiones por segundo y latencias p50/p99 en milisegundos.
+        """
+        latencias = sorted(self.latencias)
+        def percentil(p):
+            return latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000 if latencias else 0.0
+        return {
+            'peticiones': self.peticiones,
+            'lotes': self.lotes,
+            'tamano_medio_lote': self.peticiones / self.lotes if self.lotes else 0.0,
+            'peticiones_por_segundo': self.peticiones / (time.monotonic() - self.inicio),
+            'latencia_p50_ms': percentil(0.50),
+            'latencia_p99_ms': percentil(0.99),
+        }
+
+    async def _atender(self, lector, escritor):
+        """
+        Atiende una conexión HTTP/1.1, admitiendo varias peticiones por conexión (keep-alive).
+        """
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, _ = linea.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    await self._responder(escritor, 400, {'error': 'Petición mal formada.'})
+                    break
+                cabeceras = {}
+                while True:
+                    cabecera = await lector.readline()
+                    if cabecera in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = cabecera.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                try:
+                    longitud = int(cabeceras.get('content-length', 0))
+                    if longitud < 0:
+                        raise ValueError
+                except ValueError:
+                    # Sin una longitud válida no se sabe dónde empieza la siguiente petición, así que se cierra la conexión
+                    await self._responder(escritor, 400, {'error': 'Cabecera Content-Length no válida.'})
+                    break
+                if longitud > self.tamano_maximo_cuerpo:
+                    # El cuerpo no se lee, así que tampoco se puede seguir usando la conexión
+                    await self._responder(escritor, 413, {'error': f'El cuerpo supera el máximo de {self.tamano_maximo_cuerpo} bytes.'})
+                    break
+                cuerpo = await lector.readexactly(longitud)
+                try:
+                    estado, respuesta = await self._enrutar(metodo, ruta, cuerpo)
+                except Exception as e:
+                    print("Ocurrió un error al atender la petición:", str(e))
+                    estado, respuesta = 500, {'error': 'Error interno al clasificar el texto.'}
+                await self._responder(escritor, estado, respuesta)
+                if cabeceras.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _enrutar(self, metodo, ruta, cuerpo):
+        """
+        Resuelve una petición y devuelve el código de estado y el cuerpo de la respuesta.
+        """
+        if ruta == '/clasificar':
+            if metodo != 'POST':
+                return 405, {'error': 'Use POST.'}
+            try:
+                texto = json.loads(cuerpo)['texto']
+            except (ValueError, KeyError, TypeError):
+                return 400, {'error': 'Se requiere un JSON con el campo "texto".'}
+            if not isinstance(texto, str):
+                return 400, {'error': 'El campo "texto" debe ser una cadena.'}
+            try:
+                resultado = await self.clasificar(texto)
+            except asyncio.QueueFull:
+                return 503, {'error': 'El servicio está saturado; inténtelo más tarde.'}
+            if resultado is None:
+                return 422, {'error': 'El texto no contiene más de una palabra válida tras la limpieza.'}
+            return 200, resultado
+        if ruta == '/metricas':
+            return 200, self.metricas()
+        if ruta == '/salud':
+            return 200, {'estado': 'ok'}
+        return 404, {'error': 'Ruta no encontrada.'}
+
+    async def _responder(self, escritor, estado, respuesta):
+        cuerpo = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+        escritor.write(f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                       f"Content-Length: {len(cuerpo)}\r\n\r\n".encode('latin-1') + cuerpo)
+        await escritor.drain()
+
+    async def _recargar(self, intervalo):
+        """
+        Comprueba cada `intervalo` segundos si el modelo ha cambiado en disco y, si es así, lo sustituye.
+        La carga se hace en un hilo aparte, por lo que los micro-lotes se siguen procesando mientras tanto.
+        """
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                if await asyncio.to_thread(self.clasificador.recargar_si_cambia):
+                    print("El servicio cambió al modelo nuevo de", self.clasificador.modelo_path)
+            except Exception as e:
+                print("Ocurrió un error al recargar el modelo:", str(e))
+
+    async def servir(self, host='127.0.0.1', puerto=8000, socket=None, recarga_segundos=None):
+        """
+        Arranca el servidor HTTP en un puerto TCP o en un socket Unix y atiende peticiones indefinidamente.
+
+        Parámetros:
+        -----------
+        host : str, opcional
+            La dirección en la que se escucha.
+        puerto : int, opcional
+            El puerto TCP.
+        socket : str, opcional
+            La ruta de un socket Unix. Si se indica, se usa en lugar del puerto TCP.
+        recarga_segundos : float, opcional
+            Si se indica, cada cuántos segundos se comprueba si los archivos del modelo han cambiado.
+        """
+        self._cola = asyncio.Queue(maxsize=self.tamano_cola)
+        agrupador = asyncio.create_task(self._agrupar())
+        recarga = asyncio.create_task(self._recargar(recarga_segundos)) if recarga_segundos else None
+        if socket:
+            servidor = await asyncio.start_unix_server(self._atender, path=socket)
+        else:
+            servidor = await asyncio.start_server(self._atender, host, puerto)
+        print("Servicio de clasificación escuchando en", socket or f"http://{host}:{puerto}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            agrupador.cancel()
+            if recarga is not None:
+                recarga.cancel()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio local de clasificación de textos con micro-lotes.")
+    parser.add_argument('--modelo', required=True, help="Ruta al modelo .pkl o al artefacto .mmap.")
+    parser.add_argument('--vectorizador', help="Ruta al vectorizador .pkl (no se usa con un artefacto .mmap).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--socket', help="Ruta de un socket Unix en lugar del puerto TCP.")
+    parser.add_argument('--ventana-ms', type=float, default=VENTANA_LATENCIA_MS, help="Espera máxima de un micro-lote en milisegundos.")
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_MAXIMO_MICROLOTE, help="Número máximo de textos por micro-lote.")
+    parser.add_argument('--tamano-cola', type=int, default=TAMANO_COLA_SERVICIO, help="Número máximo de textos en espera; con la cola llena se responde 503.")
+    parser.add_argument('--tamano-maximo-cuerpo', type=int, default=TAMANO_MAXIMO_CUERPO, help="Tamaño máximo del cuerpo de una petición en bytes; si se supera se responde 413.")
+    parser.add_argument('--recarga-segundos', type=float, help="Cada cuántos segundos se comprueba si el modelo ha cambiado en disco.")
+    args = parser.parse_args(argumentos)
+
+    servicio = ServicioClasificacion(CLasificadorTexto(args.modelo, args.vectorizador), Preprocesado(None, 'TEXTO'),
+                                     ventana_ms=args.ventana_ms, tamano_lote=args.tamano_lote, tamano_cola=args.tamano_cola,
+                                     tamano_maximo_cuerpo=args.tamano_maximo_cuerpo)
+    try:
+        asyncio.run(servicio.servir(args.host, args.puerto, args.socket, args.recarga_segundos))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+# Ejecución reanudable de la clasificación de un CSV por bloques numerados.
+#
+# Cada bloque del CSV se limpia, se clasifica y se guarda en su propio archivo dentro de un directorio de
+# trabajo, y un manifiesto JSON registra los bloques terminados. Si la ejecución se interrumpe, al volver a
+# lanzarla con el mismo directorio los bloques ya terminados se leen del CSV pero no se vuelven a procesar, y
+# el trabajo sigue en el primer bloque pendiente. Cuando todos los bloques están terminados, la tabla final se
+# forma concatenando sus archivos en orden.
+#
+# El manifiesto guarda el archivo de entrada (ruta, tamaño y fecha de modificación), la huella del modelo (ver
+# `src.cache_resultados.huella_clasificador`), el tamaño de bloque y el formato de salida. Si alguno cambia, los
+# bloques guardados no son válidos y el trabajo se detiene, salvo que se pida reiniciarlo.
+#
+# Uso (desde la raíz del repositorio):
+#     python -m src.trabajo --datos datos.csv --modelo modelo.pkl --vectorizador vectorizador.pkl --salida clasificacion.parquet [--tamano-bloque 100000] [--n-procesos 4]
+
+# Se importan las librerías pertinentes:
+import argparse
+import json
+import os
+import shutil
+import time
+from src.constantes import *
+from src.instrumentacion import Instrumentacion, medir_etapa, escribir_atomico
+from src.cache_resultados import huella_clasificador
+from src.clases import CLasificadorTexto, GuardarParquet, ProcesadorPorBloques
+
+# Nombre del manifiesto dentro del directorio de trabajo:
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+# Clase para clasificar un CSV por bloques que se pueden reanudar:
+class TrabajoPorBloques:
+    def __init__(self, path_csv, modelo_path, vectorizador_path, path_guardado, directorio_trabajo=None, tamano_bloque=TAMANO_BLOQUE_LECTURA,
+                 n_procesos=1, instrumentacion=None, path_cache=None, escalado=None, umbral_confianza=UMBRAL_CONFIANZA_CASCADA):
+        """
+        Inicializa el objeto TrabajoPorBloques.
+
+        Parámetros:
+        -----------
+        path_csv : str
+            La ruta al archivo CSV con los datos a clasificar.
+        modelo_path : str
+            La ruta al archivo .pkl que contiene el modelo entrenado.
+        vectorizador_path : str
+            La ruta al archivo .pkl que contiene el vectorizador entrenado.
+        path_guardado : str
+            La ruta de la tabla clasificada final. Si termina en `EXTENSION_PARQUET` se guarda en Parquet; si no, en CSV.
+        directorio_trabajo : str, opcional
+            El directorio de los archivos de cada bloque y del manifiesto. Por defecto, `path_guardado` seguido de '.bloques'.
+        tamano_bloque : int, opcional
+            El número de filas de cada bloque.
+        n_procesos : int, opcional
+            El número de procesos con los que se realiza la limpieza de cada bloque.
+        instrumentacion : Instrumentacion, opcional
+            Si se indica, se miden las etapas de cada bloque y la etapa 'trabajo.ensamblado'.
+        path_cache : str, opcional
+            La ruta de un archivo SQLite con la cache de resultados (ver `src.cache_resultados`).
+        escalado : CLasificadorTexto, opcional
+            El siguiente nivel de la cascada (ver CLasificadorTexto).
+        umbral_confianza : float, opcional
+            El umbral de confianza de la cascada.
+        """
+        self.path_csv = path_csv
+        self.path_guardado = path_guardado
+        self.directorio_trabajo = directorio_trabajo or f"{path_guardado}.bloques"
+        self.tamano_bloque = tamano_bloque
+        self.instrumentacion = instrumentacion
+        self.parquet = path_guardado.endswith(EXTENSION_PARQUET)
+        self.extension = EXTENSION_PARQUET if self.parquet else '.csv'
+        self.procesador = ProcesadorPorBloques(path_csv, modelo_path, vectorizador_path, tamano_bloque=tamano_bloque, n_procesos=n_procesos,
+                                               instrumentacion=instrumentacion, path_cache=path_cache, escalado=escalado,
+                                               umbral_confianza=umbral_confianza)
+        self.manifiesto = None
+
+    @property
+    def path_manifiesto(self):
+        return os.path.join(self.directorio_trabajo, NOMBRE_MANIFIESTO)
+
+    def _configuracion(self):
+        """
+        Devuelve los datos de la ejecución de los que depende el contenido de los bloques.
+        """
+        estado = os.stat(self.path_csv)
+        return {
+            'entrada': os.path.abspath(self.path_csv),
+            'tamano_entrada': estado.st_size,
+            'modificacion_entrada': estado.st_mtime_ns,
+            'huella_modelo': huella_clasificador(self.procesador.clasificador),
+            'tamano_bloque': self.tamano_bloque,
+            'formato': self.extension,
+        }
+
+    def _guardar_manifiesto(self):
+        escribir_atomico(self.path_manifiesto, json.dumps(self.manifiesto, indent=2, ensure_ascii=False))
+
+    def _abrir_manifiesto(self, reiniciar=False):
+        """
+        Carga el manifiesto del directorio de trabajo o crea uno nuevo.
+
+        Parámetros:
+        -----------
+        reiniciar : bool, opcional
+            Si se descartan los bloques de una ejecución anterior.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si el manifiesto existente corresponde a otra configuración y no se pide reiniciar.
+        """
+        configuracion = self._configuracion()
+        if reiniciar and os.path.isdir(self.directorio_trabajo):
+            shutil.rmtree(self.directorio_trabajo)
+        os.makedirs(self.directorio_trabajo, exist_ok=True)
+        if os.path.exists(self.path_manifiesto):
+            with open(self.path_manifiesto, encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+            diferencias = [clave for clave, valor in configuracion.items() if manifiesto['configuracion'].get(clave) != valor]
+            if diferencias:
+                raise ValueError(f"El directorio de trabajo {self.directorio_trabajo} corresponde a otra ejecución (cambia {', '.join(diferencias)}). "
+                                 "Indique otro directorio o reinicie el trabajo.")
+            self.manifiesto = manifiesto
+        else:
+            self.manifiesto = {'configuracion': configuracion, 'bloques': {}, 'total_bloques': None, 'completado': False}
+            self._guardar_manifiesto()
+
+    def _path_bloque(self, numero):
+        return os.path.join(self.directorio_trabajo, f"bloque_{numero:06d}{self.extension}")
+
+    def bloque_terminado(self, numero):
+        """
+        Indica si un bloque figura como terminado en el manifiesto y su archivo existe.
+
+        Parámetros:
+        -----------
+        numero : int
+            El número del bloque, empezando por 0.
+
+        Devoluciones:
+        ------------
+        bool:
+            True si el bloque no se tiene que volver a procesar.
+        """
+        return str(numero) in self.manifiesto['bloques'] and os.path.exists(self._path_bloque(numero))
+
+    def _guardar_bloque(self, numero, bloque, resultado):
+        """
+        Guarda un bloque clasificado en su archivo a través de un temporal.
+
+        A diferencia de GuardarCSV y GuardarParquet, los errores no se capturan: un bloque que no se ha podido
+        guardar no se marca como terminado y detiene el trabajo.
+        """
+        path = self._path_bloque(numero)
+        temporal = f"{path}.{os.getpid()}.tmp"
+        if self.parquet:
+            import pyarrow.parquet as pq
+            guardar = GuardarParquet(temporal, clases=self.procesador.clasificador.modelo.classes_)
+            pq.write_table(guardar.tabla(bloque, resultado.probabilidades), temporal, compression=guardar.compresion,
+                           row_group_size=guardar.tamano_grupo)
+        else:
+            bloque.to_csv(temporal, columns=columnas_deseadas, index=False)
+        os.replace(temporal, path)
+
+    def _ensamblar(self):
+        """
+        Concatena en orden los archivos de todos los bloques en la tabla final, a través de un temporal.
+
+        Devoluciones:
+        ------------
+        int:
+            El número de filas de la tabla final.
+        """
+        temporal = f"{self.path_guardado}.{os.getpid()}.tmp"
+        paths = [self._path_bloque(numero) for numero in range(self.manifiesto['total_bloques'])]
+        with medir_etapa(self.instrumentacion, 'trabajo.ensamblado') as medida:
+            if self.parquet:
+                # Se copian los grupos de filas de cada bloque sin cargar la tabla entera en memoria
+                import pyarrow.parquet as pq
+                escritor = None
+                try:
+                    for path in paths:
+                        archivo = pq.ParquetFile(path)
+                        if escritor is None:
+                            escritor = pq.ParquetWriter(temporal, archivo.schema_arrow, compression=COMPRESION_PARQUET)
+                        for grupo in range(archivo.num_row_groups):
+                            escritor.write_table(archivo.read_row_group(grupo))
+                finally:
+                    if escritor is not None:
+                        escritor.close()
+            else:
+                # Se copia la cabecera del primer bloque y las filas de todos, byte a byte
+                with open(temporal, 'wb') as destino:
+                    for posicion, path in enumerate(paths):
+                        with open(path, 'rb') as origen:
+                            if posicion > 0:
+                                origen.readline()
+                            shutil.copyfileobj(origen, destino)
+            os.replace(temporal, self.path_guardado)
+            filas = sum(bloque['filas_salida'] for bloque in self.manifiesto['bloques'].values())
+            medida['filas_salida'] = filas
+        return filas
+
+    def ejecutar(self, reiniciar=False, conservar_bloques=False):
+        """
+        Procesa los bloques pendientes del CSV y ensambla la tabla clasificada.
+
+        Parámetros:
+        -----------
+        reiniciar : bool, opcional
+            Si se descartan los bloques de una ejecución anterior y se empieza desde el primero.
+        conservar_bloques : bool, opcional
+            Si se conservan los archivos de los bloques después de ensamblar la tabla final.
+
+        Devoluciones:
+        ------------
+        int:
+            El número de filas de la tabla final.
+
+        Excepciones:
+        ------------
+        ValueError:
+            Si el directorio de trabajo corresponde a otra configuración y no se pide reiniciar.
+        """
+        self._abrir_manifiesto(reiniciar)
+        if self.manifiesto['completado'] and os.path.exists(self.path_guardado):
+            print("El trabajo ya estaba completado en", self.path_guardado)
+            return sum(bloque['filas_salida'] for bloque in self.manifiesto['bloques'].values())
+        procesados = omitidos = 0
+        with self.procesador.preprocesado:
+            try:
+                numero = -1
+                for numero, bloque in enumerate(self.procesador.lector.leer_por_bloques(self.tamano_bloque)):
+                    if self.bloque_terminado(numero):
+                        omitidos += 1
+                        continue
+                    inicio = time.perf_counter()
+                    with medir_etapa(self.instrumentacion, 'trabajo.bloque', len(bloque)) as medida:
+                        filas_entrada = len(bloque)
+                        bloque, resultado = self.procesador.procesar_bloque(bloque, lista_probabilidades=not self.parquet, devolver_resultado=True)
+                        self._guardar_bloque(numero, bloque, resultado)
+                        medida['filas_salida'] = len(bloque)
+                    self.manifiesto['bloques'][str(numero)] = {
+                        'archivo': os.path.basename(self._path_bloque(numero)),
+                        'filas_entrada': filas_entrada,
+                        'filas_salida': len(bloque),
+                        'segundos': time.perf_counter() - inicio,
+                    }
+                    self._guardar_manifiesto()
+                    procesados += 1
+            finally:
+                if self.procesador.cache_resultados is not None:
+                    self.procesador.cache_resultados.cerrar()
+        self.manifiesto['total_bloques'] = numero + 1
+        if self.instrumentacion is not None:
+            self.instrumentacion.registrar_estadisticas('trabajo', {'bloques_procesados': procesados, 'bloques_omitidos': omitidos})
+        if self.manifiesto['total_bloques'] == 0:
+            raise ValueError(f"El archivo {self.path_csv} no contiene filas.")
+        filas = self._ensamblar()
+        self.manifiesto['completado'] = True
+        self._guardar_manifiesto()
+        if not conservar_bloques:
+            for numero in range(self.manifiesto['total_bloques']):
+                os.remove(self._path_bloque(numero))
+        print(f"La tabla clasificada fue guardada correctamente en {self.path_guardado} "
+              f"({procesados} bloques procesados, {omitidos} ya terminados)")
+        return filas
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Clasificación reanudable de un CSV por bloques numerados.")
+    parser.add_argument('--datos', required=True, help="Ruta al CSV a clasificar (columnas 'Unnamed: 0', 'text' y 'label').")
+    parser.add_argument('--modelo', required=True, help="Ruta al modelo .pkl.")
+    parser.add_argument('--vectorizador', required=True, help="Ruta al vectorizador .pkl.")
+    parser.add_argument('--salida', required=True, help="Ruta de la tabla clasificada (.csv o .parquet).")
+    parser.add_argument('--directorio-trabajo', help="Directorio de los bloques y del manifiesto (por defecto, la salida seguida de '.bloques').")
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE_LECTURA)
+    parser.add_argument('--n-procesos', type=int, default=1, help="Procesos de la limpieza.")
+    parser.add_argument('--cache', help="Ruta de la cache de resultados en SQLite.")
+    parser.add_argument('--modelo-escalado', help="Ruta al modelo .pkl del segundo nivel de la cascada.")
+    parser.add_argument('--vectorizador-escalado', help="Ruta al vectorizador .pkl del segundo nivel de la cascada.")
+    parser.add_argument('--umbral-cascada', type=float, default=UMBRAL_CONFIANZA_CASCADA)
+    parser.add_argument('--metricas-json', help="Ruta del JSON con las métricas de la ejecución.")
+    parser.add_argument('--metricas-prometheus', help="Ruta del archivo de Prometheus con las métricas de la ejecución.")
+    parser.add_argument('--reiniciar', action='store_true', help="Descarta los bloques de una ejecución anterior.")
+    parser.add_argument('--conservar-bloques', action='store_true', help="Conserva los archivos de los bloques tras ensamblar la salida.")
+    args = parser.parse_args(argumentos)
+
+    tiempo_inicio = time.time()
+    instrumentacion = Instrumentacion()
+    escalado = None
+    if args.modelo_escalado is not None:
+        escalado = CLasificadorTexto(modelo_path=args.modelo_escalado, vectorizador_path=args.vectorizador_escalado, instrumentacion=instrumentacion)
+    trabajo = TrabajoPorBloques(args.datos, args.modelo, args.vectorizador, args.salida, args.directorio_trabajo, args.tamano_bloque,
+                                args.n_procesos, instrumentacion, args.cache, escalado, args.umbral_cascada)
+    trabajo.ejecutar(reiniciar=args.reiniciar, conservar_bloques=args.conservar_bloques)
+    if args.metricas_json or args.metricas_prometheus:
+        instrumentacion.exportar(args.metricas_json, args.metricas_prometheus)
+    print("Tiempo total de ejecución:", time.time() - tiempo_inicio, "segundos")
+
+if __name__ == '__main__':
+    main()
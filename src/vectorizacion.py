@@ -0,0 +1,170 @@
+# Vectorización directa de listas de tokens.
+#
+# El preprocesado produce una lista de lemas por texto. Unirla en una cadena para que `CountVectorizer.transform`
+# la vuelva a separar con su expresión regular y busque cada término en el vocabulario repite un trabajo que ya
+# está hecho. `VectorizadorTokens` construye la matriz dispersa directamente a partir de los tokens: cada token
+# distinto se analiza y se busca en el vocabulario una sola vez, y el resultado se memoriza.
+
+# Se importan las librerías pertinentes:
+from itertools import chain
+from src.constantes import TAMANO_CACHE_TOKENS
+from src.cache import CacheAcotada
+from src.recursos import importar_perezoso
+
+np = importar_perezoso("numpy")
+
+# Fragmentos de expresión regular que pueden coincidir con un espacio. Si el `token_pattern` del vectorizador
+# contiene alguno, un término podría abarcar dos tokens y no se puede analizar cada token por separado:
+FRAGMENTOS_CON_ESPACIOS = ('.', '\\s', '\\W', '\\D', '[', ' ')
+
+def parametros_vectorizador(vectorizador):
+    """
+    Devuelve los parámetros del analizador de un vectorizador, o None si no es un CountVectorizer ni un VectorizadorMapeado.
+
+    Parámetros:
+    -----------
+    vectorizador : CountVectorizer o VectorizadorMapeado
+        El vectorizador cargado.
+
+    Devoluciones:
+    ------------
+    dict o None:
+        Los parámetros del vectorizador.
+    """
+    if type(vectorizador).__name__ == 'CountVectorizer':
+        return vectorizador.get_params()
+    return getattr(vectorizador, 'parametros', None)
+
+def admite_tokens(vectorizador):
+    """
+    Indica si la matriz de un vectorizador se puede construir token a token con el mismo resultado que `transform`.
+
+    Se requiere un analizador 'word' sin preprocesador ni tokenizador propios y un `token_pattern` que no pueda
+    coincidir con espacios. Los vectorizadores con `analyzer='char'` o `'char_wb'`, entre otros, no lo admiten.
+
+    Parámetros:
+    -----------
+    vectorizador : CountVectorizer o VectorizadorMapeado
+        El vectorizador cargado.
+
+    Devoluciones:
+    ------------
+    bool:
+        True si admite la vectorización por tokens.
+    """
+    parametros = parametros_vectorizador(vectorizador)
+    if parametros is None or parametros.get('analyzer') != 'word':
+        return False
+    if parametros.get('preprocessor') is not None or parametros.get('tokenizer') is not None:
+        return False
+    patron = parametros.get('token_pattern')
+    return patron is not None and not any(fragmento in patron for fragmento in FRAGMENTOS_CON_ESPACIOS)
+
+# Clase para vectorizar listas de tokens contra el vocabulario de un vectorizador:
+class VectorizadorTokens:
+    def __init__(self, vectorizador, tamano_cache=TAMANO_CACHE_TOKENS):
+        """
+        Inicializa el objeto VectorizadorTokens.
+
+        Si el vectorizador no admite la vectorización por tokens (ver `admite_tokens`), `transform` une los tokens
+        y llama a `vectorizador.transform`, de modo que el resultado es siempre el mismo.
+
+        Parámetros:
+        -----------
+        vectorizador : CountVectorizer o VectorizadorMapeado
+            El vectorizador cargado.
+        tamano_cache : int, opcional
+            El número máximo de tokens cuyas columnas se memorizan.
+        """
+        self.vectorizador = vectorizador
+        self.directo = admite_tokens(vectorizador)
+        self.cache = CacheAcotada(tamano_cache)
+        if not self.directo:
+            return
+        from sklearn.feature_extraction.text import CountVectorizer
+        parametros = parametros_vectorizador(vectorizador)
+        analizador = CountVectorizer(**{nombre: parametros[nombre] for nombre in ('lowercase', 'strip_accents', 'token_pattern', 'stop_words')})
+        self.preprocesar = analizador.build_preprocessor()
+        self.tokenizar = analizador.build_tokenizer()
+        self.stop_words = analizador.get_stop_words() or frozenset()
+        self.ngramas = tuple(parametros['ngram_range'])
+        self.binary = vectorizador.binary
+        self.dtype = np.dtype(vectorizador.dtype)
+        if hasattr(vectorizador, 'buscar_terminos'):
+            self.buscar_terminos = vectorizador.buscar_terminos
+            self.n_columnas = len(vectorizador.columnas)
+        else:
+            vocabulario = vectorizador.vocabulary_
+            self.buscar_terminos = lambda terminos: np.fromiter((vocabulario.get(termino, -1) for termino in terminos), dtype=np.intp, count=len(terminos))
+            self.n_columnas = len(vocabulario)
+
+    def _terminos(self, token):
+        """
+        Analiza un token igual que el vectorizador: preprocesado, expresión regular y stopwords.
+        """
+        return [termino for termino in self.tokenizar(self.preprocesar(token)) if termino not in self.stop_words]
+
+    def _columnas_tokens(self, tokens):
+        """
+        Devuelve, para cada token, la tupla de columnas del vocabulario de sus términos.
+        """
+        terminos_tokens = [self._terminos(token) for token in tokens]
+        columnas = self.buscar_terminos(list(chain.from_iterable(terminos_tokens))).tolist()
+        resultado = []
+        posicion = 0
+        for terminos in terminos_tokens:
+            resultado.append(tuple(columna for columna in columnas[posicion:posicion + len(terminos)] if columna >= 0))
+            posicion += len(terminos)
+        return resultado
+
+    def _ngramas(self, tokens):
+        """
+        Devuelve los términos de un texto con n-gramas, con el mismo orden de construcción que CountVectorizer.
+        """
+        unigramas = [termino for token in tokens for termino in self._terminos(token)]
+        minimo, maximo = self.ngramas
+        terminos = list(unigramas) if minimo == 1 else []
+        for n in range(max(minimo, 2), min(maximo, len(unigramas)) + 1):
+            terminos.extend(" ".join(unigramas[inicio:inicio + n]) for inicio in range(len(unigramas) - n + 1))
+        return terminos
+
+    def transform(self, listas_tokens):
+        """
+        Convierte listas de tokens en la matriz dispersa de cuentas de términos.
+
+        Parámetros:
+        -----------
+        listas_tokens : list of list of str
+            Los tokens de cada texto.
+
+        Devoluciones:
+        ------------
+        scipy.sparse.csr_matrix:
+            La misma matriz que `vectorizador.transform` de los tokens unidos por espacios.
+        """
+        if not self.directo:
+            return self.vectorizador.transform([" ".join(tokens) for tokens in listas_tokens])
+        from scipy import sparse
+        if self.ngramas == (1, 1):
+            # Cada token distinto se analiza y se busca una sola vez; el resto sale de la cache
+            columnas_tokens = self.cache.obtener_lote(list(chain.from_iterable(listas_tokens)), self._columnas_tokens)
+            longitudes = []
+            posicion = 0
+            for tokens in listas_tokens:
+                longitudes.append(sum(len(columnas) for columnas in columnas_tokens[posicion:posicion + len(tokens)]))
+                posicion += len(tokens)
+            columnas = np.fromiter(chain.from_iterable(columnas_tokens), dtype=np.int64)
+        else:
+            terminos_textos = [self._ngramas(tokens) for tokens in listas_tokens]
+            todas = self.buscar_terminos(list(chain.from_iterable(terminos_textos)))
+            validos = todas >= 0
+            filas = np.repeat(np.arange(len(terminos_textos)), [len(terminos) for terminos in terminos_textos])
+            columnas = todas[validos]
+            longitudes = np.bincount(filas[validos], minlength=len(terminos_textos))
+        indptr = np.zeros(len(listas_tokens) + 1, dtype=np.int64)
+        np.cumsum(longitudes, out=indptr[1:])
+        matriz = sparse.csr_matrix((np.ones(len(columnas), dtype=self.dtype), columnas, indptr), shape=(len(listas_tokens), self.n_columnas))
+        matriz.sum_duplicates()
+        if self.binary:
+            matriz.data[:] = 1
+        return matriz
@@ -0,0 +1,33 @@
+# Fixtures compartidas por las pruebas: un corpus sintético pequeño (ver `benchmarks.corpus_sintetico`)
+# y un modelo y un vectorizador entrenados sobre él (ver `benchmarks.etapas.entrenar_modelo`).
+#
+# Uso (desde la raíz del repositorio):
+#     python -m pytest -q
+
+# Se importan las librerías pertinentes:
+import pytest
+from benchmarks.corpus_sintetico import generar_corpus
+from benchmarks.etapas import entrenar_modelo
+
+@pytest.fixture(scope='session')
+def corpus():
+    """
+    Corpus sintético de 300 filas con las columnas del CSV de Kaggle.
+    """
+    return generar_corpus(300, semilla=7)
+
+@pytest.fixture(scope='session')
+def modelo(corpus, tmp_path_factory):
+    """
+    Rutas del modelo y del vectorizador entrenados sobre `corpus`.
+    """
+    return entrenar_modelo(corpus, str(tmp_path_factory.mktemp('modelo')))
+
+@pytest.fixture(scope='session')
+def path_csv(corpus, tmp_path_factory):
+    """
+    Ruta de `corpus` guardado en CSV.
+    """
+    path = tmp_path_factory.mktemp('datos') / 'datos.csv'
+    corpus.to_csv(path, index=False)
+    return str(path)
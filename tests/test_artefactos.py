@@ -0,0 +1,48 @@
+# Pruebas del formato compacto de artefactos (ver `src.artefactos`).
+
+# Se importan las librerías pertinentes:
+import os
+import joblib
+import numpy as np
+import pytest
+from src.artefactos import exportar_artefacto, cargar_artefacto, main, textos_vocabulario, VectorizadorMapeado
+
+def test_exportar_sustituye_el_artefacto_sin_afectar_a_los_mapeados(corpus, modelo, tmp_path):
+    modelo_pkl, vectorizador_pkl = joblib.load(modelo[0]), joblib.load(modelo[1])
+    textos = list(corpus['text'].head(50))
+    path = str(tmp_path / 'modelo.mmap')
+    exportar_artefacto(vectorizador_pkl, modelo_pkl, path, textos_verificacion=textos)
+    vectorizador_mapeado, modelo_mapeado = cargar_artefacto(path)
+    anterior = modelo_mapeado.coef_.copy()
+    # Al volver a exportar con otros pesos, el artefacto ya mapeado sigue leyendo el archivo anterior
+    modelo_pkl.coef_ = modelo_pkl.coef_ * 2
+    exportar_artefacto(vectorizador_pkl, modelo_pkl, path, textos_verificacion=textos)
+    np.testing.assert_array_equal(modelo_mapeado.coef_, anterior)
+    vectorizador_nuevo, modelo_nuevo = cargar_artefacto(path)
+    np.testing.assert_array_equal(modelo_nuevo.predict(vectorizador_nuevo.transform(textos)), modelo_pkl.predict(vectorizador_pkl.transform(textos)))
+    assert os.listdir(tmp_path) == ['modelo.mmap']
+
+def test_buscar_terminos_con_el_vocabulario_vacio():
+    vectorizador = VectorizadorMapeado(np.empty(0, dtype='S1'), np.empty(0, dtype=np.int32), {'ngram_range': [1, 1]}, False, np.int64)
+    np.testing.assert_array_equal(vectorizador.buscar_terminos(['hola', 'adios']), [-1, -1])
+    assert len(vectorizador.buscar_terminos([])) == 0
+
+@pytest.mark.parametrize('con_csv', [False, True])
+def test_main_verifica_el_artefacto(modelo, path_csv, tmp_path, monkeypatch, con_csv):
+    import src.artefactos as artefactos
+    verificados = []
+    exportar = artefactos.exportar_artefacto
+    def exportar_registrando(*args, textos_verificacion=None):
+        verificados.append(textos_verificacion)
+        return exportar(*args, textos_verificacion=textos_verificacion)
+    monkeypatch.setattr(artefactos, 'exportar_artefacto', exportar_registrando)
+    path = str(tmp_path / 'modelo.mmap')
+    argumentos = [modelo[0], modelo[1], path] + ([path_csv] if con_csv else [])
+    assert main(argumentos) == 0
+    assert os.path.exists(path)
+    assert verificados and len(verificados[0]) > 0
+    if not con_csv:
+        assert verificados[0] == textos_vocabulario(joblib.load(modelo[1]))
+
+def test_main_sin_argumentos_suficientes():
+    assert main(['modelo.pkl']) == 1
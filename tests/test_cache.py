@@ -0,0 +1,62 @@
+# Pruebas de CacheAcotada (ver `src.cache`).
+
+# Se importan las librerías pertinentes:
+import pytest
+from src.cache import CacheAcotada, sumar_estadisticas
+
+def test_lru_expulsa_la_entrada_usada_hace_mas_tiempo():
+    cache = CacheAcotada(2, politica='lru')
+    cache.obtener_varios(['a', 'b'], str.upper)
+    cache.obtener('a', str.upper)
+    cache.obtener('c', str.upper)
+    assert list(cache._entradas) == ['a', 'c']
+
+def test_fifo_expulsa_la_entrada_insertada_antes():
+    cache = CacheAcotada(2, politica='fifo')
+    cache.obtener_varios(['a', 'b'], str.upper)
+    cache.obtener('a', str.upper)
+    cache.obtener('c', str.upper)
+    assert list(cache._entradas) == ['b', 'c']
+
+@pytest.mark.parametrize('politica', ['lru', 'fifo'])
+def test_obtener_lote_calcula_cada_clave_ausente_una_vez(politica):
+    cache = CacheAcotada(3, politica=politica)
+    cache.obtener_varios(['a', 'x'], str.upper)
+    calculadas = []
+    def calcular_lote(claves):
+        calculadas.extend(claves)
+        return [clave.upper() for clave in claves]
+    assert cache.obtener_lote(['b', 'a', 'b'], calcular_lote) == ['B', 'A', 'B']
+    assert calculadas == ['b']
+    assert cache.estadisticas()['aciertos'] == 2
+    # 'a' se ha consultado en el lote, así que con 'lru' sale antes 'x' y con 'fifo' sale antes 'a'
+    cache.obtener('c', str.upper)
+    assert list(cache._entradas) == (['a', 'b', 'c'] if politica == 'lru' else ['x', 'b', 'c'])
+
+def test_estadisticas_y_tamano_cero():
+    cache = CacheAcotada(0)
+    assert cache.obtener_varios(['a', 'a'], str.upper) == ['A', 'A']
+    assert len(cache) == 0
+    assert sumar_estadisticas([cache.estadisticas(), CacheAcotada(5).estadisticas()])['fallos'] == 2
+
+def test_politica_invalida():
+    with pytest.raises(ValueError):
+        CacheAcotada(10, politica='lfu')
+
+@pytest.mark.parametrize('politica', ['lru', 'fifo'])
+def test_calcula_fuera_del_cerrojo(politica):
+    cache = CacheAcotada(4, politica=politica)
+    # Si el cálculo se hiciera con el cerrojo tomado, consultar la cache desde él se bloquearía
+    def calcular(clave):
+        return cache.obtener(clave * 2, str.upper)
+    assert cache.obtener_varios(['a', 'b'], calcular) == ['AA', 'BB']
+    assert cache.obtener_lote(['c'], lambda claves: [cache.obtener(clave * 2, str.upper) for clave in claves]) == ['CC']
+
+def test_fifo_conserva_el_orden_si_otro_hilo_inserta_la_clave():
+    cache = CacheAcotada(2, politica='fifo')
+    # Mientras se calcula 'a' en el lote, otro hilo la guarda y luego guarda 'b'
+    def calcular_lote(claves):
+        cache.obtener_varios(['a', 'b'], lambda clave: 'otro')
+        return [clave.upper() for clave in claves]
+    assert cache.obtener_lote(['a'], calcular_lote) == ['A']
+    assert list(cache._entradas.items()) == [('a', 'otro'), ('b', 'otro')]
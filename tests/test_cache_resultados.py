@@ -0,0 +1,71 @@
+# Pruebas de la cache de resultados (ver `src.cache_resultados`).
+
+# Se importan las librerías pertinentes:
+import copy
+import os
+import joblib
+import numpy as np
+import pytest
+from src.cache_resultados import ClasificadorConCache, CacheResultados, huella_archivos, huella_clasificador
+from src.clases import Preprocesado, CLasificadorTexto
+
+@pytest.fixture
+def con_cache(modelo, tmp_path):
+    clasificador = ClasificadorConCache(Preprocesado(None, 'TEXTO'), CLasificadorTexto(*modelo), str(tmp_path / 'cache.sqlite'))
+    yield clasificador
+    clasificador.cerrar()
+
+def _sin_cache(con_cache, textos):
+    limpios, tokens = con_cache.preprocesado.procesar_textos(textos, devolver_tokens=True)
+    return limpios, con_cache.clasificador.inferir_tokens([lista for lista in tokens if lista is not None])
+
+def test_aciertos_y_fallos(con_cache, corpus, monkeypatch):
+    textos = list(corpus['text'].head(40)) * 2
+    limpios, lematizados, resultado = con_cache.clasificar_textos(textos)
+    esperados, esperado = _sin_cache(con_cache, textos)
+    assert limpios == esperados
+    np.testing.assert_array_equal(resultado.probabilidades, esperado.probabilidades)
+    # Los textos repetidos se buscan una sola vez
+    assert con_cache.cache.estadisticas() == {'aciertos': 0, 'fallos': 40, 'tasa_aciertos': 0.0}
+    assert con_cache.duplicados == 40
+
+    # La segunda vez todos los textos salen de la cache, sin preprocesar ni clasificar nada
+    monkeypatch.setattr(con_cache.preprocesado, 'procesar_variantes', lambda *args, **kwargs: pytest.fail("El texto no salió de la cache."))
+    segunda = con_cache.clasificar_textos(textos)
+    assert segunda[:2] == (limpios, lematizados)
+    np.testing.assert_array_equal(segunda[2].probabilidades, resultado.probabilidades)
+    np.testing.assert_array_equal(segunda[2].indices, resultado.indices)
+    assert con_cache.cache.estadisticas()['aciertos'] == 40
+
+def test_la_huella_cambia_con_el_modelo(modelo, tmp_path):
+    modelo_path, vectorizador_path = modelo
+    copia = str(tmp_path / 'modelo.pkl')
+    estimador = joblib.load(modelo_path)
+    joblib.dump(estimador, copia)
+    huella = huella_archivos(copia, vectorizador_path)
+    assert huella == huella_archivos(copia, vectorizador_path)
+    estimador.coef_ = estimador.coef_ * 2
+    joblib.dump(estimador, copia)
+    os.utime(copia, ns=(0, os.stat(copia).st_mtime_ns + 1))
+    assert huella_archivos(copia, vectorizador_path) != huella
+
+    # Al abrir la cache con otra huella se vacía
+    path_cache = str(tmp_path / 'cache.sqlite')
+    with CacheResultados(path_cache, huella) as cache:
+        cache.guardar([(b'clave', 'limpio', 'lematizado', 0, b'')])
+        assert len(cache) == 1
+    with CacheResultados(path_cache, huella_archivos(copia, vectorizador_path)) as cache:
+        assert len(cache) == 0
+
+def test_cambio_de_modelo_en_memoria_vacia_la_cache(con_cache, corpus):
+    textos = list(corpus['text'].head(20))
+    con_cache.clasificar_textos(textos)
+    huella = con_cache.cache.huella
+    nuevo = copy.deepcopy(con_cache.clasificador.modelo)
+    nuevo.coef_ = nuevo.coef_ * 2
+    con_cache.clasificador.actualizar_modelo(nuevo)
+    assert huella_clasificador(con_cache.clasificador) != huella
+    _, _, resultado = con_cache.clasificar_textos(textos)
+    assert con_cache.cache.huella != huella
+    assert con_cache.cache.estadisticas()['aciertos'] == 0
+    np.testing.assert_array_equal(resultado.probabilidades, _sin_cache(con_cache, textos)[1].probabilidades)
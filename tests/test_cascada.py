@@ -0,0 +1,62 @@
+# Pruebas de la cascada de modelos de CLasificadorTexto y de su evaluación (ver `src.clases` y `src.cascada`).
+
+# Se importan las librerías pertinentes:
+import joblib
+import numpy as np
+import pandas.testing as pdt
+from sklearn.linear_model import LogisticRegression
+from src.constantes import UMBRAL_CONFIANZA_CASCADA
+from src.clases import CLasificadorTexto
+from src.cascada import evaluar_cascada, main
+
+def test_solo_se_escalan_las_filas_por_debajo_del_umbral(corpus, modelo, tmp_path, monkeypatch):
+    textos = list(corpus['text'])
+    # El primer nivel es una regresión logística muy regularizada, con probabilidades poco concentradas
+    vectorizador = joblib.load(modelo[1])
+    path_primero = str(tmp_path / 'primero.pkl')
+    joblib.dump(LogisticRegression(C=0.01, max_iter=1000).fit(vectorizador.transform(textos), corpus['label']), path_primero)
+    primero = CLasificadorTexto(path_primero, modelo[1]).inferir_textos(textos)
+    segundo = CLasificadorTexto(*modelo).inferir_textos(textos)
+    # Umbral en la mediana de la confianza del primer nivel, para que se escalen parte de las filas
+    umbral = float(np.median(primero.probabilidad_maxima))
+    bajas = primero.probabilidad_maxima < umbral
+    assert 0 < bajas.sum() < len(textos)
+
+    escalado = CLasificadorTexto(*modelo)
+    recibidas = []
+    for metodo in ('inferir_textos', 'inferir_tokens'):
+        inferir = getattr(escalado, metodo)
+        monkeypatch.setattr(escalado, metodo, lambda elementos, inferir=inferir: recibidas.extend(elementos) or inferir(elementos))
+    cascada = CLasificadorTexto(path_primero, modelo[1], escalado=escalado, umbral_confianza=umbral)
+    for resultado in (cascada.inferir_textos(textos), cascada.inferir_tokens([texto.split() for texto in textos])):
+        np.testing.assert_array_equal(resultado.probabilidades[~bajas], primero.probabilidades[~bajas])
+        np.testing.assert_array_equal(resultado.indices[~bajas], primero.indices[~bajas])
+        np.testing.assert_array_equal(resultado.probabilidades[bajas], segundo.probabilidades[bajas])
+        np.testing.assert_array_equal(resultado.indices[bajas], segundo.indices[bajas])
+    # El segundo nivel solo recibe las filas escaladas, en su orden
+    escaladas = [texto for texto, baja in zip(textos, bajas) if baja]
+    assert recibidas == escaladas + [texto.split() for texto in escaladas]
+    assert cascada.estadisticas_cascada() == {'filas': 2 * len(textos), 'escaladas': 2 * int(bajas.sum()),
+                                              'fraccion_escalada': bajas.mean()}
+
+def test_sin_filas_por_debajo_del_umbral_no_se_escala(corpus, modelo, monkeypatch):
+    escalado = CLasificadorTexto(*modelo)
+    monkeypatch.setattr(escalado, 'inferir_textos', None)
+    cascada = CLasificadorTexto(*modelo, escalado=escalado, umbral_confianza=0.0)
+    resultado = cascada.inferir_textos(list(corpus['text'].head(20)))
+    assert len(resultado) == 20 and cascada.filas_escaladas == 0
+
+def test_evaluar_cascada_con_tokens_y_con_textos(corpus, modelo):
+    textos = list(corpus['text'].head(60))
+    etiquetas = corpus['label'].head(60).to_numpy()
+    cascada = CLasificadorTexto(*modelo, escalado=CLasificadorTexto(*modelo))
+    con_tokens = evaluar_cascada(cascada, [texto.split() for texto in textos], etiquetas, [0.5, 0.9], repeticiones=1)
+    con_textos = evaluar_cascada(cascada, textos, etiquetas, [0.5, 0.9], tokens=False, repeticiones=1)
+    assert con_tokens['configuracion'].tolist() == ['nivel_1', 'nivel_2', 'cascada', 'cascada']
+    pdt.assert_frame_equal(con_tokens.drop(columns=['segundos', 'textos_por_segundo']), con_textos.drop(columns=['segundos', 'textos_por_segundo']))
+    # El umbral del primer nivel se restaura al terminar
+    assert cascada.umbral_confianza == UMBRAL_CONFIANZA_CASCADA
+
+def test_main_con_un_csv_que_no_existe(tmp_path, modelo, capsys):
+    assert main(['--datos', str(tmp_path / 'no_existe.csv'), '--modelos', modelo[0], modelo[0], '--vectorizadores', modelo[1], modelo[1]]) == 1
+    assert "no fue encontrado" in capsys.readouterr().out
@@ -0,0 +1,19 @@
+# Pruebas de la inferencia por lotes de CLasificadorTexto (ver `src.clases`).
+
+# Se importan las librerías pertinentes:
+import numpy as np
+import pytest
+from src.clases import CLasificadorTexto
+
+def test_un_predict_proba_por_lote(corpus, modelo, monkeypatch):
+    textos = list(corpus['text'])
+    clasificador = CLasificadorTexto(*modelo, tamano_lote=64)
+    esperado = clasificador.modelo.predict(clasificador.vectorizador.transform(textos))
+    llamadas = []
+    predict_proba = clasificador.modelo.predict_proba
+    monkeypatch.setattr(clasificador.modelo, 'predict_proba', lambda matriz: llamadas.append(matriz.shape[0]) or predict_proba(matriz))
+    monkeypatch.setattr(clasificador.modelo, 'predict', lambda matriz: pytest.fail("El modelo se evaluó dos veces."))
+    resultado = clasificador.inferir_textos(textos)
+    assert llamadas == [64, 64, 64, 64, 44]
+    np.testing.assert_array_equal(resultado.categorias, esperado)
+    np.testing.assert_array_equal(resultado.indices, resultado.probabilidades.argmax(axis=1))
@@ -0,0 +1,39 @@
+# Pruebas de la selección de modelos por reducción sucesiva (ver `src.entrenamiento`).
+
+# Se importan las librerías pertinentes:
+import os
+import pytest
+from src import entrenamiento
+from src.entrenamiento import SeleccionModelos
+from src.clases import CLasificadorTexto
+
+@pytest.fixture
+def seleccion(monkeypatch):
+    # Rejilla de juguete: con C muy pequeño la regresión logística apenas aprende, así que el mejor es C=1
+    familia = entrenamiento.ESPACIOS_BUSQUEDA['logistica']
+    monkeypatch.setitem(entrenamiento.ESPACIOS_BUSQUEDA, 'logistica', (familia[0], familia[1], {'C': [1e-5, 1e-4, 1e-3, 1.0]}))
+    return SeleccionModelos(familias=['logistica'], rejilla_vectorizador={'analyzer': ['word']}, n_particiones=3, factor=2, n_jobs=1)
+
+def test_conserva_la_mejor_configuracion(seleccion, corpus, tmp_path):
+    resultados = seleccion.buscar(corpus['text'], corpus['label'])
+    assert seleccion.mejor_candidato['modelo'] == {'C': 1.0}
+    # En cada ronda sigue la mitad de los candidatos con más filas, y la última usa las particiones completas
+    por_ronda = resultados.groupby('ronda').agg(candidatos=('candidato', 'size'), filas=('filas', 'first'))
+    assert por_ronda['candidatos'].tolist() == [4, 2, 1]
+    assert por_ronda['filas'].is_monotonic_increasing
+    assert por_ronda['filas'].iloc[-1] == min(len(filas) for filas, _ in seleccion._particiones(corpus['label'].to_numpy()))
+    # El mejor de cada ronda pasa a la siguiente
+    for ronda in range(len(por_ronda) - 1):
+        mejor = resultados[resultados['ronda'] == ronda].iloc[0]['candidato']
+        assert mejor in set(resultados[resultados['ronda'] == ronda + 1]['candidato'])
+    assert seleccion.mejor_puntuacion == resultados[resultados['ronda'] == por_ronda.index[-1]]['puntuacion_media'].max()
+
+    seleccion.ajustar_mejor(corpus['text'], corpus['label'])
+    path_modelo, path_vectorizador = seleccion.exportar(str(tmp_path))
+    assert os.path.dirname(path_modelo) == str(tmp_path)
+    clasificador = CLasificadorTexto(path_modelo, path_vectorizador)
+    assert (clasificador.inferir_textos(list(corpus['text'])).categorias == corpus['label'].to_numpy()).mean() > 0.9
+
+def test_factor_no_valido():
+    with pytest.raises(ValueError):
+        SeleccionModelos(factor=1)
@@ -0,0 +1,47 @@
+# Pruebas de EntrenadorIncremental (ver `src.entrenamiento_incremental`).
+
+# Se importan las librerías pertinentes:
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from src.constantes import NOMBRE_MODELO, NOMBRE_VECTORIZADOR
+from src.clases import CLasificadorTexto
+from src.entrenamiento_incremental import EntrenadorIncremental, main
+
+def test_punto_de_control_y_cambio_de_modelo(corpus, modelo, path_csv, tmp_path):
+    clasificador = CLasificadorTexto(*modelo)
+    textos = list(corpus['text'].head(50))
+    antes = clasificador.inferir_textos(textos).probabilidades
+    entrenador = EntrenadorIncremental(str(tmp_path), *modelo, intervalo_punto_control=2, clasificadores=[clasificador])
+    # 300 filas en bloques de 100: un punto de control tras el segundo bloque y otro al terminar
+    estadisticas = entrenador.entrenar_csv(path_csv, tamano_bloque=100)
+    assert (entrenador.bloques, entrenador.puntos_control) == (3, 2)
+    assert estadisticas['filas'] == entrenador.filas
+    path_modelo = os.path.join(str(tmp_path), NOMBRE_MODELO)
+    assert clasificador.modelo_path == path_modelo
+    assert clasificador.vectorizador_path == os.path.join(str(tmp_path), NOMBRE_VECTORIZADOR)
+    assert clasificador.version_modelo == 2
+    # El clasificador usa una copia del modelo del último punto de control, igual a la guardada en disco
+    assert clasificador.modelo is not entrenador.modelo
+    np.testing.assert_array_equal(clasificador.modelo.coef_, joblib.load(path_modelo).coef_)
+    despues = clasificador.inferir_textos(textos).probabilidades
+    assert not np.array_equal(antes, despues)
+    np.testing.assert_array_equal(despues, CLasificadorTexto(path_modelo, clasificador.vectorizador_path).inferir_textos(textos).probabilidades)
+
+def test_rechaza_un_vectorizador_con_otras_columnas(corpus, modelo, tmp_path):
+    modelo_path, _ = modelo
+    otro = str(tmp_path / 'vectorizador.pkl')
+    joblib.dump(CountVectorizer(max_features=10).fit(corpus['text']), otro)
+    with pytest.raises(ValueError):
+        EntrenadorIncremental(str(tmp_path), modelo_path, otro)
+    # Un modelo entrenado con vocabulario fijo tampoco se puede seguir entrenando por hashing
+    with pytest.raises(ValueError):
+        EntrenadorIncremental(str(tmp_path), modelo_path, vocabulario='hashing')
+
+def test_la_linea_de_comandos_exige_el_directorio(path_csv, modelo, capsys):
+    # Sin --directorio no se guarda ningún punto de control, para no sustituir el modelo en producción
+    with pytest.raises(SystemExit):
+        main(['--datos', path_csv, '--modelo', modelo[0], '--vectorizador', modelo[1]])
+    assert '--directorio' in capsys.readouterr().err
@@ -0,0 +1,34 @@
+# Pruebas del guardado bloque a bloque con GuardarCSV y GuardarParquet (ver `src.clases`).
+
+# Se importan las librerías pertinentes:
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from src.clases import GuardarCSV, GuardarParquet
+
+def _bloque(filas):
+    return pd.DataFrame({
+        'ID': range(filas),
+        'TEXTO': ["texto original"] * filas,
+        'TEXTO_LIMPIO': ["texto limpio"] * filas,
+        'CATEGORIA': [1] * filas,
+        'CATEGORIA_MODELO': [2] * filas,
+    })
+
+def test_parquet_cierra_y_propaga_el_error_a_mitad_de_tabla(tmp_path):
+    path = str(tmp_path / 'tabla.parquet')
+    guardar = GuardarParquet(path)
+    guardar.guardar_dataframe(_bloque(3), probabilidades=np.full((3, 6), 1 / 6))
+    with pytest.raises(ValueError):
+        # Las probabilidades no tienen una columna por clase
+        guardar.guardar_dataframe(_bloque(2), probabilidades=np.zeros((2, 4)))
+    assert guardar._escritor is None
+    # El archivo queda cerrado con los bloques anteriores al error
+    assert pq.read_table(path).num_rows == 3
+
+def test_csv_propaga_el_error_al_anexar(tmp_path):
+    with pytest.raises(OSError):
+        GuardarCSV(_bloque(2)).guardar_dataframe(str(tmp_path / 'no_existe' / 'tabla.csv'), anexar=True)
+    # Sin anexar se mantiene el mensaje de error sin excepción
+    GuardarCSV(_bloque(2)).guardar_dataframe(str(tmp_path / 'no_existe' / 'tabla.csv'))
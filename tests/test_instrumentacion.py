@@ -0,0 +1,78 @@
+# Pruebas de Instrumentacion y de sus exportaciones (ver `src.instrumentacion`).
+
+# Se importan las librerías pertinentes:
+import json
+import os
+from src.constantes import PREFIJO_METRICAS
+from src.instrumentacion import Instrumentacion
+from src.clases import Preprocesado
+
+def _medir():
+    instrumentacion = Instrumentacion()
+    # Dos bloques de una misma etapa se acumulan en un único registro
+    for filas in (10, 5):
+        with instrumentacion.etapa('limpieza', filas) as medida:
+            with instrumentacion.etapa('limpieza.filtro', filas) as filtro:
+                filtro['filas_salida'] = filas - 2
+            medida['filas_salida'] = filas - 2
+    instrumentacion.registrar_estadisticas('cache_palabras', {'aciertos': 3, 'fallos': 1, 'activa': True, 'politica': 'lru'})
+    instrumentacion.registrar_estadisticas('inferencia', {'lotes': 1}, acumular=True)
+    instrumentacion.registrar_estadisticas('inferencia', {'lotes': 2}, acumular=True)
+    return instrumentacion
+
+def test_exportar_json(tmp_path):
+    instrumentacion = _medir()
+    path = str(tmp_path / 'metricas.json')
+    instrumentacion.exportar(path_json=path)
+    with open(path, encoding='utf-8') as archivo:
+        resumen = json.load(archivo)
+    assert {nombre: (registro['llamadas'], registro['filas_entrada'], registro['filas_salida']) for nombre, registro in resumen['etapas'].items()} == {
+        'limpieza': (2, 15, 11), 'limpieza.filtro': (2, 15, 11)}
+    assert resumen['etapas']['limpieza']['segundos'] >= resumen['etapas']['limpieza.filtro']['segundos']
+    # Solo se guardan las estadísticas numéricas
+    assert resumen['estadisticas'] == {'cache_palabras': {'aciertos': 3, 'fallos': 1}, 'inferencia': {'lotes': 3}}
+    assert resumen['perfil'] == []
+    assert os.listdir(tmp_path) == ['metricas.json']
+
+def test_exportar_prometheus(tmp_path):
+    instrumentacion = _medir()
+    path = str(tmp_path / 'metricas.prom')
+    instrumentacion.exportar(path_prometheus=path)
+    with open(path, encoding='utf-8') as archivo:
+        lineas = archivo.read().splitlines()
+    muestras = dict(linea.rsplit(' ', 1) for linea in lineas if not linea.startswith('#'))
+    assert muestras[f'{PREFIJO_METRICAS}_etapa_llamadas{{etapa="limpieza"}}'] == '2'
+    assert muestras[f'{PREFIJO_METRICAS}_etapa_filas_entrada{{etapa="limpieza.filtro"}}'] == '15'
+    assert muestras[f'{PREFIJO_METRICAS}_etapa_filas_salida{{etapa="limpieza"}}'] == '11'
+    assert muestras[f'{PREFIJO_METRICAS}_estadistica{{grupo="inferencia",nombre="lotes"}}'] == '3'
+    assert float(muestras[f'{PREFIJO_METRICAS}_duracion_segundos']) >= 0
+    # Cada métrica lleva su ayuda y su tipo antes de las muestras
+    for nombre in ('duracion_segundos', 'etapa_segundos', 'etapa_llamadas', 'etapa_filas_entrada', 'etapa_filas_salida', 'estadistica'):
+        posicion = lineas.index(f'# TYPE {PREFIJO_METRICAS}_{nombre} gauge')
+        assert lineas[posicion - 1].startswith(f'# HELP {PREFIJO_METRICAS}_{nombre} ')
+
+def test_filas_descartadas_en_la_limpieza(corpus):
+    instrumentacion = Instrumentacion()
+    df = corpus.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+    resultado = Preprocesado(df, 'TEXTO', instrumentacion=instrumentacion).limpieza()
+    etapas = instrumentacion.etapas
+    assert etapas['limpieza']['filas_entrada'] == len(corpus)
+    assert etapas['limpieza']['filas_salida'] == len(resultado)
+    assert etapas['limpieza.filtro_longitud_palabras']['filas_salida'] == etapas['limpieza.filtro_notnull']['filas_entrada']
+
+def test_etapas_desde_varios_hilos():
+    from concurrent.futures import ThreadPoolExecutor
+    instrumentacion = Instrumentacion()
+    def medir(_):
+        for _ in range(200):
+            with instrumentacion.etapa('bloque', 2) as medida:
+                with instrumentacion.etapa('bloque.inferencia', 2):
+                    pass
+                medida['filas_salida'] = 1
+            instrumentacion.registrar_estadisticas('inferencia', {'lotes': 1}, acumular=True)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(medir, range(8)))
+    etapas = instrumentacion.etapas
+    assert (etapas['bloque']['llamadas'], etapas['bloque']['filas_entrada'], etapas['bloque']['filas_salida']) == (1600, 3200, 1600)
+    assert etapas['bloque.inferencia']['llamadas'] == 1600
+    assert instrumentacion.estadisticas['inferencia']['lotes'] == 1600
@@ -0,0 +1,55 @@
+# Pruebas de `limpieza_texto` frente a la cadena de funciones que sustituye (ver `src.funciones`).
+
+# Se importan las librerías pertinentes:
+import re
+import pytest
+from src.constantes import (patron_mantener, letras_permitidas_repetidas, patron_palabras_repetidas, patron_consonantes_repetidas,
+                            regex_consonantes_repetidas, patron_vocales_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA)
+from src.funciones import limpieza_texto, validacion, palabras_repetidas, validacion_vocales, longitud_palabras
+from src.cache import CacheAcotada
+
+def limpieza_original(texto):
+    """
+    Limpia un texto con los mismos pasos y argumentos que la versión original de `Preprocesado.limpieza`.
+    """
+    texto = re.sub(r'\s+', ' ', re.sub(patron_mantener, ' ', texto))
+    texto = validacion(texto, letras_permitidas_repetidas, patron_palabras_repetidas, patron_consonantes_repetidas)
+    texto = palabras_repetidas(texto, patron_palabras_repetidas)
+    texto = validacion_vocales(texto, patron_vocales_repetidas)
+    if not longitud_palabras(texto):
+        return None
+    return texto.lower()
+
+TEXTOS_RUIDOSOS = [
+    "",
+    "   ",
+    "hola",
+    "I feel so happy today",
+    "check this out https://t.co/AbC123 and http://example.com/x?y=1 now",
+    "@usuario_1 @otro thanks for the love #blessed",
+    "i am soooooo happyyyyy and sleeeeepy",
+    "aaaa eee iiii ooo uuuuu are vowels only",
+    "feel feel feel so so good",
+    "I am I am I am very tired",
+    "the theory of the the thing",
+    "Hello HELLO hello world",
+    "qwrtzp bcdfghjk mnbvcxz are not words",
+    "café naïve résumé jalapeño señor",
+    "emojis 😀😀 and 日本語 text mixed in",
+    "tabs\tand\nnew lines   everywhere",
+    "numbers 123 123 4567 and a1b2",
+    "x y",
+]
+
+@pytest.mark.parametrize('texto', TEXTOS_RUIDOSOS)
+def test_limpieza_texto_equivale_a_la_cadena_original(texto):
+    obtenido = limpieza_texto(texto, patron_mantener, regex_consonantes_repetidas, patron_vocales_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA)
+    assert obtenido == limpieza_original(texto)
+
+def test_limpieza_texto_equivale_en_el_corpus_sintetico(corpus):
+    # La cache de veredictos no cambia el resultado, aunque las palabras se repitan entre textos
+    cache_palabras = CacheAcotada(1000)
+    for texto in corpus['text']:
+        obtenido = limpieza_texto(texto, patron_mantener, regex_consonantes_repetidas, patron_vocales_repetidas,
+                                  LONGITUD_MAXIMA_FRASE_REPETIDA, cache_palabras)
+        assert obtenido == limpieza_original(texto)
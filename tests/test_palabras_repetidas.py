@@ -0,0 +1,40 @@
+# Pruebas de `colapsar_palabras_repetidas` frente a `palabras_repetidas` (ver `src.funciones`).
+
+# Se importan las librerías pertinentes:
+import random
+import pytest
+from src.constantes import patron_palabras_repetidas, LONGITUD_MAXIMA_FRASE_REPETIDA
+from src.funciones import colapsar_palabras_repetidas, palabras_repetidas
+
+def _colapsar(frase):
+    return " ".join(colapsar_palabras_repetidas(frase.split(), LONGITUD_MAXIMA_FRASE_REPETIDA))
+
+@pytest.mark.parametrize('frase', [
+    "hola",
+    "so so so happy",
+    "I am I am I am tired",
+    "Very very VERY good",
+    "the theory",
+    "i love you i love you so much so much",
+    "a b c a b c a b c d",
+    "no repetitions at all here",
+    "me me me me me me me me me me me",
+])
+def test_igual_que_palabras_repetidas(frase):
+    assert _colapsar(frase) == palabras_repetidas(frase, patron_palabras_repetidas)
+
+def test_igual_que_palabras_repetidas_en_frases_aleatorias():
+    aleatorio = random.Random(0)
+    vocabulario = ["i", "feel", "so", "happy", "sad", "love", "you", "the", "day"]
+    for _ in range(300):
+        palabras = []
+        while len(palabras) < 20:
+            grupo = [aleatorio.choice(vocabulario) for _ in range(aleatorio.randint(1, 3))]
+            palabras.extend(grupo * aleatorio.randint(1, 3))
+        frase = " ".join(palabras)
+        assert _colapsar(frase) == palabras_repetidas(frase, patron_palabras_repetidas)
+
+def test_no_colapsa_grupos_mas_largos_que_el_maximo():
+    frase = " ".join(["w%d" % numero for numero in range(3)] * 2)
+    assert colapsar_palabras_repetidas(frase.split(), 2) == frase.split()
+    assert colapsar_palabras_repetidas(frase.split(), 3) == ["w0", "w1", "w2"]
@@ -0,0 +1,24 @@
+# Pruebas de Preprocesado (ver `src.clases`).
+
+# Se importan las librerías pertinentes:
+import pandas.testing as pdt
+from src.constantes import TIPO_TEXTO, VARIANTES_TEXTO
+from src.clases import Preprocesado
+
+def _limpiar(corpus, **opciones):
+    df = corpus.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+    df['TEXTO'] = df['TEXTO'].astype(TIPO_TEXTO)
+    with Preprocesado(df, 'TEXTO', **opciones) as preprocesado:
+        return preprocesado.limpieza(), preprocesado.tokens_lematizados
+
+def test_paralelo_igual_que_secuencial(corpus):
+    secuencial, tokens_secuencial = _limpiar(corpus)
+    paralelo, tokens_paralelo = _limpiar(corpus, n_procesos=2, tamano_fragmento=64)
+    pdt.assert_frame_equal(paralelo, secuencial)
+    assert tokens_paralelo == tokens_secuencial
+
+def test_paralelo_igual_que_secuencial_con_todas_las_variantes(corpus):
+    secuencial, _ = _limpiar(corpus, variantes=VARIANTES_TEXTO)
+    paralelo, _ = _limpiar(corpus, n_procesos=2, tamano_fragmento=64, variantes=VARIANTES_TEXTO)
+    pdt.assert_frame_equal(paralelo, secuencial)
+    assert set(VARIANTES_TEXTO) <= set(paralelo.columns)
@@ -0,0 +1,86 @@
+# Pruebas de ProcesadorPorBloques (ver `src.clases`).
+
+# Se importan las librerías pertinentes:
+import numpy as np
+import pandas as pd
+import pytest
+import pandas.testing as pdt
+import pyarrow.parquet as pq
+from src.constantes import TIPO_TEXTO, columnas_deseadas
+from src.funciones import variantes_columna
+from src.clases import ProcesadorPorBloques, Preprocesado, CLasificadorTexto
+
+def test_bloque_con_texto_vacio_con_y_sin_cache(corpus, modelo, path_csv, tmp_path):
+    # Una fila sin texto se lee como NA y debe descartarse igual con cache de resultados que sin ella
+    bloque = corpus.head(50).copy()
+    bloque.loc[3, 'text'] = None
+    bloque.loc[10, 'text'] = ""
+    procesador = ProcesadorPorBloques(path_csv, *modelo)
+    con_cache = ProcesadorPorBloques(path_csv, *modelo, path_cache=str(tmp_path / 'cache.sqlite'))
+    esperado = procesador.procesar_bloque(bloque.copy())
+    obtenido = con_cache.procesar_bloque(bloque.copy())
+    # La segunda vez los textos salen de la cache
+    repetido = con_cache.procesar_bloque(bloque.copy())
+    con_cache.cache_resultados.cerrar()
+    assert 3 not in set(esperado['ID'])
+    for resultado in (obtenido, repetido):
+        pdt.assert_frame_equal(resultado.reset_index(drop=True), esperado.reset_index(drop=True))
+
+def test_error_de_lectura_a_mitad_de_archivo(corpus, modelo, tmp_path):
+    # Una fila mal formada en el segundo bloque debe detener la ejecución en lugar de dejar la salida incompleta
+    path_csv = tmp_path / 'roto.csv'
+    lineas = corpus.head(200).to_csv(index=False).splitlines()
+    lineas.insert(150, '149,"texto con columnas de mas",1,2,3')
+    path_csv.write_text("\n".join(lineas) + "\n")
+    procesador = ProcesadorPorBloques(str(path_csv), *modelo, tamano_bloque=100)
+    with pytest.raises(pd.errors.ParserError):
+        procesador.ejecutar(str(tmp_path / 'salida.csv'))
+
+@pytest.mark.parametrize('columna_texto', ['TEXTO_LIMPIO', 'TEXTO_STEMMING'])
+def test_clasifica_la_columna_indicada(corpus, modelo, path_csv, tmp_path, columna_texto):
+    bloque = corpus.head(100)
+    df = bloque.rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+    df['TEXTO'] = df['TEXTO'].astype(TIPO_TEXTO)
+    limpio = Preprocesado(df, 'TEXTO', variantes=variantes_columna(columna_texto)).limpieza()
+    clasificador = CLasificadorTexto(*modelo)
+    esperado = clasificador.inferir_textos(limpio[columna_texto].tolist())
+    lematizado = clasificador.inferir_textos(limpio['TEXTO_STOPWORDS_LEMATIZACION'].tolist())
+    assert not np.array_equal(esperado.probabilidades, lematizado.probabilidades)
+    procesador = ProcesadorPorBloques(path_csv, *modelo, columna_texto=columna_texto)
+    con_cache = ProcesadorPorBloques(path_csv, *modelo, columna_texto=columna_texto, path_cache=str(tmp_path / 'cache.sqlite'))
+    # La segunda pasada con cache sale de la cache
+    for procesar_bloque in (procesador.procesar_bloque, con_cache.procesar_bloque, con_cache.procesar_bloque):
+        obtenido, resultado = procesar_bloque(bloque.copy(), devolver_resultado=True)
+        assert obtenido['ID'].tolist() == limpio['ID'].tolist()
+        np.testing.assert_array_equal(resultado.probabilidades, esperado.probabilidades)
+    con_cache.cache_resultados.cerrar()
+
+def test_tokens_solo_para_la_columna_lematizada(corpus, modelo):
+    df = corpus.head(20).rename(columns={"Unnamed: 0": "ID", "text": "TEXTO", "label": "CATEGORIA"})
+    preprocesado = Preprocesado(df, 'TEXTO')
+    limpio = preprocesado.limpieza()
+    clasificador = CLasificadorTexto(*modelo, df=limpio, columna_texto='TEXTO_LIMPIO')
+    with pytest.raises(ValueError, match='TEXTO_STOPWORDS_LEMATIZACION'):
+        clasificador.inferir_columna_texto(tokens=preprocesado.tokens_lematizados)
+
+def test_error_al_guardar_el_primer_bloque(modelo, path_csv, tmp_path):
+    # Un solo bloque en un directorio que no existe: la ejecución no puede terminar como si se hubiera guardado
+    procesador = ProcesadorPorBloques(path_csv, *modelo)
+    with pytest.raises(OSError):
+        procesador.ejecutar(str(tmp_path / 'no_existe' / 'salida.csv'))
+
+@pytest.mark.parametrize('sin_bloques', [False, True])
+@pytest.mark.parametrize('extension', ['.csv', '.parquet'])
+def test_entrada_sin_filas(modelo, tmp_path, monkeypatch, extension, sin_bloques):
+    path_csv = tmp_path / 'vacio.csv'
+    path_csv.write_text("Unnamed: 0,text,label\n")
+    procesador = ProcesadorPorBloques(str(path_csv), *modelo)
+    if sin_bloques:
+        monkeypatch.setattr(procesador.lector, 'leer_por_bloques', lambda tamano_bloque: iter([]))
+    path_guardado = str(tmp_path / f'salida{extension}')
+    assert procesador.ejecutar(path_guardado) == 0
+    if extension == '.csv':
+        assert pd.read_csv(path_guardado).columns.tolist() == columnas_deseadas
+    else:
+        assert pq.read_table(path_guardado).num_rows == 0
+        assert 'PROBABILIDAD_MAXIMA' in pq.read_schema(path_guardado).names
@@ -0,0 +1,82 @@
+# Pruebas de ResultadoClasificacion y `mapear_emociones` (ver `src.resultados`).
+
+# Se importan las librerías pertinentes:
+import ast
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from src.constantes import mapeo_emociones
+from src.resultados import ResultadoClasificacion, mapear_emociones
+from src.clases import GuardarCSV, GuardarParquet
+
+@pytest.fixture
+def resultado():
+    aleatorio = np.random.default_rng(0)
+    probabilidades = aleatorio.dirichlet(np.ones(6), size=20)
+    return ResultadoClasificacion(probabilidades, np.arange(6))
+
+def test_ida_y_vuelta_por_lista_y_dataframe(resultado):
+    for probabilidades in (resultado.lista_probabilidades(), resultado.a_dataframe().to_numpy()):
+        copia = ResultadoClasificacion(probabilidades, resultado.clases)
+        np.testing.assert_array_equal(copia.probabilidades, resultado.probabilidades)
+        np.testing.assert_array_equal(copia.indices, resultado.indices)
+    assert list(resultado.a_dataframe().columns) == list(resultado.clases)
+
+def test_categorias_y_emociones(resultado):
+    np.testing.assert_array_equal(resultado.categorias, resultado.probabilidades.argmax(axis=1))
+    np.testing.assert_array_equal(resultado.probabilidad_maxima, resultado.probabilidades.max(axis=1))
+    assert list(resultado.emociones()) == [mapeo_emociones[categoria] for categoria in resultado.categorias]
+    assert list(mapear_emociones(resultado.categorias)) == list(resultado.emociones())
+    # Los códigos que no están en el mapeo quedan como nulos
+    assert mapear_emociones([0, 99]).isna().tolist() == [False, True]
+
+def test_clases_desordenadas():
+    # Las columnas siguen el orden de `clases`, que no tiene por qué ser el de los códigos
+    resultado = ResultadoClasificacion([[0.1, 0.9], [0.8, 0.2]], np.array([3, 1]))
+    assert resultado.categorias.tolist() == [1, 3]
+    assert list(resultado.emociones()) == [mapeo_emociones[1], mapeo_emociones[3]]
+
+def test_dimensiones_no_validas():
+    with pytest.raises(ValueError):
+        ResultadoClasificacion(np.zeros((3, 2)), [0, 1], indices=[0, 1])
+
+def _tabla_clasificada(resultado):
+    return pd.DataFrame({
+        'ID': range(len(resultado)),
+        'TEXTO': ["texto"] * len(resultado),
+        'TEXTO_LIMPIO': ["texto limpio"] * len(resultado),
+        'CATEGORIA': resultado.categorias,
+        'PROBABILIDADES_CATEGORIAS': resultado.lista_probabilidades(),
+        'CATEGORIA_MODELO': resultado.emociones(),
+    })
+
+def test_ida_y_vuelta_por_csv_y_parquet(resultado, tmp_path):
+    df = _tabla_clasificada(resultado)
+    path_csv = str(tmp_path / 'tabla.csv')
+    GuardarCSV(df).guardar_dataframe(path_csv)
+    leido = pd.read_csv(path_csv)
+    probabilidades = [ast.literal_eval(lista) for lista in leido['PROBABILIDADES_CATEGORIAS']]
+    np.testing.assert_array_equal(ResultadoClasificacion(probabilidades, resultado.clases).probabilidades, resultado.probabilidades)
+    assert leido['CATEGORIA_MODELO'].tolist() == list(resultado.emociones())
+
+    # En Parquet da igual tomar las probabilidades de la matriz o de la columna de listas
+    for origen, probabilidades in (('matriz', resultado.probabilidades), ('lista', None)):
+        path_parquet = str(tmp_path / f'tabla_{origen}.parquet')
+        with GuardarParquet(path_parquet, clases=resultado.clases) as guardar:
+            guardar.guardar_dataframe(df, probabilidades=probabilidades)
+        tabla = pq.read_table(path_parquet).to_pandas()
+        columnas = [f"PROBABILIDAD_{mapeo_emociones[clase].upper()}" for clase in resultado.clases]
+        np.testing.assert_array_equal(tabla[columnas].to_numpy(), resultado.probabilidades)
+        np.testing.assert_array_equal(tabla['PROBABILIDAD_MAXIMA'].to_numpy(), resultado.probabilidad_maxima)
+        assert tabla['CATEGORIA_MODELO'].tolist() == list(resultado.emociones())
+
+def test_indices_con_muchas_clases_y_fuera_de_rango():
+    # Con más clases de las que caben en int16 los índices no se desbordan
+    clases = np.arange(40000)
+    probabilidades = np.zeros((2, len(clases)), dtype=np.float32)
+    probabilidades[0, 39999] = probabilidades[1, 128] = 1
+    resultado = ResultadoClasificacion(probabilidades, clases)
+    assert resultado.categorias.tolist() == [39999, 128]
+    with pytest.raises(ValueError):
+        ResultadoClasificacion(probabilidades, clases, indices=[0, 40000])
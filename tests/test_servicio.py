@@ -0,0 +1,107 @@
+# Pruebas de las respuestas de error del servicio en línea (ver `src.servicio`).
+
+# Se importan las librerías pertinentes:
+import asyncio
+import json
+import pytest
+from src.clases import Preprocesado, CLasificadorTexto
+from src.servicio import ServicioClasificacion
+
+@pytest.fixture
+def servicio(modelo):
+    return ServicioClasificacion(CLasificadorTexto(*modelo), Preprocesado(None, 'TEXTO'), ventana_ms=1)
+
+async def _peticion(puerto, peticion):
+    """
+    Envía una petición HTTP en bruto y devuelve el código de estado y el cuerpo JSON de la respuesta.
+    """
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    escritor.write(peticion)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    cabeceras = {}
+    while (linea := await lector.readline()) not in (b'\r\n', b''):
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    cuerpo = json.loads(await lector.readexactly(int(cabeceras['content-length'])))
+    escritor.close()
+    return estado, cuerpo
+
+def _clasificar(texto, longitud=None):
+    cuerpo = json.dumps({'texto': texto}).encode()
+    longitud = len(cuerpo) if longitud is None else longitud
+    return f"POST /clasificar HTTP/1.1\r\nContent-Length: {longitud}\r\n\r\n".encode() + cuerpo
+
+def _ejecutar(servicio, corrutina):
+    """
+    Arranca el servicio en un puerto libre, como `servir`, y ejecuta la corrutina con el número de puerto.
+    """
+    async def principal():
+        servicio._cola = asyncio.Queue(maxsize=servicio.tamano_cola)
+        agrupador = asyncio.create_task(servicio._agrupar())
+        servidor = await asyncio.start_server(servicio._atender, '127.0.0.1', 0)
+        try:
+            return await corrutina(servidor.sockets[0].getsockname()[1])
+        finally:
+            agrupador.cancel()
+            servidor.close()
+    return asyncio.run(principal())
+
+def test_clasificar(servicio):
+    estado, cuerpo = _ejecutar(servicio, lambda puerto: _peticion(puerto, _clasificar("i feel so happy and joyful today")))
+    assert estado == 200 and 'emocion' in cuerpo
+
+def test_content_length_no_valido(servicio):
+    estado, _ = _ejecutar(servicio, lambda puerto: _peticion(puerto, _clasificar("i feel happy", longitud='abc')))
+    assert estado == 400
+
+def test_error_del_lote_responde_500_a_todas_sus_peticiones(servicio, monkeypatch):
+    def fallar(textos):
+        raise RuntimeError("fallo del modelo")
+    monkeypatch.setattr(servicio, '_procesar_lote', fallar)
+    async def varias(puerto):
+        return await asyncio.gather(*(_peticion(puerto, _clasificar(f"texto numero {numero} para clasificar")) for numero in range(3)))
+    assert [estado for estado, _ in _ejecutar(servicio, varias)] == [500, 500, 500]
+
+def test_cola_llena_responde_503(servicio):
+    # Sin agrupador los textos se quedan en la cola, que admite uno solo
+    servicio.tamano_cola = 1
+    servicio._agrupar = lambda: asyncio.sleep(3600)
+    async def saturar(puerto):
+        servicio._cola.put_nowait(("texto en espera", asyncio.get_running_loop().create_future(), 0.0))
+        return await _peticion(puerto, _clasificar("i feel so happy today"))
+    estado, _ = _ejecutar(servicio, saturar)
+    assert estado == 503
+
+def test_cuerpo_demasiado_grande_responde_413(servicio):
+    servicio.tamano_maximo_cuerpo = 64
+    async def enviar(puerto):
+        # La conexión se cierra tras el 413, por lo que la segunda petición de la misma conexión no se atiende
+        lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+        escritor.write(_clasificar("i feel so happy " * 20) + _clasificar("i feel happy"))
+        await escritor.drain()
+        respuesta = await lector.read()
+        escritor.close()
+        return respuesta
+    respuesta = _ejecutar(servicio, enviar)
+    assert respuesta.startswith(b"HTTP/1.1 413 Payload Too Large\r\n")
+    assert respuesta.count(b"HTTP/1.1") == 1
+    estado, _ = _ejecutar(servicio, lambda puerto: _peticion(puerto, _clasificar("i feel happy")))
+    assert estado == 200
+
+def test_el_lote_se_clasifica_con_los_tokens(servicio, monkeypatch):
+    llamadas = []
+    inferir_tokens = servicio.clasificador.inferir_tokens
+    def registrar(listas_tokens):
+        llamadas.append(listas_tokens)
+        return inferir_tokens(listas_tokens)
+    monkeypatch.setattr(servicio.clasificador, 'inferir_tokens', registrar)
+    monkeypatch.setattr(servicio.clasificador, 'inferir_textos', None)
+    textos = ["i feel so happy and joyful today", "a", "i am really angry about this"]
+    resultados = servicio._procesar_lote(textos)
+    assert resultados[1] is None
+    assert len(llamadas) == 1 and not any(isinstance(tokens, str) for tokens in llamadas[0])
+    # El resultado es el mismo que clasificando los textos lematizados como cadenas
+    _, lematizados = servicio.preprocesado.procesar_textos(textos)
+    esperado = CLasificadorTexto.inferir_textos(servicio.clasificador, [texto for texto in lematizados if texto is not None])
+    assert [resultado['categoria'] for resultado in resultados if resultado is not None] == esperado.categorias.tolist()
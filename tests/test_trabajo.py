@@ -0,0 +1,80 @@
+# Pruebas del trabajo reanudable por bloques (ver `src.trabajo`).
+
+# Se importan las librerías pertinentes:
+import os
+import pandas as pd
+import pandas.testing as pdt
+import pyarrow.parquet as pq
+import pytest
+from src.trabajo import TrabajoPorBloques
+
+class Interrupcion(Exception):
+    pass
+
+def _trabajo(path_csv, modelo, path_guardado):
+    # 300 filas en bloques de 50: seis bloques
+    return TrabajoPorBloques(path_csv, *modelo, path_guardado, tamano_bloque=50)
+
+def _espiar_guardado(trabajo, guardados, interrumpir_tras=None):
+    """
+    Anota el número de cada bloque guardado y, si se indica, interrumpe el trabajo justo después de guardar
+    ese número de bloques, antes de que el manifiesto los registre.
+    """
+    guardar_bloque = trabajo._guardar_bloque
+    def guardar(numero, bloque, resultado):
+        guardar_bloque(numero, bloque, resultado)
+        guardados.append(numero)
+        if len(guardados) == interrumpir_tras:
+            raise Interrupcion()
+    trabajo._guardar_bloque = guardar
+
+def _leer(path):
+    if path.endswith('.parquet'):
+        return pq.read_table(path).to_pandas()
+    return pd.read_csv(path)
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet'])
+def test_reanudar_tras_una_interrupcion(path_csv, modelo, tmp_path, extension):
+    completo = str(tmp_path / f'completo{extension}')
+    assert _trabajo(path_csv, modelo, completo).ejecutar() > 0
+    esperado = _leer(completo)
+
+    path_guardado = str(tmp_path / f'reanudado{extension}')
+    interrumpido = _trabajo(path_csv, modelo, path_guardado)
+    guardados = []
+    _espiar_guardado(interrumpido, guardados, interrumpir_tras=3)
+    with pytest.raises(Interrupcion):
+        interrumpido.ejecutar()
+    assert not os.path.exists(path_guardado)
+
+    # El tercer bloque se guardó pero no llegó al manifiesto, así que se vuelve a procesar
+    reanudado = _trabajo(path_csv, modelo, path_guardado)
+    guardados = []
+    _espiar_guardado(reanudado, guardados)
+    filas = reanudado.ejecutar()
+    assert guardados == [2, 3, 4, 5]
+    obtenido = _leer(path_guardado)
+    assert filas == len(obtenido)
+    assert obtenido['ID'].is_unique
+    pdt.assert_frame_equal(obtenido, esperado)
+    # Los archivos de los bloques se borran al terminar
+    assert os.listdir(reanudado.directorio_trabajo) == ['manifiesto.json']
+
+    # Con el trabajo completado no se vuelve a procesar ningún bloque
+    otra_vez = _trabajo(path_csv, modelo, path_guardado)
+    guardados = []
+    _espiar_guardado(otra_vez, guardados)
+    assert otra_vez.ejecutar() == filas
+    assert guardados == []
+
+def test_otra_configuracion_detiene_el_trabajo(path_csv, modelo, tmp_path):
+    path_guardado = str(tmp_path / 'salida.csv')
+    interrumpido = _trabajo(path_csv, modelo, path_guardado)
+    _espiar_guardado(interrumpido, [], interrumpir_tras=1)
+    with pytest.raises(Interrupcion):
+        interrumpido.ejecutar()
+    otro_tamano = TrabajoPorBloques(path_csv, *modelo, path_guardado, tamano_bloque=100)
+    with pytest.raises(ValueError, match='tamano_bloque'):
+        otro_tamano.ejecutar()
+    # Al reiniciar se descartan los bloques anteriores
+    assert otro_tamano.ejecutar(reiniciar=True) == len(_leer(path_guardado))
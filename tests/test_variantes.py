@@ -0,0 +1,54 @@
+# Pruebas de `preprocesamiento_variantes` (ver `src.funciones`).
+
+# Se importan las librerías pertinentes:
+from types import SimpleNamespace
+import pytest
+from src.constantes import VARIANTES_TEXTO
+from src.funciones import preprocesamiento, preprocesamiento_variantes
+from src.clases import _cargar_recursos, _procesar_textos
+
+# Operaciones de `preprocesamiento` (rm_stopwords, stemming, lematizar) de cada variante:
+OPERACIONES = {
+    'TEXTO_STOPWORDS': (True, False, False),
+    'TEXTO_STOPWORDS_STEMMING': (True, True, False),
+    'TEXTO_STOPWORDS_LEMATIZACION': (True, False, True),
+    'TEXTO_LEMATIZACION': (False, False, True),
+    'TEXTO_STEMMING': (False, True, False),
+}
+
+# Clase que imita un modelo de spaCy cuyo lema depende de la palabra anterior, como con un etiquetador:
+class ModeloContextual:
+    def __call__(self, texto):
+        palabras, inicio = [], 0
+        anterior = ''
+        for palabra in texto.split(' '):
+            if palabra:
+                palabras.append(SimpleNamespace(text=palabra, idx=inicio, lemma_=f"{palabra}/{anterior}"))
+                anterior = palabra
+            inicio += len(palabra) + 1
+        return palabras
+
+    def pipe(self, textos, batch_size=None, n_process=1):
+        return (self(texto) for texto in textos)
+
+@pytest.fixture(scope='module')
+def limpios(corpus):
+    limpios, _ = _procesar_textos(list(corpus['text'].head(150)))
+    return [limpio for limpio in limpios if limpio is not None]
+
+@pytest.mark.parametrize('contextual', [False, True], ids=['spacy', 'contextual'])
+@pytest.mark.parametrize('variante', VARIANTES_TEXTO)
+def test_variante_sola_y_con_las_demas(limpios, variante, contextual):
+    STEMMER_EN, SPACY_NLP_EN, STOPWORDS = _cargar_recursos()
+    if contextual:
+        SPACY_NLP_EN = ModeloContextual()
+    recursos = (STEMMER_EN, SPACY_NLP_EN, STOPWORDS)
+    # Tramos pequeños para que se compartan las raíces entre tramos
+    sola = preprocesamiento_variantes(limpios, [variante], *recursos, tamano_lote=16)[variante]
+    todas = preprocesamiento_variantes(limpios, VARIANTES_TEXTO, *recursos, tamano_lote=16)[variante]
+    assert sola == todas
+    assert sola == [preprocesamiento(texto, *OPERACIONES[variante], *recursos) for texto in limpios]
+
+def test_variante_invalida():
+    with pytest.raises(ValueError):
+        preprocesamiento_variantes(["hola mundo"], ['TEXTO_INVENTADO'])
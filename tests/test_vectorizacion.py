@@ -0,0 +1,49 @@
+# Pruebas de VectorizadorTokens (ver `src.vectorizacion`).
+
+# Se importan las librerías pertinentes:
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import SGDClassifier
+from src.artefactos import exportar_artefacto, cargar_artefacto
+from src.vectorizacion import VectorizadorTokens, admite_tokens
+
+# Configuraciones del vectorizador; la de `char_wb` no admite la vectorización por tokens:
+CONFIGURACIONES = [
+    {},
+    {'ngram_range': (1, 2)},
+    {'ngram_range': (2, 3), 'binary': True},
+    {'stop_words': 'english', 'lowercase': False},
+    {'token_pattern': r"(?u)\b\w+\b", 'dtype': np.float32},
+    {'analyzer': 'char_wb', 'ngram_range': (2, 3)},
+    {'token_pattern': r"\S+"},
+]
+
+@pytest.fixture(scope='module')
+def listas_tokens(corpus):
+    listas = [texto.split() for texto in corpus['text'].head(120)]
+    # Tokens que el analizador vuelve a dividir o descarta, tokens fuera del vocabulario y un texto vacío
+    return listas + [["Can't", "e-mail", "HAPPY", "x"], ["palabradesconocida"], []]
+
+@pytest.mark.parametrize('parametros', CONFIGURACIONES)
+def test_igual_que_transform_de_los_tokens_unidos(corpus, listas_tokens, parametros):
+    vectorizador = CountVectorizer(**parametros).fit(corpus['text'])
+    tokens = VectorizadorTokens(vectorizador)
+    assert tokens.directo == admite_tokens(vectorizador)
+    esperado = vectorizador.transform([" ".join(lista) for lista in listas_tokens])
+    # Dos veces, para comprobar también el resultado que sale de la cache
+    for _ in range(2):
+        obtenido = tokens.transform(listas_tokens)
+        assert obtenido.dtype == esperado.dtype
+        np.testing.assert_array_equal(obtenido.toarray(), esperado.toarray())
+
+def test_vectorizador_mapeado(corpus, listas_tokens, tmp_path):
+    vectorizador = CountVectorizer(ngram_range=(1, 2)).fit(corpus['text'])
+    modelo = SGDClassifier(random_state=0).fit(vectorizador.transform(corpus['text']), corpus['label'])
+    path = str(tmp_path / 'modelo.mmap')
+    exportar_artefacto(vectorizador, modelo, path)
+    mapeado, _ = cargar_artefacto(path)
+    tokens = VectorizadorTokens(mapeado)
+    assert tokens.directo
+    esperado = vectorizador.transform([" ".join(lista) for lista in listas_tokens])
+    np.testing.assert_array_equal(tokens.transform(listas_tokens).toarray(), esperado.toarray())